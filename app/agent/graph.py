@@ -9,7 +9,7 @@ now loads bilingual refusals and deterministic crisis flow (WhatsApp default).
 
 from __future__ import annotations
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from app.agent.intent import classify_topic
 from app.agent.prompts import render_planner_prompt, speakable_citation
@@ -84,6 +84,12 @@ class CrisisDecision(BaseModel):
     signals: dict
     actions: dict
 
+CRISIS_VOICE_LINES = {
+    "en": "I’m here with you. I will connect you to a trained helper now and send support options to your WhatsApp.",
+    "ur": "میں آپ کے ساتھ ہوں۔ میں ابھی آپ کو تربیت یافتہ مدد سے ملا رہا/رہی ہوں اور واٹس ایپ پر مدد کے آپشنز بھیج رہا/رہی ہوں۔",
+}
+OUT_OF_SCOPE_SAY = "I’m trained for anxiety and depression topics. I can’t answer that safely. Would you like a short grounding exercise?"
+
 class SafetyNode:
     """
     Deterministic safety/guardrail gate:
@@ -176,9 +182,7 @@ class SafetyNode:
                 if rule["action"] == "crisis_flow":
                     decision = self._build_crisis_decision(state.get("crisis_signals", {}))
                     # Minimal, neutral verbal line; do not repeat harmful details.
-                    voice_line = "I’m here with you. I will connect you to a trained helper now and send support options to your WhatsApp."
-                    if lang == "ur":
-                        voice_line = "میں آپ کے ساتھ ہوں۔ میں ابھی آپ کو تربیت یافتہ مدد سے ملا رہا/رہی ہوں اور واٹس ایپ پر مدد کے آپشنز بھیج رہا/رہی ہوں۔"
+                    voice_line = CRISIS_VOICE_LINES["ur" if lang == "ur" else "en"]
                     state.update({
                         "final_text": voice_line,
                         "decision_json": decision,
@@ -245,6 +249,7 @@ def safety_node(state: dict) -> dict:
     """
     user_text = state.get("user_text", "")
     topic = state.get("topic")
+    verdict = state.get("verdict")  # request-scoped SafetyVerdict (app/safety/verdict.py), optional
     decision = state.get(
         "decision",
         {"actions": [], "risk": {"level": "none", "triggers": []}, "meta": {}}
@@ -254,7 +259,12 @@ def safety_node(state: dict) -> dict:
     decision = safety_shim.apply_policies(decision, user_text=user_text, topic=topic)
 
     # Week-4 SafetyNode (deterministic)
-    policy_tags = _infer_policy_tags(user_text, topic)
+    if verdict is not None and topic in verdict.policy_tags:
+        policy_tags = verdict.policy_tags[topic]
+    else:
+        policy_tags = _infer_policy_tags(user_text, topic)
+        if verdict is not None:
+            verdict.policy_tags[topic] = policy_tags
     lang = decision.get("lang", "en")
     s = {"policy_tags": policy_tags, "lang": lang, "crisis_signals": {"intent": "unsure"}}
     out = SAFETY(s)
@@ -266,10 +276,10 @@ def safety_node(state: dict) -> dict:
         if "decision_json" in out:
             # Attach crisis decision JSON for logging/handoff
             decision["meta"]["crisis_decision"] = out["decision_json"]
-        return {"user_text": user_text, "topic": topic, "decision": decision}
+        return {"user_text": user_text, "topic": topic, "decision": decision, "verdict": verdict}
 
     # No safety intervention
-    return {"user_text": user_text, "topic": topic, "decision": decision}
+    return {"user_text": user_text, "topic": topic, "decision": decision, "verdict": verdict}
 # --- End MS-1 additions ---
 
 # Mock planner for Week-2 (no network). Replace with adapter in Week-3/4.
@@ -297,7 +307,8 @@ def _mock_planner(user_text: str, topic: str) -> Dict[str, Any]:
 
     return {"actions": actions, "evidence_ids": evidence_ids}
 
-def plan_say(user_text: str, locale: str = "en") -> Dict[str, Any]:
+def plan_say(user_text: str, locale: str = "en", verdict: Optional[Any] = None) -> Dict[str, Any]:
+    """`verdict`: the request's SafetyVerdict, handed to safety_node so tags are inferred once per text."""
     t0 = time.perf_counter()
     # vad/asr are mocked by the /say endpoint in Week-2; timers remain present for benching.
     t_vad = 5.0
@@ -332,7 +343,7 @@ def plan_say(user_text: str, locale: str = "en") -> Dict[str, Any]:
             "intent": "out_of_scope",
             "risk": {"level": "low", "triggers": []},
             "actions": [
-                {"type": "say", "text": "I’m trained for anxiety and depression topics. I can’t answer that safely. Would you like a short grounding exercise?"},
+                {"type": "say", "text": OUT_OF_SCOPE_SAY},
                 # WhatsApp outreach by default; policy gate handles consent defaults.
                 {"type": "whatsapp", "template": "hotline_pk", "params": {"number": "+92xxxxxxxx", "hours": "24/7", "send": True}}
             ],
@@ -356,7 +367,7 @@ def plan_say(user_text: str, locale: str = "en") -> Dict[str, Any]:
         })
 
         # --- Safety node hook (after intent/planner, before speak/output) ---
-        state = {"user_text": user_text, "topic": "other", "decision": decision}
+        state = {"user_text": user_text, "topic": "other", "decision": decision, "verdict": verdict}
         state = safety_node(state)
         return state["decision"]
 
@@ -395,6 +406,19 @@ def plan_say(user_text: str, locale: str = "en") -> Dict[str, Any]:
     })
 
     # --- Safety node hook (after intent/planner, before speak/output) ---
-    state = {"user_text": user_text, "topic": topic, "decision": decision}
+    state = {"user_text": user_text, "topic": topic, "decision": decision, "verdict": verdict}
     state = safety_node(state)
     return state["decision"]
+
+def static_say_lines() -> List[tuple[str, str, str]]:
+    """
+    (key, lang, text) of every fixed line plan_say can speak: crisis voice lines, the
+    out-of-scope line and the mock planner's canned actions (pre-rendered into the TTS cache).
+    """
+    lines = [(f"graph.crisis_{lang}", lang, text) for lang, text in CRISIS_VOICE_LINES.items()]
+    lines.append(("graph.out_of_scope", "en", OUT_OF_SCOPE_SAY))
+    for topic in ("anxiety", "depression"):
+        for i, a in enumerate(_mock_planner("", topic)["actions"]):
+            if a.get("type") == "say" and a.get("text"):
+                lines.append((f"graph.{topic}_{i}", "en", a["text"]))
+    return lines
@@ -1,23 +1,21 @@
 from __future__ import annotations
 import json, time, argparse
-from pathlib import Path
 from typing import Any, Dict, List
-import yaml
-from app.retrieval.search import search as retrieve
+from app.retrieval.search import search as retrieve, search_many as retrieve_many, load_cfg
 
 def _load_min_score(default: float = 0.40) -> float:
-    min_score = default
-    for p in ("configs/retrieval.yaml", "configs/planner.yaml"):
-        path = Path(p)
-        if path.exists():
-            data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
-            if "min_score" in data:
-                min_score = float(data["min_score"])
-    return min_score
+    # planner.yaml overrides retrieval.yaml (same merge order as load_cfg)
+    return float(load_cfg().get("min_score", default))
 
 def plan(query: str) -> Dict[str, Any]:
-    results = retrieve(query)
+    return _decide(query, retrieve(query), _load_min_score())
+
+def plan_many(queries: List[str]) -> List[Dict[str, Any]]:
+    """Batched plan(): one retrieval pass (single GEMM / FAISS call) for all queries."""
     min_score = _load_min_score()
+    return [_decide(q, res, min_score) for q, res in zip(queries, retrieve_many(queries))]
+
+def _decide(query: str, results: List[Dict[str, Any]], min_score: float) -> Dict[str, Any]:
     top_score = float(results[0]["similarity"]) if results else 0.0
 
     decision: Dict[str, Any] = {
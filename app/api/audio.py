@@ -0,0 +1,188 @@
+# app/api/audio.py
+# Purpose: Serve synthesized audio straight from the TTS cache (app/audio/tts/tts_cache.py)
+# instead of StaticFiles on artifacts/ with a ?v=<ms> cache-buster on every reply:
+#   GET|HEAD /api/audio/<key><ext>   ETag = sha256 of the stored audio, so a repeat utterance
+#                                    revalidates to 304; single Range requests → 206 (416 when
+#                                    unsatisfiable); If-Range honoured
+#   GET      /api/audio/stats        hot set size, hits from RAM vs disk reads, 304s, 206s
+# A name missing from this worker's index is looked up on disk (another worker may have stored
+# it) and adopted into the index. Recently served files stay in a byte-bounded in-memory LRU
+# (the "hot" set), so repeated crisis/greeting lines are answered from RAM without a disk read.
+#
+# Env: SUKOON_AUDIO_HOT_MB (hot set budget, default 32; 0 disables),
+#      SUKOON_AUDIO_MAX_AGE_S (Cache-Control max-age, default 3600).
+from __future__ import annotations
+import mimetypes, os, re, threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.audio.tts.tts_cache import get_cache
+from app.runtime.pools import run_io
+
+router = APIRouter(prefix="/api/audio", tags=["audio"])
+
+_NAME_RE = re.compile(r"^([0-9a-f]{64})(\.[a-z0-9]{2,4})$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_TYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg"}
+
+
+class HotAudio:
+    """Byte-bounded LRU of served audio: key → (etag, bytes)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != etag:   # re-rendered since it was loaded
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, etag: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._items[key] = (etag, data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, (_, gone) = self._items.popitem(last=False)
+                self._bytes -= len(gone)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+_HOT = HotAudio(int(float(os.getenv("SUKOON_AUDIO_HOT_MB", "32")) * 1024 * 1024))
+_MAX_AGE = int(os.getenv("SUKOON_AUDIO_MAX_AGE_S", "3600"))
+_N_LOCK = threading.Lock()
+_N = {"requests": 0, "not_modified": 0, "partial": 0, "hot_hits": 0, "disk_reads": 0}
+
+
+def _count(name: str) -> None:
+    with _N_LOCK:
+        _N[name] += 1
+
+
+def audio_url(path: str, static_prefix: str = "/media/") -> Optional[str]:
+    """
+    Browser URL for a TTS file: /api/audio/<key><ext> when it is a TTS cache entry, else its
+    path under the artifacts/ static mount (`static_prefix`); None outside artifacts/.
+    """
+    rel = (path or "").replace("\\", "/")
+    if get_cache().key_of(rel):
+        return "/api/audio/" + Path(rel).name
+    if rel.startswith("artifacts/"):
+        return static_prefix + rel.split("artifacts/", 1)[-1]
+    return None
+
+
+def byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) inclusive for a single `bytes=` range; None when the header should be ignored
+    (malformed, multiple ranges). Raises ValueError when the range is unsatisfiable.
+    """
+    m = _RANGE_RE.match((header or "").strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if not m.group(1):                            # bytes=-N: the last N bytes
+        n = int(m.group(2))
+        if n == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - n), size - 1
+    first = int(m.group(1))
+    last = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    if first >= size or last < first:
+        raise ValueError("unsatisfiable range")
+    return first, last
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@router.get("/stats")
+def audio_stats():
+    """Audio serving: hot set size, RAM hits vs disk reads, 304 and 206 responses."""
+    with _N_LOCK:
+        n = dict(_N)
+    return {"hot": _HOT.stats(), **n}
+
+
+@router.api_route("/{name}", methods=["GET", "HEAD"])
+async def audio(name: str, request: Request):
+    """One TTS cache entry, with ETag revalidation and byte ranges."""
+    m = _NAME_RE.match(name)
+    cache = get_cache()
+    path = await run_io(cache.get, m.group(1)) if m else None   # also marks the entry recently used
+    if path is None and m:
+        path = await run_io(cache.adopt, name)                  # stored by another uvicorn worker
+    if path is None or Path(path).name != name:
+        if m:
+            _HOT.discard(m.group(1))
+        raise HTTPException(status_code=404, detail="audio not found")
+    key = m.group(1)
+    _count("requests")
+    sha = (cache.meta(key) or {}).get("sha") or await run_io(cache.etag, key)
+    if not sha:
+        raise HTTPException(status_code=404, detail="audio not found")
+    etag = f'"{sha}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_MAX_AGE}", "Accept-Ranges": "bytes"}
+
+    inm = request.headers.get("if-none-match")
+    if inm and _etag_matches(inm, etag):
+        _count("not_modified")
+        return Response(status_code=304, headers=headers)
+
+    data = _HOT.get(key, sha)
+    if data is None:
+        try:
+            data = await run_io(_read, path)
+        except OSError:
+            raise HTTPException(status_code=404, detail="audio not found")
+        _count("disk_reads")
+        _HOT.put(key, sha, data)
+    else:
+        _count("hot_hits")
+
+    ctype = _TYPES.get(m.group(2)) or mimetypes.guess_type(name)[0] or "application/octet-stream"
+    size, status = len(data), 200
+    rng = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if rng and (not if_range or if_range.strip() == etag):
+        try:
+            span = byte_range(rng, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if span is not None:
+            first, last = span
+            data, status = data[first:last + 1], 206
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+            _count("partial")
+    if request.method == "HEAD":
+        return Response(status_code=status, media_type=ctype,
+                        headers={**headers, "Content-Length": str(len(data))})
+    return Response(content=data, status_code=status, media_type=ctype, headers=headers)
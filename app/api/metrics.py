@@ -0,0 +1,25 @@
+# app/api/metrics.py
+# Purpose: Live SLO view of the in-memory aggregates (app/ops/metrics.py) on both FastAPI apps:
+#   GET /api/ops/metrics                      JSON: per-route/per-stage p50/p95/p99, PKR per plan,
+#                                             cache hit rates
+#   GET /api/ops/metrics?format=prometheus    Prometheus text (also chosen for a scraper's
+#                                             Accept: text/plain)
+from __future__ import annotations
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.ops.metrics import get_metrics, prometheus
+
+router = APIRouter(prefix="/api/ops", tags=["ops"])
+
+
+@router.get("/metrics")
+def ops_metrics(request: Request, format: Optional[str] = Query(None, pattern="^(json|prometheus)$")):
+    """Rolling latency quantiles per route and stage, cost per plan, cache hit rates."""
+    snap = get_metrics().snapshot()
+    accept = request.headers.get("accept", "")
+    if format == "prometheus" or (format is None and "text/plain" in accept and "json" not in accept):
+        return PlainTextResponse(prometheus(snap), media_type="text/plain; version=0.0.4")
+    return snap
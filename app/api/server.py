@@ -1,16 +1,15 @@
 # app/api/server.py  — Urdu TTS + Indian English TTS (female) via ElevenLabs (opt-in) + SAPI fallback + persona "Sukoon"
 from __future__ import annotations
 
-import logging, hashlib, time, os, re, json, pathlib, tempfile, subprocess, shutil
+import asyncio, logging, hashlib, time, os, re, json, subprocess
 from time import perf_counter
 from typing import Dict, Any, Optional, Tuple
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-import urllib.request, urllib.error  # for ElevenLabs HTTP calls
 
 import yaml
-from fastapi import FastAPI, Body, Response, Request, UploadFile, File, HTTPException, Query, Form
+from fastapi import FastAPI, Body, Response, Request, UploadFile, File, HTTPException, Query, Form, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -18,8 +17,24 @@ from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.middleware import PIIRedactionMiddleware
+from app.api.audio import audio_url, router as audio_router
+from app.api.metrics import router as metrics_router
 # from app.agent.graph import plan_say   # removed per B1 patch
-from app.policies.term_gates import detect_route
+from app.safety.verdict import assess as assess_safety
+from app.runtime.pools import run_io, shutdown as shutdown_pools
+from app.audio.stt_service import STTBusy, get_stt
+from app.audio.tts.tts_cache import get_cache as get_tts_cache
+from app.audio.tts.prerender import prerender_static
+from app.audio.tts import tts_elevenlabs
+from app.runtime.providers import close_providers, provider_stats
+from app.ops.cost_meter import close_cost_writers
+from app.ops.metrics import get_metrics
+from app.ops.debug_sink import get_debug_sink
+from app.runtime.session_store import get_session_store
+from app.audio.tts.tts_workers import close_tts_workers, get_tts_workers, tts_workers_stats, workers_enabled
+from app.pipeline.replies import CRISIS_REPLY_URDU, REFUSE_FINANCE_EN, REFUSE_FINANCE_UR
+from app.voice.asr.whisper_stream import MockStreamingTranscriber, PartialSafetyGate, StreamingTranscriber, is_whisper_backend
+from app.voice.tts import tts_stream
 try:
     from app.graph.langgraph_pipeline import run as run_graph
 except Exception:
@@ -31,8 +46,20 @@ log = logging.getLogger("app.server")
 async def lifespan(app: FastAPI):
     logging.basicConfig(level=logging.INFO)
     log.info("Server starting...")
+    if os.getenv("SUKOON_STT", "").lower() == "whisper":
+        get_stt().start()  # load the replicas in the background, before the first voice turn
+    # Static utterance bank → TTS cache, in the background (SUKOON_TTS_PRERENDER=0 disables)
+    prerender = asyncio.ensure_future(prerender_static({"web": _prerender_web} if USE_TTS_FALLBACK else None))
     yield
     log.info("Server stopping...")
+    prerender.cancel()
+    await close_providers()
+    shutdown_pools()
+    get_stt().close()
+    close_tts_workers()
+    get_tts_cache().flush()
+    close_cost_writers()  # buffered cost rows → costs_daily.csv
+    get_debug_sink().close()
 
 app = FastAPI(title="SukoonAI", lifespan=lifespan)
 app.add_middleware(PIIRedactionMiddleware)
@@ -48,6 +75,8 @@ if os.path.isdir(_DEMO_DIR):
     app.mount("/static", StaticFiles(directory=_DEMO_DIR), name="static")
 if os.path.isdir("artifacts"):
     app.mount("/media", StaticFiles(directory="artifacts"), name="media")
+app.include_router(audio_router)   # /api/audio/<key>: TTS cache entries with ETag + Range
+app.include_router(metrics_router)  # /api/ops/metrics: live latency/cost aggregates (JSON, Prometheus)
 
 # ---------------- Feature flags & persona ----------------
 ENABLE_VOICE_TURN = os.getenv("SUKOON_ENABLE_VOICE_TURN", "0") == "1"
@@ -61,6 +90,18 @@ GRAPH_ON          = (os.getenv("SUKOON_GRAPH", "on").lower() != "off")
 AGENT_NAME        = os.getenv("SUKOON_AGENT_NAME", "Sukoon")
 AGENT_NAME_UR     = os.getenv("SUKOON_AGENT_NAME_UR", "سکون")
 
+# Server-side language/tone hints appended to the user's text before run_turn
+# (run_turn's safety checks use the request verdict on the user's text, not these)
+_HINT_EN    = f"\n\nRespond ONLY in English. If steps are requested, give 3 short numbered steps. Keep it concise. Introduce yourself briefly as {AGENT_NAME} only when explicitly asked."
+_HINT_UR    = f"\n\nبراہ کرم صرف اردو میں جواب دیں۔ اگر اقدامات مانگے جائیں تو 3 مختصر، نمبر شدہ قدم دیں۔ اپنا تعارف صرف سوال ہو تو {AGENT_NAME_UR} کے طور پر دیں۔"
+_HINT_ROMAN = "Reply in Roman Urdu (Latin script) — not Urdu script. Keep sentences short and supportive.\n\n"
+_TONE_EN    = "\n\nTone: supportive female coach. Use plain, active sentences."
+_TONE_UR    = "\n\nلہجہ: نرم، پرسکون اور حوصلہ افزا — جیسے ایک سمجھدار دوست (female)."
+
+# Term-gate finance refusals (text turn + voice socket)
+_REFUSE_FIN_EN = REFUSE_FINANCE_EN
+_REFUSE_FIN_UR = REFUSE_FINANCE_UR
+
 # English (India) preference + exact-name overrides
 EN_IN_CULTURE     = os.getenv("SUKOON_TTS_EN_CULTURE", "en-IN")
 EN_FORCE_NAME     = os.getenv("SUKOON_TTS_EN_NAME", "").strip()
@@ -82,13 +123,9 @@ def ui():
         "expected_paths": [str(primary), str(legacy)],
     }
 
+# Consent records and plan usage live in the shared session store (SUKOON_SESSION_STORE), with TTLs
 _CONSENT_TTL_S = 3600 * 4
-_consent_map: Dict[str, Dict[str, Any]] = {}
-def _purge_expired() -> None:
-    ts = time.time()
-    for sid, rec in list(_consent_map.items()):
-        if ts - rec.get("ts", 0) > _CONSENT_TTL_S:
-            _consent_map.pop(sid, None)
+_PLAN_USAGE_TTL_S = 2 * 86400   # a day's counter outlives the day by one
 
 class ConsentIn(BaseModel):
     session_id: str
@@ -153,16 +190,24 @@ def debug_gates(q: Optional[str] = Query(default=None, description="probe text")
             out["probe_error"] = str(e)
     return out
 
+@app.get("/api/debug/turns")
+def debug_turns(n: int = Query(default=10, ge=1, le=1000)):
+    """Last sampled /api/web/turn results, newest first (404 unless SUKOON_DEBUG_TURNS > 0)."""
+    sink = get_debug_sink()
+    if not sink.enabled:
+        raise HTTPException(status_code=404, detail="Not found")
+    return {"stats": sink.stats(), "turns": sink.recent(n)}
+
 @app.post("/consent")
 def consent(c: ConsentIn):
-    _purge_expired()
-    _consent_map[c.session_id] = {"agree": c.agree, "locale": c.locale, "ts": time.time()}
+    get_session_store().set("consent", c.session_id, {"agree": c.agree, "locale": c.locale, "ts": time.time()},
+                            ttl_s=_CONSENT_TTL_S)
     return {"ok": True, "meta": {"consent": c.agree, "session_id": c.session_id}}
 
 try:
-    from app.pipeline.turn import run_turn
+    from app.pipeline.turn import run_turn, arun_turn
 except Exception:
-    run_turn = None
+    run_turn = arun_turn = None
 
 class TurnIn(BaseModel):
     text: str
@@ -183,7 +228,30 @@ def _cap(plan: str) -> int:
     except Exception:
         return 15
 
-_PLAN_USAGE: Dict[Tuple[str, str], int] = {}
+def _plan_consume(user_id: str, plan: str, consume: int = 1) -> Optional[Dict[str, Any]]:
+    """
+    Charge `consume` plan minutes for today; returns the cap-reached reply instead when over.
+    Blocking (SQLite store: BEGIN IMMEDIATE with a busy timeout): async callers use run_io.
+    """
+    today   = time.strftime("%Y%m%d")
+    capm    = _cap(plan)
+    store   = get_session_store()
+    if store.incr("plan_usage", f"{user_id}:{today}", consume, ttl_s=_PLAN_USAGE_TTL_S, limit=capm) is None:
+        used = int(store.get("plan_usage", f"{user_id}:{today}", 0))
+        over = {"user": user_id, "plan": plan, "cap_minutes": capm, "day": today, "used": used, "would_use": used + consume}
+        return {
+            "ok": True,
+            "route": "abstain",
+            "answer": f"Plan cap reached for {plan}. Please upgrade to continue today.",
+            "abstain": True,
+            "overage": over,
+        }
+    return None
+
+def _save_upload(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as wf:
+        wf.write(data)
 
 def _cap_and_shape_evidence(items, cap: int = 3):
     if not items:
@@ -288,110 +356,59 @@ def _urdu_to_roman(s: str) -> str:
         out = ''.join(ch if ch < '\u0600' or ch > '\u06FF' else ' ' for ch in out)
     return re.sub(r'\s{2,}', ' ', out).strip()
 
-# ---- ElevenLabs TTS helpers ----
-def _tts_urdu_elevenlabs(text: str) -> Optional[str]:
-    try:
-        api_key  = os.getenv("SUKOON_TTS_API_KEY", "").strip()
-        voice_id = os.getenv("SUKOON_TTS_UR_VOICEID", "").strip()
-        if not api_key or not voice_id:
-            return None
-        base = Path("artifacts") / "audio" / "tts" / time.strftime("%Y%m%d")
-        base.mkdir(parents=True, exist_ok=True)
-        stem = time.strftime("%H%M%S_") + hashlib.sha1(text.encode("utf-8","ignore")).hexdigest()[:8]
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        body = json.dumps({
-            "text": text,
-            "model_id": "eleven_multilingual_v2",
-            "voice_settings": { "stability": 0.4, "similarity_boost": 0.8 }
-        }).encode("utf-8")
-        req = urllib.request.Request(url, data=body, method="POST")
-        req.add_header("xi-api-key", api_key)
-        req.add_header("Content-Type", "application/json")
-        req.add_header("Accept", "audio/wav")
-        try:
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                audio = resp.read(); ctype = resp.headers.get("Content-Type","").lower()
-        except urllib.error.HTTPError:
-            url2 = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
-            req2 = urllib.request.Request(url2, data=body, method="POST")
-            req2.add_header("xi-api-key", api_key)
-            req2.add_header("Content-Type", "application/json")
-            req2.add_header("Accept", "audio/wav")
-            with urllib.request.urlopen(req2, timeout=60) as resp2:
-                audio = resp2.read(); ctype = resp2.headers.get("Content-Type","").lower()
-        if "wav" in ctype:
-            out_wav = base / f"{stem}.wav"; out_wav.write_bytes(audio)
-            return str(out_wav).replace("\\","/") if out_wav.stat().st_size > 256 else None
-        out_mp3 = base / f"{stem}.mp3"; out_mp3.write_bytes(audio)
-        if out_mp3.stat().st_size <= 256: return None
-        ff = shutil.which("ffmpeg")
-        if ff:
-            out_wav = base / f"{stem}.wav"
-            cmd = [ff, "-y", "-hide_banner", "-loglevel", "error", "-i", str(out_mp3),
-                   "-ar", "22050", "-ac", "1", "-c:a", "pcm_s16le", str(out_wav)]
-            subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if out_wav.exists() and out_wav.stat().st_size > 256:
-                return str(out_wav).replace("\\","/")
-        return str(out_mp3).replace("\\","/")
-    except Exception as e:
-        log.warning("ElevenLabs Urdu TTS error: %s", e)
-        return None
-
-def _tts_en_elevenlabs(text: str) -> Optional[str]:
-    try:
-        api_key  = os.getenv("SUKOON_TTS_API_KEY", "").strip()
-        voice_id = os.getenv("SUKOON_TTS_EN_VOICEID", "").strip()
-        if not api_key or not voice_id:
-            return None
-        base = Path("artifacts") / "audio" / "tts" / time.strftime("%Y%m%d")
-        base.mkdir(parents=True, exist_ok=True)
-        stem = time.strftime("%H%M%S_") + hashlib.sha1(text.encode("utf-8","ignore")).hexdigest()[:8]
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-        body = json.dumps({
-            "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": { "stability": 0.4, "similarity_boost": 0.8 }
-        }).encode("utf-8")
-        req = urllib.request.Request(url, data=body, method="POST")
-        req.add_header("xi-api-key", api_key)
-        req.add_header("Content-Type", "application/json")
-        req.add_header("Accept", "audio/wav")
-        try:
-            with urllib.request.urlopen(req, timeout=60) as resp:
-                audio = resp.read(); ctype = resp.headers.get("Content-Type","").lower()
-        except urllib.error.HTTPError:
-            url2 = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
-            req2 = urllib.request.Request(url2, data=body, method="POST")
-            req2.add_header("xi-api-key", api_key)
-            req2.add_header("Content-Type", "application/json")
-            req2.add_header("Accept", "audio/wav")
-            with urllib.request.urlopen(req2, timeout=60) as resp2:
-                audio = resp2.read(); ctype = resp2.headers.get("Content-Type","").lower()
-        if "wav" in ctype:
-            out_wav = base / f"{stem}.wav"; out_wav.write_bytes(audio)
-            return str(out_wav).replace("\\","/") if out_wav.stat().st_size > 256 else None
-        out_mp3 = base / f"{stem}.mp3"; out_mp3.write_bytes(audio)
-        if out_mp3.stat().st_size <= 256: return None
-        ff = shutil.which("ffmpeg")
-        if ff:
-            out_wav = base / f"{stem}.wav"
-            cmd = [ff, "-y", "-hide_banner", "-loglevel", "error", "-i", str(out_mp3),
-                   "-ar", "22050", "-ac", "1", "-c:a", "pcm_s16le", str(out_wav)]
-            subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if out_wav.exists() and out_wav.stat().st_size > 256:
-                return str(out_wav).replace("\\","/")
-        return str(out_mp3).replace("\\","/")
-    except Exception as e:
-        log.warning("ElevenLabs EN TTS error: %s", e)
-        return None
+# ---- ElevenLabs TTS ----
+# app/audio/tts/tts_elevenlabs.py: shared provider client (app/runtime/providers.py: keep-alive
+# pool, coalescing, circuit breaker) + the shared TTS cache. nowait=True (crisis) never waits.
 
 # ---- SAPI fallback ----
-def _sapi_fallback_tts(text: str, lang_hint: str = "en") -> Optional[str]:
+def _sapi_fallback_tts(text: str, lang_hint: str = "en", nowait: bool = False, pinned: bool = False) -> Optional[str]:
+    voice = UR_FORCE_NAME if lang_hint == "ur" else (EN_FORCE_NAME or EN_IN_CULTURE)
+    path, _hit = get_tts_cache().synth_cached(
+        lambda: _render_sapi_fallback(text, lang_hint), text, engine="sapi-ps",
+        voice=voice, rate=-2, lang=lang_hint, nowait=nowait, pinned=pinned or nowait)
+    return path
+
+async def _synth_answer(speak_text: str, lang_hint: str, urgent: bool = False, pinned: bool = False,
+                        timings: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    /api/web/turn TTS chain for one reply: ElevenLabs EN (SUKOON_TTS_EN_PROVIDER), ElevenLabs UR
+    (SUKOON_TTS_UR_PROVIDER), then SAPI. Returns (path, warning tag) or (None, None).
+    urgent=True (crisis): cached audio only, never a wait on synthesis.
+    `timings`: receives the ElevenLabs transcode figures (tts_format, tts_transcode_ms, tts_bytes_written).
+    """
+    if lang_hint == "en" and os.getenv("SUKOON_TTS_EN_PROVIDER","").lower() == "elevenlabs":
+        path = await tts_elevenlabs.synth(speak_text, "en", nowait=urgent, pinned=pinned, timings=timings)
+        if path:
+            return path, "tts_primary_elevenlabs_en"
+    if lang_hint == "ur" and os.getenv("SUKOON_TTS_UR_PROVIDER","").lower() == "elevenlabs":
+        path = await tts_elevenlabs.synth(speak_text, "ur", nowait=urgent, pinned=pinned, timings=timings)
+        if path:
+            return path, "tts_fallback_elevenlabs"
+    if urgent:
+        path = _sapi_fallback_tts(speak_text, lang_hint=lang_hint, nowait=True)
+    else:
+        path = await run_io(_sapi_fallback_tts, speak_text, lang_hint=lang_hint, pinned=pinned)
+    return (path, "tts_fallback_sapi") if path else (None, None)
+
+async def _prerender_web(text: str, lang: str) -> Optional[str]:
+    """Pre-render renderer (app/audio/tts/prerender.py) for the web TTS chain."""
+    if lang == "ur" and not ALLOW_URDU_TTS:
+        return None  # web_turn drops Urdu audio in this mode
+    path, _tag = await _synth_answer(text, lang, pinned=True)
+    return path
+
+def _render_sapi_fallback(text: str, lang_hint: str = "en") -> Optional[str]:
     try:
         base = Path("artifacts") / "audio" / "tts" / time.strftime("%Y%m%d")
         base.mkdir(parents=True, exist_ok=True)
         fname = time.strftime("%H%M%S_") + hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()[:8] + ".wav"
         wav_path = base / fname
+        if workers_enabled():
+            # resident System.Speech host (app/audio/tts/tts_workers.py): no PowerShell start-up per reply
+            path = get_tts_workers("sapi-ps").synth(
+                text, str(wav_path), voice=UR_FORCE_NAME if lang_hint == "ur" else EN_FORCE_NAME,
+                rate=-2, lang=lang_hint, culture=EN_IN_CULTURE)
+            return path if os.path.exists(path) and os.path.getsize(path) > 256 else None
         tmp_txt = base / (fname.replace(".wav", ".txt"))
         tmp_txt.write_text(text, encoding="utf-8")
 
@@ -478,54 +495,57 @@ def _sapi_fallback_tts(text: str, lang_hint: str = "en") -> Optional[str]:
         return None
 
 # ---- Optional STT (offline) via faster-whisper --------------------------------
-def _stt_transcribe(path: str, lang_hint: Optional[str] = None) -> str:
+async def _stt_transcribe(path: str, lang_hint: Optional[str] = None) -> str:
     """
-    If SUKOON_STT=whisper, attempt offline STT with faster-whisper.
-    Model name via SUKOON_STT_MODEL (default 'base'). Returns '' on failure.
+    If SUKOON_STT=whisper, transcribe with the shared faster-whisper replicas
+    (app/audio/stt_service; model via SUKOON_STT_MODEL). Returns '' on failure.
     Optionally pass lang_hint = 'en' or 'ur' to lock language.
+    Raises 503 when every replica is busy and the STT queue is full.
     """
     try:
-        from faster_whisper import WhisperModel
-        model_name = os.getenv("SUKOON_STT_MODEL", "base")
-        model = WhisperModel(model_name, device="cpu")
-        # Ensure *transcribe* (not translate); help Whisper stay in the requested language
-        kw = {"beam_size": 1, "vad_filter": True, "task": "transcribe"}
-        if lang_hint in ("en", "ur"):
-            kw["language"] = "en" if lang_hint == "en" else "ur"
-        segments, info = model.transcribe(path, **kw)
-        txt = " ".join(seg.text.strip() for seg in segments if getattr(seg, "text", "").strip())
-        return (txt or "").strip()
+        res = await get_stt().atranscribe(path, language=(lang_hint if lang_hint in ("en", "ur") else None))
+        return (res.get("text") or "").strip()
+    except STTBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         log.info("Whisper STT not used or failed: %s", e)
         return ""
 
+@app.get("/api/tts/cache/stats")
+def tts_cache_stats():
+    """Entries, bytes, hit rate and evictions of the shared TTS audio cache."""
+    return get_tts_cache().stats()
+
+@app.get("/api/tts/workers/stats")
+def tts_workers_stats_ep():
+    """Resident TTS engine workers: load time, queue depth, timeouts/restarts, avg synthesis time."""
+    return tts_workers_stats()
+
+@app.get("/api/providers/stats")
+def providers_stats():
+    """External providers: requests vs calls on the wire, coalesced requests, circuit breaker state."""
+    return provider_stats()
+
+@app.get("/api/stt/stats")
+def stt_stats():
+    """Replica load times, queue depth, busy replicas and counters of the shared STT service."""
+    return get_stt().stats()
+
 # ---------- Unified endpoint ----------
 @app.post("/api/web/turn")
 async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
-    assert run_turn is not None, "run_turn() not found; check app.pipeline.turn"
+    assert arun_turn is not None, "run_turn() not found; check app.pipeline.turn"
     _t0 = perf_counter()
 
     user_id = request.headers.get("X-User-Id", "demo")
     plan    = request.headers.get("X-Plan", "Free")
-    today   = time.strftime("%Y%m%d")
-    used    = int(_PLAN_USAGE.get((user_id, today), 0))
-    capm    = _cap(plan)
     try:
         consume = max(1, int(request.headers.get("X-Debug-Plan-Use", "1")))
     except Exception:
         consume = 1
-    next_used = used + consume
-    if next_used > capm:
-        over = {"user": user_id, "plan": plan, "cap_minutes": capm, "day": today, "used": used, "would_use": next_used}
-        return {
-            "ok": True,
-            "route": "abstain",
-            "answer": f"Plan cap reached for {plan}. Please upgrade to continue today.",
-            "abstain": True,
-            "overage": over,
-        }
-
-    _PLAN_USAGE[(user_id, today)] = next_used
+    capped = await run_io(_plan_consume, user_id, plan, consume)
+    if capped is not None:
+        return capped
 
     # ---------- Parse body ----------
     content_type = request.headers.get("content-type","").lower()
@@ -550,18 +570,14 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
             raise HTTPException(status_code=400, detail="audio file required")
 
         inc_dir = Path("artifacts") / "audio" / "incoming" / time.strftime("%Y%m%d")
-        inc_dir.mkdir(parents=True, exist_ok=True)
         ext = ".webm"
         fpath = inc_dir / (time.strftime("%H%M%S_") + (file.filename or "voice") )
         if not str(fpath).lower().endswith((".webm",".wav",".ogg",".mp3")):
             fpath = fpath.with_suffix(ext)
-        with open(fpath, "wb") as wf:
-            wf.write(await file.read())
+        upload = await file.read()
+        await run_io(_save_upload, fpath, upload)   # disk write off the event loop
         inbound_audio_path = str(fpath).replace("\\","/")
-        try:
-            small_in = os.path.getsize(fpath) <= 256
-        except Exception:
-            small_in = True
+        small_in = len(upload) <= 256
 
         # ---- STT
         if ui_lang in (None, "", "auto"):
@@ -571,7 +587,7 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
 
         body_text = ""
         if os.getenv("SUKOON_STT","").lower() == "whisper":
-            body_text = _stt_transcribe(str(fpath), lang_hint=("en" if lang_for_stub=="en" else "ur"))
+            body_text = await _stt_transcribe(str(fpath), lang_hint=("en" if lang_for_stub=="en" else "ur"))
             stt_text_for_echo = body_text or ""
         if not body_text:
             # Last-resort demo text; we’ll keep it only if the clip was truly tiny
@@ -603,19 +619,22 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
             raise HTTPException(status_code=415, detail="Unsupported Content-Type")
 
     # ---- Fast gates ----
-    gate = detect_route(body_text)
+    # One request-scoped verdict (term gates + SafetyRouter + run_turn regexes, one matcher pass);
+    # run_turn and run_graph read it instead of re-classifying the text.
+    verdict = assess_safety(body_text, language=("ur" if (_looks_urdu(body_text) or _wants_roman_urdu(body_text)) else "en"))
+    gate = verdict.gate
     if gate["route"] == "crisis":
+        get_metrics().observe("request", (perf_counter() - _t0) * 1000, "crisis")
         return {"route": "crisis", "abstain": False, "answer": "", "timings": {"handoff_ms": 0}, "evidence": [], "usage": {"total_tokens": 0}}
     if gate["route"] == "abstain":
-        _refuse_en = "I can’t provide investment predictions or trading tips."
-        _refuse_ur = "میں سرمایہ کاری سے متعلق پیش گوئیاں یا خرید/فروخت کی تجاویز فراہم نہیں کر سکتی۔"
-        _refusal = _refuse_en
+        _refusal = _REFUSE_FIN_EN
         try:
-            _looks_ur = _looks_urdu(body_text) or _wants_roman_urdu(body_text)
+            _looks_ur = verdict.language == "ur"
             if (ui_lang and str(ui_lang).lower() in ("ur","urdu","اردو")) or _looks_ur:
-                _refusal = _refuse_ur
+                _refusal = _REFUSE_FIN_UR
         except Exception:
             pass
+        get_metrics().observe("request", (perf_counter() - _t0) * 1000, "abstain")
         return {"route": "abstain", "abstain": True, "answer": _refusal,
                 "timings": {"handoff_ms": 0}, "evidence": [], "usage": {"total_tokens": 0}}
 
@@ -632,35 +651,46 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
     elif (not force_lock) and lang is None and (("urdu" in tx) or ("اردو" in body_text)):
         lang = "Urdu"
     if lang == "English":
-        hinted += f"\n\nRespond ONLY in English. If steps are requested, give 3 short numbered steps. Keep it concise. Introduce yourself briefly as {AGENT_NAME} only when explicitly asked."
+        hinted += _HINT_EN
     elif lang == "Urdu":
-        hinted += f"\n\nبراہ کرم صرف اردو میں جواب دیں۔ اگر اقدامات مانگے جائیں تو 3 مختصر، نمبر شدہ قدم دیں۔ اپنا تعارف صرف سوال ہو تو {AGENT_NAME_UR} کے طور پر دیں۔"
+        hinted += _HINT_UR
     if lang == "Urdu" and ( ((ui_script or "").lower() == "roman") or _wants_roman_urdu(body_text) ):
-        hinted = "Reply in Roman Urdu (Latin script) — not Urdu script. Keep sentences short and supportive.\n\n" + hinted
+        hinted = _HINT_ROMAN + hinted
 
     try:
         def _stable_bit(s: str) -> int:
             return hashlib.sha256(s.encode("utf-8", "ignore")).digest()[-1] & 1
         _h = 0 if DET_MODE else _stable_bit(body_text)
         if _h == 0 and lang == "English":
-            hinted += "\n\nTone: supportive female coach. Use plain, active sentences."
+            hinted += _TONE_EN
         elif _h == 1 and lang == "Urdu":
-            hinted += "\n\nلہجہ: نرم، پرسکون اور حوصلہ افزا — جیسے ایک سمجھدار دوست (female)."
+            hinted += _TONE_UR
     except Exception:
         pass
 
-    out = run_turn(hinted)
+    # The graph skeleton (sync BM25 retrieval) runs on the io pool while the LLM call is awaited
+    graph_job = None
+    if GRAPH_ON and callable(run_graph):
+        graph_job = asyncio.ensure_future(run_io(
+            run_graph,
+            text=body_text,
+            mode=req_mode,
+            ui_lang=ui_lang,
+            ui_script=ui_script,
+            predecided_route=gate.get("route"),
+            verdict=verdict,
+        ))
+    try:
+        out = await arun_turn(hinted, verdict=verdict)
+    except BaseException:
+        if graph_job is not None:
+            graph_job.cancel()
+        raise
 
     # ---- Phase-B: LangGraph skeleton (B1/B3) — attach graph & merge metrics/evidence
     try:
-        if GRAPH_ON and callable(run_graph):
-            g = run_graph(
-                text=body_text,
-                mode=req_mode,
-                ui_lang=ui_lang,
-                ui_script=ui_script,
-                predecided_route=gate.get("route"),
-            )
+        if graph_job is not None:
+            g = await graph_job
             # Attach graph; merge timings; and B3 pass-through (evidence + metrics incl. ckg)
             if isinstance(out, dict) and isinstance(g, dict):
                 # Keep full trace if available
@@ -746,48 +776,26 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
                 if not ALLOW_URDU_TTS and lang_hint == "ur":
                     lang_hint = "en"
 
-                # English first: ElevenLabs, then Urdu EL if requested, finally SAPI
-                if lang_hint == "en" and os.getenv("SUKOON_TTS_EN_PROVIDER","").lower() == "elevenlabs":
-                    elp_en = _tts_en_elevenlabs(speak_text)
-                    if elp_en:
-                        out["tts_path"] = elp_en
-                        try:
-                            fs = elp_en if os.path.isabs(elp_en) else os.path.join(".", elp_en.replace("/", os.sep))
-                            out.setdefault("timings", {})["tts_bytes"] = os.path.getsize(fs) if os.path.exists(fs) else 0
-                            out.setdefault("warnings", []).append("tts_primary_elevenlabs_en")
-                        except Exception:
-                            pass
-
-                if (not out.get("tts_path")) and lang_hint == "ur" and os.getenv("SUKOON_TTS_UR_PROVIDER","").lower() == "elevenlabs":
-                    elp = _tts_urdu_elevenlabs(speak_text)
-                    if elp:
-                        out["tts_path"] = elp
-                        try:
-                            fs = elp if os.path.isabs(elp) else os.path.join(".", elp.replace("/", os.sep))
-                            out.setdefault("timings", {})["tts_bytes"] = os.path.getsize(fs) if os.path.exists(fs) else 0
-                            out.setdefault("warnings", []).append("tts_fallback_elevenlabs")
-                        except Exception:
-                            pass
-
-                if not out.get("tts_path"):
-                    sapip = _sapi_fallback_tts(speak_text, lang_hint=lang_hint)
-                    if sapip:
-                        out["tts_path"] = sapip
-                        try:
-                            fs = sapip if os.path.isabs(sapip) else os.path.join(".", sapip.replace("/", os.sep))
-                            out.setdefault("timings", {})["tts_bytes"] = os.path.getsize(fs) if os.path.exists(fs) else 0
-                            out.setdefault("warnings", []).append("tts_fallback_sapi")
-                        except Exception:
-                            pass
+                # Crisis replies only take cached audio (rendered in the background on a miss).
+                tts_path, tts_tag = await _synth_answer(speak_text, lang_hint, urgent=out.get("route") == "crisis",
+                                                        timings=out.setdefault("timings", {}))
+                if tts_path:
+                    out["tts_path"] = tts_path
+                    try:
+                        fs = tts_path if os.path.isabs(tts_path) else os.path.join(".", tts_path.replace("/", os.sep))
+                        out.setdefault("timings", {})["tts_bytes"] = os.path.getsize(fs) if os.path.exists(fs) else 0
+                        out.setdefault("warnings", []).append(tts_tag)
+                    except Exception:
+                        pass
     except Exception as e:
         out.setdefault("warnings", []).append(f"tts_chain_error:{e.__class__.__name__}")
 
-    # ---- Cache-busted media URL for browser (avoid duplicate/old audio) ----
+    # ---- Media URL for the browser: cache entries are content-addressed (ETag), no cache-buster ----
     try:
         if out.get("tts_path"):
-            rel = out["tts_path"].replace("\\","/")
-            if rel.startswith("artifacts/"):
-                out["tts_url"] = "/media/" + rel.split("artifacts/",1)[-1] + f"?v={int(time.time()*1000)}"
+            url = audio_url(out["tts_path"], "/media/")
+            if url:
+                out["tts_url"] = url
     except Exception:
         pass
 
@@ -857,19 +865,15 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
     except Exception:
         pass
 
-    # ---- Breadcrumb to artifacts/ICP/last_turn.json (rich out incl. metrics) ----
+    # ---- Debug breadcrumb: opt-in, sampled, in memory (+ async last_turn.json); see app/ops/debug_sink.py ----
     try:
         total_ms = int(round((perf_counter() - _t0) * 1000))
         m = out.setdefault("metrics", {})
         if not isinstance(m, dict): out["metrics"] = m = {}
         m.setdefault("total_ms", total_ms)
         out.setdefault("warnings", [])
-
-        out_dir = pathlib.Path("artifacts/ICP"); out_dir.mkdir(parents=True, exist_ok=True)
-        final_path = out_dir / "last_turn.json"
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=str(out_dir), prefix="last_turn.", suffix=".json", encoding="utf-8") as tf:
-            json.dump(out, tf, ensure_ascii=False, indent=2); temp_name = tf.name
-        os.replace(temp_name, final_path)
+        get_metrics().observe("request", total_ms, out.get("route"))  # end-to-end, incl. server-side TTS
+        get_debug_sink().record(out)
     except Exception:
         pass
 
@@ -887,3 +891,180 @@ async def web_turn(request: Request, response: Response) -> Dict[str, Any]:
             out["stt_text"] = stt_text_for_echo
 
     return out
+
+
+# ---------- Duplex voice socket ----------
+# /api/voice/ws?ui_lang=en|ur|auto   (X-User-Id / X-Plan headers as for /api/web/turn)
+# in : binary PCM frames (s16le mono at configs/voice.yaml rate, 20 ms), or JSON text:
+#        {"type":"start","ui_lang":..}  new utterance     {"type":"end"}  utterance finished
+#        {"type":"text","text":..}      typed utterance
+# out: {"type":"partial"|"final","text","stable","audio_ms"}   hypotheses as they arrive
+#      {"type":"audio","index","text","bytes"} + one binary WAV message, per sentence, sent
+#                                                  while the LLM is still generating later ones
+#      {"type":"answer","route","text"}                        full reply text (crisis/abstain:
+#                                                              sent first, before any audio)
+#      {"type":"done","route","metrics":{stt_final_ms, llm_ms, first_token_ms, first_audio_ms, tts_ms, total_ms}}
+# A crisis on a partial hypothesis is answered at once (before any plan-cap check, never charged);
+# the rest of that utterance is dropped. Crisis audio is cached-or-nothing, as in run_turn.
+# Time-to-first-audio = end of speech (or crisis detection) → first sentence's WAV sent.
+def _ws_lang(v: Optional[str]) -> Optional[str]:
+    v = str(v or "").lower()
+    if v in ("en", "english"): return "en"
+    if v in ("ur", "urdu", "اردو"): return "ur"
+    return None
+
+async def _speak(ws: WebSocket, sentences: "asyncio.Queue[Optional[str]]", lang: str,
+                 t_end: float, stats: Dict[str, Any], **tts_kw: Any) -> None:
+    """
+    Synthesize queued sentences in order and send each WAV as soon as it exists (None ends).
+    A TTS failure drops that sentence's audio only. tts_kw: pinned / nowait (crisis: cache lookup
+    only, not queued behind the io pool).
+    """
+    i = 0
+    while True:
+        sentence = await sentences.get()
+        if sentence is None:
+            return
+        t = perf_counter()
+        try:
+            if tts_kw.get("nowait"):
+                wav = tts_stream.synthesize(sentence, lang, **tts_kw)
+            else:
+                wav = await run_io(tts_stream.synthesize, sentence, lang, **tts_kw)
+        except Exception as e:
+            log.warning("voice ws tts failed for sentence %d: %s: %s", i, type(e).__name__, e)
+            wav = b""
+        stats["tts_ms"] += int((perf_counter() - t) * 1000)
+        if wav:
+            await ws.send_json({"type": "audio", "index": i, "text": sentence, "bytes": len(wav)})
+            await ws.send_bytes(wav)
+            if stats["first_audio_ms"] is None:
+                stats["first_audio_ms"] = int((perf_counter() - t_end) * 1000)
+        i += 1
+
+async def _voice_reply(ws: WebSocket, verdict, lang: Optional[str], t_end: float, stt_final_ms: int = 0) -> None:
+    """
+    LLM tokens stream through the sentence segmenter (arun_turn(on_sentence=...)); each finished
+    sentence is queued for TTS while later ones are still generating.
+    """
+    text = verdict.text
+    lang = lang or ("ur" if (_looks_urdu(text) or _wants_roman_urdu(text)) else "en")
+    sentences: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+    stats: Dict[str, Any] = {"tts_ms": 0, "first_audio_ms": None}
+    metrics: Dict[str, Any] = {}
+    route = verdict.route
+    if route in ("crisis", "abstain"):
+        # Fixed reply: the text goes out before any audio, so a slow or failing TTS can't hold it back.
+        answer = CRISIS_REPLY_URDU if route == "crisis" else (_REFUSE_FIN_UR if lang == "ur" else _REFUSE_FIN_EN)
+        await ws.send_json({"type": "answer", "route": route, "text": answer})
+        tts_kw = {"nowait": True, "pinned": True} if route == "crisis" else {"pinned": True}
+        for sentence in tts_stream.split_sentences(answer):
+            sentences.put_nowait(sentence)
+        sentences.put_nowait(None)
+        await _speak(ws, sentences, "ur" if route == "crisis" else lang, t_end, stats, **tts_kw)
+    else:
+        speaker = asyncio.ensure_future(_speak(ws, sentences, lang, t_end, stats))
+        try:
+            out = await arun_turn(text + (_HINT_UR if lang == "ur" else _HINT_EN), lang_hint=lang,
+                                  verdict=verdict, on_sentence=sentences.put_nowait)
+            route, answer = str(out.get("route") or "assist"), (out.get("answer") or "").strip()
+            metrics = out.get("metrics") or {}
+        finally:
+            sentences.put_nowait(None)
+            await speaker
+        await ws.send_json({"type": "answer", "route": route, "text": answer})
+    await ws.send_json({"type": "done", "route": route, "metrics": {
+        "stt_final_ms": stt_final_ms,
+        "llm_ms": int(metrics.get("llm_ms") or 0),
+        "first_token_ms": metrics.get("first_token_ms"),
+        "first_audio_ms": stats["first_audio_ms"],
+        "tts_ms": stats["tts_ms"],
+        "total_ms": int((perf_counter() - t_end) * 1000),
+    }})
+
+@app.websocket("/api/voice/ws")
+async def voice_ws(ws: WebSocket):
+    await ws.accept()
+    lang = _ws_lang(ws.query_params.get("ui_lang"))
+    user_id = ws.headers.get("x-user-id", "demo")
+    plan    = ws.headers.get("x-plan", "Free")
+    stt: Optional[Any] = None       # StreamingTranscriber / MockStreamingTranscriber (per asr_backend)
+    gate: Optional[PartialSafetyGate] = None
+    answered = False  # crisis already handled for this utterance
+
+    async def hyp_out(hyp: Dict[str, Any]) -> None:
+        await ws.send_json({"type": "final" if hyp.get("final") else "partial", "text": hyp.get("text", ""),
+                            "stable": hyp.get("stable", ""), "audio_ms": hyp.get("audio_ms", 0)})
+
+    async def reply(verdict, t_end: float, stt_final_ms: int = 0) -> None:
+        if verdict.route == "crisis":   # never capped, never charged
+            await _voice_reply(ws, verdict, lang, t_end, stt_final_ms)
+            return
+        capped = await run_io(_plan_consume, user_id, plan)
+        if capped is not None:
+            await ws.send_json({"type": "answer", "route": "abstain", "text": capped["answer"], "overage": capped["overage"]})
+            await ws.send_json({"type": "done", "route": "abstain", "metrics": {}})
+            return
+        await _voice_reply(ws, verdict, lang, t_end, stt_final_ms)
+
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg.get("type") == "websocket.disconnect":
+                break
+            try:
+                if msg.get("bytes") is not None:
+                    if answered:
+                        continue
+                    if stt is None:
+                        asr = StreamingTranscriber if is_whisper_backend() else MockStreamingTranscriber
+                        stt, gate = asr(language=lang), PartialSafetyGate(lang)
+                    for hyp in await stt.apush(msg["bytes"]):
+                        gate.check(hyp)
+                        await hyp_out(hyp)
+                        if hyp.get("crisis"):
+                            answered = True
+                            await reply(gate.verdict, perf_counter())
+                            break
+                    continue
+
+                try:
+                    ctl = json.loads(msg.get("text") or "{}")
+                except Exception:
+                    await ws.send_json({"type": "error", "detail": "invalid JSON"})
+                    continue
+                kind = ctl.get("type")
+                if kind == "start":
+                    lang = _ws_lang(ctl.get("ui_lang")) or lang
+                    stt, gate, answered = None, None, False
+                elif kind == "end":
+                    if stt is not None and not answered:
+                        t_end = perf_counter()
+                        for hyp in await stt.aflush():
+                            gate.check(hyp)
+                            await hyp_out(hyp)
+                        stt_final_ms = int((perf_counter() - t_end) * 1000)
+                        if gate.verdict is not None and gate.verdict.text.strip():
+                            await reply(gate.verdict, t_end, stt_final_ms)
+                        else:
+                            await ws.send_json({"type": "error", "detail": "no speech"})
+                    stt, gate, answered = None, None, False
+                elif kind == "text":
+                    text = str(ctl.get("text") or "").strip()
+                    if text:
+                        await reply(assess_safety(text, language=lang), perf_counter())
+                else:
+                    await ws.send_json({"type": "error", "detail": f"unknown message type: {kind}"})
+            except (WebSocketDisconnect, STTBusy):
+                raise
+            except Exception as e:
+                # One failed utterance (STT model unavailable, TTS/LLM error) ends that utterance,
+                # not the socket; the rest of a failed spoken utterance is dropped until "end"/"start".
+                log.warning("voice ws utterance failed: %s: %s", type(e).__name__, e)
+                await ws.send_json({"type": "error", "detail": f"utterance failed: {type(e).__name__}"})
+                stt, gate, answered = None, None, msg.get("bytes") is not None
+    except WebSocketDisconnect:
+        pass
+    except STTBusy as e:
+        await ws.send_json({"type": "error", "detail": str(e), "retry_after_s": 1})
+        await ws.close(code=1013)  # try again later
@@ -1,30 +1,41 @@
 from typing import Dict, Any, List, Optional
 import os
-from faster_whisper import WhisperModel
+
+try:
+    from faster_whisper import WhisperModel  # optional: voice STT only
+except Exception:
+    WhisperModel = None
 
 class STTEngine:
     """
-    Minimal wrapper around faster-whisper.
+    Minimal wrapper around faster-whisper (one loaded model).
     Defaults to CPU-friendly settings; configurable via env:
       STT_MODEL  (e.g., "small", "medium", "large-v3")
       STT_DEVICE ("cpu" or "cuda")
       STT_COMPUTE ("int8", "int8_float16", "float16", "float32")
+    Request paths should not build one of these per call: use the shared replicas in
+    app/audio/stt_service.get_stt().
     """
 
-    def __init__(self) -> None:
-        model_size = os.getenv("STT_MODEL", "small")         # multilingual, good for Urdu
-        device     = os.getenv("STT_DEVICE", "cpu")
-        compute    = os.getenv("STT_COMPUTE", "int8")        # CPU-friendly
+    def __init__(self, model_size: Optional[str] = None, device: Optional[str] = None,
+                 compute: Optional[str] = None, cpu_threads: int = 0) -> None:
+        if WhisperModel is None:
+            raise RuntimeError("voice STT requires `pip install faster-whisper`")
+        model_size = model_size or os.getenv("STT_MODEL", "small")   # multilingual, good for Urdu
+        device     = device or os.getenv("STT_DEVICE", "cpu")
+        compute    = compute or os.getenv("STT_COMPUTE", "int8")     # CPU-friendly
 
-        self._model = WhisperModel(model_size, device=device, compute_type=compute)
+        self._model = WhisperModel(model_size, device=device, compute_type=compute, cpu_threads=cpu_threads)
 
-    def transcribe_file(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+    def transcribe_file(self, path: Any, language: Optional[str] = None) -> Dict[str, Any]:
+        """`path`: audio file, or a 16 kHz mono float32 array (streaming ASR)."""
         # beam_size=1 keeps it fast for MVP; we can tune later
         segments, info = self._model.transcribe(
             path,
             beam_size=1,
             language=language,          # None = auto-detect
-            vad_filter=True
+            vad_filter=True,
+            task="transcribe",          # never translate
         )
         segs: List[Dict[str, Any]] = []
         text_parts: List[str] = []
@@ -0,0 +1,101 @@
+# app/audio/stt_service.py
+# Purpose: One process-wide STT service: N pre-loaded faster-whisper replicas (STTEngine), each
+# owned by a worker thread that pulls jobs from one bounded queue. A voice turn never loads a
+# model; when every replica is busy and the queue is full, transcribe() fails fast with STTBusy
+# (backpressure) instead of piling up work.
+#
+# Sizing (env):
+#   SUKOON_STT_REPLICAS   loaded models (default: cpu_count // 2, at least 1)
+#   SUKOON_STT_QUEUE      waiting jobs before STTBusy (default: 4 per replica)
+#   SUKOON_STT_MODEL / STT_MODEL, STT_DEVICE, STT_COMPUTE   model settings (see STTEngine)
+# Each replica gets cpu_count // replicas CTranslate2 threads, so the pool as a whole uses
+# about one thread per core. Threads (not processes): decode releases the GIL.
+# Queue, workers and stats: app/runtime/worker_pool.BoundedWorkerPool.
+from __future__ import annotations
+import asyncio, logging, os, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.ops.metrics import get_metrics
+from app.runtime.worker_pool import BoundedWorkerPool
+
+log = logging.getLogger("app.stt")
+
+
+class STTBusy(RuntimeError):
+    """The STT queue is full; retry later (HTTP 503)."""
+
+
+def _default_replicas() -> int:
+    return max(1, int(os.getenv("SUKOON_STT_REPLICAS", str(max(1, (os.cpu_count() or 2) // 2)))))
+
+
+def _engine_factory(replicas: int) -> Callable[[int], Any]:
+    def make(_: int):
+        from app.audio.stt_faster_whisper import STTEngine
+        threads = max(1, (os.cpu_count() or 1) // replicas)
+        return STTEngine(model_size=os.getenv("SUKOON_STT_MODEL") or None, cpu_threads=threads)
+    return make
+
+
+class STTService(BoundedWorkerPool):
+    """Queue-backed transcription over pre-loaded replicas; see module header."""
+
+    busy_error = STTBusy
+    label = "STT"
+    run_stat = "avg_transcribe_ms"
+
+    def __init__(self, replicas: Optional[int] = None, max_queue: Optional[int] = None,
+                 engine_factory: Optional[Callable[[int], Any]] = None):
+        replicas = int(replicas or _default_replicas())
+        super().__init__("stt", replicas, int(max_queue or os.getenv("SUKOON_STT_QUEUE", "0") or 0) or 4 * replicas)
+        self.replicas = self.workers
+        self._factory = engine_factory or _engine_factory(self.replicas)
+        self._loaded = 0
+
+    def _load(self, i: int) -> Any:
+        engine = self._factory(i)
+        with self._lock:
+            self._loaded += 1
+        log.info("STT replica %d loaded", i)
+        return engine
+
+    def _run(self, i: int, job: Tuple[str, Optional[str]], t_enq: float, t_start: float) -> Dict[str, Any]:
+        engine = self._state[i]
+        if engine is None:
+            raise RuntimeError(f"STT model unavailable: {self.load_error}")
+        path, language = job
+        res = engine.transcribe_file(path, language=language)
+        res["queue_ms"] = round((t_start - t_enq) * 1000, 1)
+        res["transcribe_ms"] = round((time.perf_counter() - t_start) * 1000, 1)
+        get_metrics().observe("stt", res["transcribe_ms"])
+        return res
+
+    # ---------- API ----------
+    def submit(self, path: str, language: Optional[str] = None) -> "Future[Dict[str, Any]]":
+        return super().submit((path, language))
+
+    def transcribe(self, path: str, language: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """STTEngine.transcribe_file result (+ queue_ms / transcribe_ms); raises STTBusy when saturated."""
+        return self.submit(path, language).result(timeout)
+
+    async def atranscribe(self, path: str, language: Optional[str] = None) -> Dict[str, Any]:
+        return await asyncio.wrap_future(self.submit(path, language))
+
+    def stats(self) -> Dict[str, Any]:
+        st = super().stats()
+        with self._lock:
+            return {"replicas": self.replicas, "loaded": self._loaded, **st}
+
+
+_SERVICE: Optional[STTService] = None
+_SERVICE_LOCK = threading.Lock()
+
+def get_stt() -> STTService:
+    """Process-wide STTService (created on first use; call .start() at startup to preload)."""
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = STTService()
+    return _SERVICE
@@ -0,0 +1,86 @@
+# app/audio/transcode.py
+# Purpose: In-memory audio transcoding for provider TTS, so a reply is written to disk once,
+# complete, and can be served straight away (no MP3 file → ffmpeg → WAV file round trip):
+#   raw PCM (s16le mono)  → WAV header built in memory (wav_header / pcm_to_wav)
+#   WAV                   → as is
+#   MP3                   → decoded in-process with miniaudio (optional: pip install miniaudio),
+#                           else ffmpeg over stdin/stdout pipes (no temp files), else left as MP3
+from __future__ import annotations
+import os, shutil, struct, subprocess, tempfile
+from typing import Optional, Tuple
+
+try:
+    import miniaudio  # optional in-process MP3 decoder
+    _MINIAUDIO_OK = True
+except Exception:
+    miniaudio = None
+    _MINIAUDIO_OK = False
+
+
+def sniff(data: bytes) -> str:
+    """'wav', 'mp3' or 'pcm' (anything without a known container header)."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "pcm"
+
+
+def wav_header(n_bytes: int, rate: int, channels: int = 1, width: int = 2) -> bytes:
+    """44-byte canonical PCM WAV header for `n_bytes` of sample data."""
+    block = channels * width
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + n_bytes, b"WAVE", b"fmt ", 16, 1, channels,
+                       rate, rate * block, block, width * 8, b"data", n_bytes)
+
+
+def pcm_to_wav(pcm: bytes, rate: int, channels: int = 1, width: int = 2) -> bytes:
+    pcm = pcm[: len(pcm) - len(pcm) % (channels * width)]
+    return wav_header(len(pcm), rate, channels, width) + pcm
+
+
+def mp3_to_wav(data: bytes, rate: int) -> Tuple[Optional[bytes], str]:
+    """(WAV bytes, decoder) — decoder 'miniaudio' or 'ffmpeg'; (None, '') when neither is available."""
+    if _MINIAUDIO_OK:
+        snd = miniaudio.decode(data, output_format=miniaudio.SampleFormat.SIGNED16, nchannels=1, sample_rate=rate)
+        return pcm_to_wav(snd.samples.tobytes(), rate), "miniaudio"
+    ff = shutil.which("ffmpeg")
+    if ff:
+        res = subprocess.run([ff, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le",
+                              "-ar", str(rate), "-ac", "1", "pipe:1"], input=data, capture_output=True, timeout=30)
+        if res.returncode == 0 and res.stdout:
+            return pcm_to_wav(res.stdout, rate), "ffmpeg"
+    return None, ""
+
+
+def to_wav(data: bytes, rate: int, ctype: str = "") -> Tuple[bytes, str]:
+    """
+    Provider audio → (bytes to store, format). The Content-Type wins over sniffing (raw PCM can
+    start with MP3-sync-like bytes). format: 'wav', 'pcm' (wrapped), 'mp3:<decoder>' or 'mp3'
+    when no decoder is available (the MP3 is stored as is).
+    """
+    ctype = (ctype or "").lower()
+    kind = "mp3" if ("mpeg" in ctype or "mp3" in ctype) else "pcm" if "pcm" in ctype else sniff(data)
+    if kind == "wav":
+        return data, "wav"
+    if kind == "pcm":
+        return pcm_to_wav(data, rate), "pcm"
+    wav, how = mp3_to_wav(data, rate)
+    return (wav, f"mp3:{how}") if wav else (data, "mp3")
+
+
+def write_once(path: str, data: bytes) -> int:
+    """Write `data` to `path` atomically (readers never see a partial file); returns bytes written."""
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return len(data)
@@ -0,0 +1,163 @@
+# app/audio/tts/prerender.py
+# Purpose: Render the static utterance bank into the TTS cache (tts_cache.py) before the first
+# turn, so those lines are served with no synthesis latency. The bank:
+#   configs/tts_cache.yaml              `utterances` (box breathing, 5-4-3-2-1 in en/ur)
+#   app/policies/refusals_ur_en.yaml    every refusal and crisis template (en + ur)
+#   app/pipeline/replies.py             fixed turn / fast-gate replies (crisis, abstain, fallback)
+#   app.agent.graph.static_say_lines()  crisis voice lines + the mock planner's canned lines
+# Each line is rendered with every engine the deployment speaks with (a "renderer": the turn's
+# SAPI engine, the voice socket's sentence-by-sentence backend, the web TTS chain when the
+# server registers it), in parallel (SUKOON_TTS_PRERENDER_WORKERS, default 4), and pinned so
+# eviction never drops it.
+#
+# Startup: the server lifespan and the runtime startup hook run prerender_static() in the
+# background (SUKOON_TTS_PRERENDER=0 disables). Offline: python -m app.audio.tts.prerender
+from __future__ import annotations
+import argparse, asyncio, json, logging, os, time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .tts_cache import normalize_text
+
+log = logging.getLogger("app.tts_prerender")
+
+_BANK = "configs/tts_cache.yaml"
+_REFUSALS = "app/policies/refusals_ur_en.yaml"
+
+Renderer = Callable[[str, str], Awaitable[Any]]   # (text, lang) -> truthy when audio is cached
+
+
+@dataclass(frozen=True)
+class StaticLine:
+    key: str
+    lang: str
+    text: str
+
+
+def _yaml(path: str) -> Dict[str, Any]:
+    try:
+        import yaml
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return yaml.safe_load(f) or {}
+    except Exception as e:
+        log.warning("cannot read %s: %s", path, e)
+        return {}
+
+
+def bank_utterances(path: str = _BANK) -> List[StaticLine]:
+    out = []
+    for u in _yaml(path).get("utterances") or []:
+        if isinstance(u, dict) and u.get("text"):
+            out.append(StaticLine(f"bank.{u.get('key')}", str(u.get("lang") or "en"), str(u["text"])))
+    return out
+
+
+def refusal_templates(path: str = _REFUSALS) -> List[StaticLine]:
+    out = []
+    for sect, keys in (_yaml(path).get("templates") or {}).items():
+        for key, tpl in (keys or {}).items():
+            for lang, text in (tpl or {}).items():
+                if isinstance(text, str) and text.strip():
+                    out.append(StaticLine(f"refusal.{sect}.{key}", str(lang), text))
+    return out
+
+
+def static_lines() -> List[StaticLine]:
+    """The whole bank, deduplicated on (lang, normalized text)."""
+    from app.pipeline.replies import fixed_replies
+    from app.agent.graph import static_say_lines
+    lines = bank_utterances() + refusal_templates()
+    lines += [StaticLine(*t) for t in fixed_replies()]
+    lines += [StaticLine(*t) for t in static_say_lines()]
+    seen, out = set(), []
+    for ln in lines:
+        k = (ln.lang, normalize_text(ln.text))
+        if k not in seen:
+            seen.add(k)
+            out.append(ln)
+    return out
+
+
+# ---------- renderers ----------
+async def _render_turn_engine(text: str, lang: str) -> Any:
+    from app.audio.tts import synth
+    from app.runtime.pools import run_io
+    out = await run_io(synth, text, lang_hint=lang, pinned=True)
+    return (out or {}).get("tts_path") if isinstance(out, dict) else out
+
+
+async def _render_stream(text: str, lang: str) -> Any:
+    """/api/voice/ws speaks sentence by sentence, so each sentence is its own cache entry."""
+    from app.runtime.pools import run_io
+    from app.voice.tts import tts_stream
+    sentences = tts_stream.split_sentences(text)
+    wavs = [await run_io(tts_stream.synthesize, s, lang, pinned=True) for s in sentences]
+    return bool(sentences) and all(wavs)
+
+
+def default_renderers() -> Dict[str, Renderer]:
+    """The turn's engine (app.audio.tts.synth), plus the voice socket's backend unless mock."""
+    from app.voice.tts.tts_stream import tts_backend_name
+    renderers: Dict[str, Renderer] = {"turn": _render_turn_engine}
+    if tts_backend_name() != "mock":
+        renderers["stream"] = _render_stream
+    return renderers
+
+
+# ---------- job ----------
+async def prerender(lines: List[StaticLine], renderers: Dict[str, Renderer],
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+    """Render every line with every renderer, `workers` at a time. Returns per-engine counts."""
+    workers = max(1, int(workers or os.getenv("SUKOON_TTS_PRERENDER_WORKERS", "4")))
+    sem = asyncio.Semaphore(workers)
+    engines = {name: {"cached": 0, "unavailable": 0, "errors": 0} for name in renderers}
+    t0 = time.perf_counter()
+
+    async def one(name: str, render: Renderer, line: StaticLine) -> None:
+        async with sem:
+            try:
+                ok = bool(await render(line.text, line.lang))
+            except Exception as e:
+                log.warning("prerender %s/%s failed: %s", name, line.key, e)
+                engines[name]["errors"] += 1
+                return
+        engines[name]["cached" if ok else "unavailable"] += 1
+
+    await asyncio.gather(*(one(n, r, ln) for n, r in renderers.items() for ln in lines))
+    return {"lines": len(lines), "engines": engines, "ms": int((time.perf_counter() - t0) * 1000)}
+
+
+async def prerender_static(extra: Optional[Dict[str, Renderer]] = None) -> Dict[str, Any]:
+    """Startup hook: the whole bank with the default renderers (+ `extra`)."""
+    if os.getenv("SUKOON_TTS_PRERENDER", "1") == "0":
+        return {"skipped": True}
+    renderers = default_renderers()
+    renderers.update(extra or {})
+    res = await prerender(static_lines(), renderers)
+    log.info("TTS prerender: %s", res)
+    return res
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Pre-render the static utterance bank into the TTS cache.")
+    ap.add_argument("--web", action="store_true", help="also render with the /api/web/turn TTS chain")
+    ap.add_argument("--list", action="store_true", help="print the bank and exit")
+    args = ap.parse_args()
+    lines = static_lines()
+    if args.list:
+        for ln in lines:
+            print(f"{ln.key}\t{ln.lang}\t{ln.text}")
+        return 0
+    renderers = default_renderers()
+    if args.web:
+        from app.api.server import _prerender_web
+        renderers["web"] = _prerender_web
+    res = asyncio.run(prerender(lines, renderers))
+    from .tts_cache import get_cache
+    get_cache().flush()
+    print(json.dumps(res, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,468 @@
+# app/audio/tts/tts_cache.py
+# Purpose: Content-addressed, persistent TTS audio cache shared by every engine (pyttsx3/SAPI,
+# Coqui, PowerShell SAPI fallback, ElevenLabs, piper). The same sentence in the same voice is
+# synthesized once; later turns get the stored file back without touching the engine.
+#
+#   key   = sha256(normalized text | engine | voice | rate | lang)   (NFC, whitespace collapsed)
+#   file  = <root>/<key[:2]>/<key><ext>   stored once; served by GET /api/audio/<key><ext>
+#   index = <root>/index.json             {key: {file, bytes, sha, engine, lang, voice, rate,
+#                                          created, last_used, hits, pinned, duration_sec}}
+#   sha   = sha256 of the stored audio (the HTTP ETag)
+# Eviction: least-recently-used first (the in-memory index is kept in recency order), until the cache is within SUKOON_TTS_CACHE_MAX_MB
+# (default 512) and SUKOON_TTS_CACHE_MAX_ENTRIES (default 20000). Pinned entries (crisis and
+# other fixed safety lines) are never evicted. expire(max_age_s) drops entries unused for longer
+# (ARTIFACT_RETENTION_DAYS at runtime startup).
+#
+# nowait=True (crisis path): a hit returns at once; a miss returns None immediately and the
+# audio is rendered in the background so the next turn hits.
+#
+# Env: SUKOON_TTS_CACHE_DIR (artifacts/audio/tts_cache), SUKOON_TTS_CACHE=0 disables caching.
+# Workers in several processes share the directory: the index is rewritten atomically and
+# reconciled with the files on disk when loaded; a key missing from this process's index is
+# looked for on disk before it counts as a miss; each write merges the entries other processes
+# added to index.json, so the size bounds apply to the shared directory, not per process.
+# index.json is written by a background thread from a snapshot, never under the cache lock, so
+# lookups (the crisis path included) only wait for dict operations; entries are replaced, not
+# mutated, which keeps the snapshot a shallow copy.
+from __future__ import annotations
+import asyncio, atexit, hashlib, json, logging, os, re, shutil, threading, time, unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+log = logging.getLogger("app.tts_cache")
+
+Audio = Union[str, bytes, None]   # what an engine call returns: a file path, raw bytes, or nothing
+_WS_RE = re.compile(r"\s+")
+_INDEX = "index.json"
+_TOUCH_FLUSH_S = 30.0             # hits only update last_used; persist at most this often
+_STORE_FLUSH_S = 1.0              # stores/evictions: persisted within about this long
+
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def cache_key(text: str, engine: str, voice: Any = None, rate: Any = None, lang: Any = None) -> str:
+    parts = [normalize_text(text), str(engine or ""), str(voice or ""), str(rate or ""), str(lang or "")]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("SUKOON_TTS_CACHE", "1") != "0"
+
+
+class TTSCache:
+    """Disk cache of synthesized audio; see module header."""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.root = Path(root or os.getenv("SUKOON_TTS_CACHE_DIR", "artifacts/audio/tts_cache"))
+        self.max_bytes = int(max_bytes if max_bytes is not None
+                             else float(os.getenv("SUKOON_TTS_CACHE_MAX_MB", "512")) * 1024 * 1024)
+        self.max_entries = int(max_entries if max_entries is not None
+                               else os.getenv("SUKOON_TTS_CACHE_MAX_ENTRIES", "20000"))
+        self._lock = threading.RLock()
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()   # least recently used first
+        self._bytes = 0
+        self._dirty = False
+        self._urgent = False
+        self._io_lock = threading.Lock()          # serializes index.json writes
+        self._wake = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._inflight: Set[str] = set()
+        self._dropped: Set[str] = set()           # removed here since the last write; not merged back
+        self._tasks: Set[asyncio.Future] = set()
+        self._n = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "background": 0}
+        self._load()
+
+    # ---------- index ----------
+    def _load(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            index = json.loads((self.root / _INDEX).read_text(encoding="utf-8"))
+        except Exception:
+            index = {}
+        on_disk: Dict[str, Path] = {}
+        for p in self.root.glob("??/*"):
+            if p.is_file() and not p.name.endswith(".tmp"):
+                on_disk[p.stem] = p
+        for key, p in on_disk.items():
+            meta = index.get(key)
+            if meta is None or meta.get("file") != self._rel(p):   # written by another process
+                st = p.stat()
+                index[key] = {"file": self._rel(p), "bytes": st.st_size, "created": st.st_mtime,
+                              "last_used": st.st_mtime, "hits": 0}
+        live = sorted(((k, v) for k, v in index.items() if k in on_disk), key=lambda kv: kv[1].get("last_used") or 0)
+        self._index = OrderedDict(live)
+        self._bytes = sum(int(v.get("bytes") or 0) for v in self._index.values())
+        if len(self._index) != len(index):
+            self._mark_dirty(urgent=True)
+
+    def _rel(self, p: Path) -> str:
+        return str(p).replace("\\", "/")
+
+    def _mark_dirty(self, urgent: bool = False) -> None:
+        """Schedule an index.json write (caller holds the lock or owns the instance)."""
+        self._dirty = True
+        if urgent:
+            self._urgent = True
+            self._wake.set()
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="tts-cache-index", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wake.wait(_TOUCH_FLUSH_S)
+            if self._wake.is_set():
+                time.sleep(_STORE_FLUSH_S)        # coalesce a burst of stores into one write
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                log.warning("TTS cache index write failed: %s", e)
+
+    def flush(self) -> None:
+        """
+        Write index.json now if anything changed (background thread; app shutdown). Entries other
+        processes wrote meanwhile are merged in first (and count towards the bounds).
+        """
+        with self._io_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+            try:
+                theirs = json.loads((self.root / _INDEX).read_text(encoding="utf-8"))
+            except Exception:
+                theirs = {}
+            with self._lock:
+                new = [(k, m) for k, m in theirs.items()
+                       if k not in self._index and k not in self._dropped and isinstance(m, dict) and m.get("file")]
+                if new:
+                    merged = list(self._index.items()) + new
+                    merged.sort(key=lambda kv: kv[1].get("last_used") or 0)
+                    self._index = OrderedDict(merged)
+                    self._bytes += sum(int(m.get("bytes") or 0) for _, m in new)
+                gone = self._evict(keep="")
+                self._dropped.clear()
+                snap = list(self._index.items())   # entries are never mutated in place
+                self._dirty = self._urgent = False
+            tmp = self.root / (_INDEX + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(dict(snap), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.root / _INDEX)
+        for f in gone:
+            _unlink(f)
+
+    # ---------- lookups ----------
+    def get(self, key: str) -> Optional[str]:
+        """
+        Cached file path for `key`, or None. Marks the entry as recently used. A key this process
+        has not indexed is looked for on disk (stored by another worker) before it is a miss.
+        """
+        with self._lock:
+            meta = self._index.get(key)
+        if meta is None:
+            return self._find(key)
+        if not os.path.exists(meta["file"]):       # removed behind our back
+            with self._lock:
+                if self._index.get(key) is meta:
+                    self._drop(key)
+                    self._mark_dirty(urgent=True)
+            return None
+        with self._lock:
+            if self._index.get(key) is not meta:   # replaced or dropped meanwhile
+                meta = self._index.get(key)
+                if meta is None:
+                    return None
+            self._index[key] = {**meta, "last_used": time.time(), "hits": int(meta.get("hits") or 0) + 1}
+            self._index.move_to_end(key)
+            self._mark_dirty()
+            return meta["file"]
+
+    def adopt(self, name: str) -> Optional[str]:
+        """
+        Index <root>/<key[:2]>/<name> (name = <key><ext>) when another process stored it after
+        this one loaded the index; returns its path, or None when there is no such file.
+        """
+        key = Path(name).stem
+        p = self.root / key[:2] / name
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        rel, now = self._rel(p), time.time()
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is not None:
+                return meta["file"] if meta["file"] == rel else None
+            self._index[key] = {"file": rel, "bytes": st.st_size, "created": st.st_mtime,
+                                "last_used": now, "hits": 0}
+            self._bytes += st.st_size
+            gone = self._evict(keep=key)
+            self._mark_dirty(urgent=True)
+        for f in gone:
+            _unlink(f)
+        return rel
+
+    def _find(self, key: str) -> Optional[str]:
+        """adopt() the file stored under `key` by another process, if there is one."""
+        try:
+            names = [e.name for e in os.scandir(self.root / key[:2])
+                     if e.name.startswith(key + ".") and not e.name.endswith(".tmp")]
+        except OSError:
+            return None
+        return self.adopt(names[0]) if names else None
+
+    def meta(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            m = self._index.get(key)
+            return dict(m) if m else None
+
+    def lookup(self, text: str, engine: str, voice: Any = None, rate: Any = None, lang: Any = None) -> Optional[str]:
+        return self.get(cache_key(text, engine, voice, rate, lang))
+
+    def key_of(self, path: str) -> Optional[str]:
+        """Cache key of a path returned by this cache, else None."""
+        p = Path(str(path).replace("\\", "/"))
+        with self._lock:
+            meta = self._index.get(p.stem)
+            return p.stem if meta is not None and Path(meta["file"]) == p else None
+
+    def etag(self, key: str) -> Optional[str]:
+        """Content hash of the stored audio (computed once for entries indexed without one)."""
+        with self._lock:
+            meta = self._index.get(key)
+        if meta is None:
+            return None
+        if meta.get("sha"):
+            return meta["sha"]
+        try:
+            sha = _sha_file(meta["file"])
+        except OSError:
+            return None
+        with self._lock:
+            cur = self._index.get(key)
+            if cur is not None and cur["file"] == meta["file"]:
+                self._index[key] = {**cur, "sha": sha}
+                self._mark_dirty()
+        return sha
+
+    # ---------- stores ----------
+    def put(self, key: str, audio: Audio, ext: Optional[str] = None, pinned: bool = False,
+            **meta: Any) -> Optional[str]:
+        """
+        Store engine output under `key` and return the cached path. A path is moved into the
+        cache (engines write throwaway files); bytes are written. Empty output is not cached.
+        """
+        if not audio:
+            return None
+        if isinstance(audio, (bytes, bytearray)):
+            ext = ext or ".wav"
+        else:
+            src = Path(str(audio))
+            if not src.exists() or src.stat().st_size == 0:
+                return None
+            ext = ext or (src.suffix or ".wav")
+        dest = self.root / key[:2] / f"{key}{ext}"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        if isinstance(audio, (bytes, bytearray)):
+            tmp.write_bytes(bytes(audio))
+            sha = hashlib.sha256(audio).hexdigest()
+        else:
+            try:
+                os.replace(src, tmp)
+            except OSError:   # different filesystem
+                shutil.copyfile(src, tmp)
+            sha = _sha_file(tmp)
+        os.replace(tmp, dest)
+        now, size, rel = time.time(), dest.stat().st_size, self._rel(dest)
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._bytes -= int(old.get("bytes") or 0)
+            self._index[key] = {"file": rel, "bytes": size, "sha": sha, "created": now, "last_used": now,
+                                "hits": 0, "pinned": bool(pinned or (old or {}).get("pinned")),
+                                **{k: v for k, v in meta.items() if v is not None}}
+            self._bytes += size
+            self._n["stores"] += 1
+            gone = self._evict(keep=key)
+            self._mark_dirty(urgent=True)
+        if old is not None and old["file"] != rel:
+            gone.append(old["file"])
+        for f in gone:
+            _unlink(f)
+        return rel
+
+    def pin(self, key: str) -> None:
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is not None and not meta.get("pinned"):
+                self._index[key] = {**meta, "pinned": True}
+                self._mark_dirty(urgent=True)
+
+    def _drop(self, key: str) -> Optional[str]:
+        """Remove `key` from the index (lock held); returns its file for the caller to unlink."""
+        meta = self._index.pop(key, None)
+        if meta is None:
+            return None
+        self._bytes -= int(meta.get("bytes") or 0)
+        self._dropped.add(key)
+        return meta["file"]
+
+    def expire(self, max_age_s: float) -> int:
+        """Drop unpinned entries not used for `max_age_s` seconds; returns how many."""
+        cutoff = time.time() - max_age_s
+        with self._lock:
+            old = [k for k, m in self._index.items() if not m.get("pinned") and (m.get("last_used") or 0) < cutoff]
+            gone = [self._drop(k) for k in old]
+            self._n["evictions"] += len(old)
+            if old:
+                self._mark_dirty(urgent=True)
+        for f in gone:
+            _unlink(f)
+        return len(old)
+
+    def _evict(self, keep: str) -> List[str]:
+        """Drop least-recently-used unpinned entries until within bounds (lock held); returns their files."""
+        over_bytes = self._bytes - self.max_bytes
+        over_n = len(self._index) - self.max_entries
+        if over_bytes <= 0 and over_n <= 0:
+            return []
+        victims = []
+        for k, m in self._index.items():           # oldest first; stops as soon as enough is found
+            if over_bytes <= 0 and over_n <= 0:
+                break
+            if k == keep or m.get("pinned"):
+                continue
+            victims.append(k)
+            over_bytes -= int(m.get("bytes") or 0)
+            over_n -= 1
+        self._n["evictions"] += len(victims)
+        return [self._drop(k) for k in victims]
+
+    # ---------- synth-through ----------
+    def synth_cached(self, synth: Callable[[], Audio], text: str, engine: str, voice: Any = None,
+                     rate: Any = None, lang: Any = None, nowait: bool = False, pinned: bool = False,
+                     ext: Optional[str] = None) -> Tuple[Optional[str], bool]:
+        """
+        (path, hit). On a miss `synth()` renders the audio (path or bytes), which is stored.
+        nowait=True: a miss returns (None, False) at once and renders on the io pool.
+        """
+        if not cache_enabled():
+            out = synth()
+            return (out if isinstance(out, str) else None), False
+        key = cache_key(text, engine, voice, rate, lang)
+        path = self.get(key)
+        if path:
+            with self._lock:
+                self._n["hits"] += 1
+            if pinned:
+                self.pin(key)
+            return path, True
+        with self._lock:
+            self._n["misses"] += 1
+        meta = {"engine": engine, "lang": lang, "voice": voice, "rate": rate, "text": normalize_text(text)[:80]}
+        if nowait:
+            if self._claim(key):
+                from app.runtime.pools import get_pool
+                get_pool().submit(self._fill, key, synth, ext, pinned, meta)
+            return None, False
+        return self.put(key, synth(), ext=ext, pinned=pinned, **meta), False
+
+    async def asynth_cached(self, asynth: Callable[[], Awaitable[Audio]], text: str, engine: str,
+                            voice: Any = None, rate: Any = None, lang: Any = None, nowait: bool = False,
+                            pinned: bool = False, ext: Optional[str] = None) -> Tuple[Optional[str], bool]:
+        """synth_cached() for async engines (ElevenLabs); a nowait miss renders in a background task."""
+        if not cache_enabled():
+            out = await asynth()
+            return (out if isinstance(out, str) else None), False
+        key = cache_key(text, engine, voice, rate, lang)
+        path = self.get(key)
+        if path:
+            with self._lock:
+                self._n["hits"] += 1
+            if pinned:
+                self.pin(key)
+            return path, True
+        with self._lock:
+            self._n["misses"] += 1
+        meta = {"engine": engine, "lang": lang, "voice": voice, "rate": rate, "text": normalize_text(text)[:80]}
+        if nowait:
+            if self._claim(key):
+                task = asyncio.ensure_future(self._afill(key, asynth, ext, pinned, meta))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return None, False
+        return self.put(key, await asynth(), ext=ext, pinned=pinned, **meta), False
+
+    def _claim(self, key: str) -> bool:
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+            self._n["background"] += 1
+            return True
+
+    def _fill(self, key: str, synth: Callable[[], Audio], ext, pinned: bool, meta: Dict[str, Any]) -> None:
+        try:
+            self.put(key, synth(), ext=ext, pinned=pinned, **meta)
+        except Exception as e:
+            log.warning("background TTS render failed: %s", e)
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    async def _afill(self, key: str, asynth, ext, pinned: bool, meta: Dict[str, Any]) -> None:
+        try:
+            self.put(key, await asynth(), ext=ext, pinned=pinned, **meta)
+        except Exception as e:
+            log.warning("background TTS render failed: %s", e)
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            looked = self._n["hits"] + self._n["misses"]
+            return {
+                "root": self._rel(self.root),
+                "entries": len(self._index),
+                "pinned": sum(1 for m in self._index.values() if m.get("pinned")),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                **self._n,
+                "hit_rate": round(self._n["hits"] / looked, 4) if looked else 0.0,
+                "rendering": len(self._inflight),
+            }
+
+
+def _sha_file(path: Union[str, Path]) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_CACHE: Optional[TTSCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> TTSCache:
+    """Process-wide TTSCache (created on first use)."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = TTSCache()
+                atexit.register(_CACHE.flush)
+    return _CACHE
@@ -0,0 +1,85 @@
+# app/audio/tts/tts_elevenlabs.py
+# Purpose: ElevenLabs TTS for /api/web/turn (Urdu: eleven_multilingual_v2, English:
+# eleven_monolingual_v1). Requests go through the shared provider client
+# (app/runtime/providers.py): keep-alive pool, bounded concurrency, identical concurrent texts
+# coalesced into one call, and a circuit breaker so a degraded provider fails fast to the
+# SAPI fallback. Rendered audio goes through the TTS cache (tts_cache.py).
+#
+# Env: SUKOON_TTS_API_KEY, SUKOON_TTS_UR_VOICEID / SUKOON_TTS_EN_VOICEID,
+#      SUKOON_TTS_PCM_RATE (requested PCM sample rate, default 22050).
+from __future__ import annotations
+import hashlib, logging, os, time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.audio.transcode import to_wav, write_once
+from app.runtime.pools import run_io
+from app.runtime.providers import ProviderUnavailable, get_provider
+from .tts_cache import get_cache
+
+log = logging.getLogger("app.tts_elevenlabs")
+
+MODELS = {"ur": "eleven_multilingual_v2", "en": "eleven_monolingual_v1"}
+_VOICE_ENV = {"ur": "SUKOON_TTS_UR_VOICEID", "en": "SUKOON_TTS_EN_VOICEID"}
+_SETTINGS = {"stability": 0.4, "similarity_boost": 0.8}
+
+
+def voice_id(lang: str) -> str:
+    return os.getenv(_VOICE_ENV[lang], "").strip() if lang in _VOICE_ENV else ""
+
+
+def _pcm_rate() -> int:
+    return int(os.getenv("SUKOON_TTS_PCM_RATE", "22050"))
+
+
+async def render(text: str, lang: str, timings: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Synthesize `text` with the `lang` voice. Raw PCM is requested (output_format=pcm_<rate>) and
+    wrapped in a WAV header in memory, so the file is written once (app/audio/transcode.py);
+    an MP3 answer is decoded in-process. `timings` receives tts_format, tts_transcode_ms and
+    tts_bytes_written. Returns the path, or None.
+    """
+    api_key, vid = os.getenv("SUKOON_TTS_API_KEY", "").strip(), voice_id(lang)
+    if not api_key or not vid or lang not in MODELS:
+        return None
+    provider = get_provider("elevenlabs")
+    rate = _pcm_rate()
+    body = {"text": text, "model_id": MODELS[lang], "voice_settings": _SETTINGS}
+    headers = {"xi-api-key": api_key}
+    params = {"output_format": f"pcm_{rate}"}
+    key = ("tts", vid, MODELS[lang], rate, text)
+    try:
+        resp = await provider.request("POST", f"/v1/text-to-speech/{vid}", json=body, headers=headers,
+                                      params=params, coalesce=key)
+        if resp.is_client_error and resp.status_code not in (401, 403, 429):
+            # some voices/plans only serve the streaming endpoint; provider failures never retry here
+            resp = await provider.request("POST", f"/v1/text-to-speech/{vid}/stream", json=body, headers=headers,
+                                          params=params, coalesce=key + ("stream",))
+        resp.raise_for_status()
+    except ProviderUnavailable as e:
+        log.info("ElevenLabs skipped: %s", e)
+        return None
+    except Exception as e:
+        log.warning("ElevenLabs %s TTS error: %s", lang, e)
+        return None
+    if len(resp.content) <= 256:
+        return None
+
+    t0 = time.perf_counter()
+    audio, fmt = await run_io(to_wav, resp.content, rate, resp.headers.get("Content-Type", ""))
+    transcode_ms = round((time.perf_counter() - t0) * 1000, 1)
+    name = time.strftime("%H%M%S_") + hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()[:8]
+    out = Path("artifacts") / "audio" / "tts" / time.strftime("%Y%m%d") / (name + (".mp3" if fmt == "mp3" else ".wav"))
+    written = write_once(str(out), audio)
+    if timings is not None:
+        timings.update(tts_format=fmt, tts_transcode_ms=transcode_ms, tts_bytes_written=written)
+    return str(out).replace("\\", "/")
+
+
+async def synth(text: str, lang: str, nowait: bool = False, pinned: bool = False,
+                timings: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """render() through the TTS cache; nowait=True (crisis) never waits on the provider."""
+    path, _hit = await get_cache().asynth_cached(
+        lambda: render(text, lang, timings), text, engine=f"elevenlabs:{MODELS.get(lang, '')}",
+        voice=voice_id(lang), lang=lang, nowait=nowait, pinned=pinned or nowait)
+    return path
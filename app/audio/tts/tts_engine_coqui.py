@@ -2,6 +2,8 @@
 import os, uuid, datetime
 from pathlib import Path
 
+from .tts_cache import get_cache
+
 _model = None
 
 def _ensure_model():
@@ -17,16 +19,24 @@ def _dated_dir(root="artifacts/audio/tts"):
     path.mkdir(parents=True, exist_ok=True)
     return path
 
-def synth(text: str, lang_hint: str = "ur", voice: str | None = None):
-    _ensure_model()
-    out_dir = _dated_dir()
-    name = f"{datetime.datetime.utcnow().strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
-    out_path = out_dir / name
-
+def synth(text: str, lang_hint: str = "ur", voice: str | None = None,
+          nowait: bool = False, pinned: bool = False):
     # XTTS expects ISO language codes; "ur" works for Urdu.
     language = "ur" if (lang_hint or "").lower().startswith("ur") else "en"
     # You can provide a reference speaker wav via SUKOON_TTS_SPEAKER_WAV; else use default.
     ref_wav = os.getenv("SUKOON_TTS_SPEAKER_WAV", None)
+    model_name = os.getenv("SUKOON_TTS_MODEL", "tts_models/multilingual/multi-dataset/xtts_v2")
+    path, _hit = get_cache().synth_cached(
+        lambda: _render(text, language, ref_wav), text, engine=f"coqui:{model_name}",
+        voice=ref_wav, lang=language, nowait=nowait, pinned=pinned,
+    )
+    return {"tts_path": path, "duration_sec": None}
+
+def _render(text: str, language: str, ref_wav: str | None) -> str:
+    _ensure_model()
+    out_dir = _dated_dir()
+    name = f"{datetime.datetime.utcnow().strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
+    out_path = out_dir / name
 
     _model.tts_to_file(
         text=text,
@@ -34,4 +44,4 @@ def synth(text: str, lang_hint: str = "ur", voice: str | None = None):
         speaker_wav=ref_wav if ref_wav else None,
         language=language,
     )
-    return {"tts_path": str(out_path).replace("\\", "/"), "duration_sec": None}
+    return str(out_path).replace("\\", "/")
@@ -1,5 +1,5 @@
 # app/audio/tts/tts_engine_sapi.py
-import os, uuid, wave, contextlib, datetime
+import os, uuid, wave, contextlib, datetime, logging
 
 # --- Optional pyttsx3 import (graceful degrade) ---
 try:
@@ -9,6 +9,9 @@ except Exception:
     pyttsx3 = None
     _PYTTSX3_OK = False
 
+from .tts_cache import get_cache
+from .tts_workers import get_tts_workers, workers_enabled
+
 # Ensure base artifacts folder exists
 os.makedirs("artifacts/audio/tts", exist_ok=True)
 
@@ -32,12 +35,17 @@ def _wav_duration(path: str) -> float | None:
 # --------------------------------------------------------------------
 # Low-level engine function (as in your patch): returns str|None path
 # --------------------------------------------------------------------
+def _engine_ok() -> bool:
+    return _PYTTSX3_OK or bool(workers_enabled() and os.getenv("SUKOON_TTS_WORKER_ENGINE"))
+
 def sapi_synth(text: str, **kwargs) -> str | None:
     """
     Return path to synthesized wav, or None if the engine is unavailable.
     Never raises for missing engine.
+    Rendered on the resident pyttsx3 workers (tts_workers.py); SUKOON_TTS_WORKERS=0 keeps the
+    old in-process pyttsx3.init() per call.
     """
-    if not _PYTTSX3_OK:
+    if not _engine_ok():
         # Graceful degrade: no audio file, caller can continue.
         return None
 
@@ -45,6 +53,15 @@ def sapi_synth(text: str, **kwargs) -> str | None:
     name = f"{datetime.datetime.utcnow().strftime('%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
     out_path = os.path.join(out_dir, name)
 
+    if workers_enabled():
+        try:
+            return get_tts_workers("pyttsx3").synth(
+                text, out_path, voice=kwargs.get("voice") or os.getenv("SUKOON_TTS_VOICE"),
+                rate=os.getenv("SUKOON_TTS_RATE"), volume=os.getenv("SUKOON_TTS_VOLUME"))
+        except Exception as e:
+            logging.getLogger("app.tts_workers").warning("pyttsx3 worker failed: %s", e)
+            return None
+
     eng = pyttsx3.init()
 
     # Optional voice selection if caller/env specifies (no-ops if not found)
@@ -80,18 +97,31 @@ def sapi_synth(text: str, **kwargs) -> str | None:
     # Normalize path to POSIX for web usage
     return out_path.replace("\\", "/")
 
+def cache_fields(voice: str | None = None) -> dict:
+    """TTS cache key fields (tts_cache.cache_key) of this engine's entries; pyttsx3 ignores lang_hint."""
+    return {"engine": "sapi", "voice": voice or os.getenv("SUKOON_TTS_VOICE") or None,
+            "rate": os.getenv("SUKOON_TTS_RATE"), "lang": None}
+
 # --------------------------------------------------------------------
 # High-level helper kept for backward compatibility with callers:
 # returns a dict with tts_path + duration (same shape as before).
 # --------------------------------------------------------------------
-def synth(text: str, lang_hint: str = "ur", voice: str | None = None) -> dict:
+def synth(text: str, lang_hint: str = "ur", voice: str | None = None,
+          nowait: bool = False, pinned: bool = False) -> dict:
     """
-    Minimal SAPI/pyttsx3-based TTS.
+    Minimal SAPI/pyttsx3-based TTS, through the shared TTS cache (tts_cache.py): a sentence
+    already rendered in this voice/rate returns the cached file without calling the engine.
+    nowait=True never blocks on synthesis (crisis path): a miss returns no audio and renders
+    in the background.
 
     Returns a dict (backward-compatible with callers that extract tts_path):
         {"tts_path": "<posix_path>|None", "duration_sec": <float|None>}
     """
-    posix_path = sapi_synth(text, voice=voice)
+    key = cache_fields(voice)
+    posix_path, _hit = get_cache().synth_cached(
+        lambda: sapi_synth(text, voice=key["voice"]) if _engine_ok() else None,
+        text, **key, nowait=nowait, pinned=pinned,
+    )
 
     if not posix_path:
         # Engine unavailable → graceful degrade
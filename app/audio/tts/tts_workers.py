@@ -0,0 +1,332 @@
+# app/audio/tts/tts_workers.py
+# Purpose: Long-lived TTS worker processes. Each worker loads its engine and voice list once
+# and then renders jobs sent to it, so an utterance costs synthesis time only: no
+# pyttsx3.init() / voice scan per call (tts_engine_sapi) and no PowerShell start-up +
+# System.Speech load per call (server._render_sapi_fallback).
+#
+# Engines (one pool per engine, created on first use):
+#   pyttsx3   python -m app.audio.tts.tts_workers pyttsx3   (SAPI5 / NSSpeech / espeak)
+#   sapi-ps   a resident powershell.exe running a System.Speech job loop
+#   stub      python -m app.audio.tts.tts_workers stub      (local stand-in: writes a silent WAV;
+#             SUKOON_TTS_STUB_LOAD_MS / SUKOON_TTS_STUB_MS simulate load and synthesis time)
+# SUKOON_TTS_WORKER_ENGINE=stub runs every pool on the stand-in (Linux, tests).
+#
+# Protocol: one JSON object per line. The worker prints {"ready": true, ...} once its engine
+# is loaded, then answers each job {"id", "text", "out", "voice", "rate", "volume", "lang",
+# "culture"} with {"id", "ok", "path"|"error", "ms"}. Jobs wait in one bounded queue
+# (SUKOON_TTS_QUEUE, default 8 per worker; TTSBusy when full). A job that takes longer than
+# SUKOON_TTS_TIMEOUT_S (default 30) fails with TimeoutError and its worker is restarted;
+# a worker that dies is restarted on its next job.
+#
+# Sizing: SUKOON_TTS_WORKERS (default 2; 0 = render in-process, the old per-call path).
+# Queue, worker threads and stats: app/runtime/worker_pool.BoundedWorkerPool (shared with STT).
+from __future__ import annotations
+import base64, json, logging, os, queue, subprocess, sys, threading, time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.runtime.worker_pool import BoundedWorkerPool
+
+log = logging.getLogger("app.tts_workers")
+
+_ROOT = str(Path(__file__).resolve().parents[3])
+
+
+class TTSBusy(RuntimeError):
+    """Every TTS worker is busy and the queue is full."""
+
+
+def workers_enabled() -> bool:
+    return int(os.getenv("SUKOON_TTS_WORKERS", "2") or 0) > 0
+
+
+# ---------- worker side ----------
+class _Pyttsx3Engine:
+    def __init__(self) -> None:
+        import pyttsx3
+        self.eng = pyttsx3.init()
+        self.voices = [((v.name or "").lower(), v.id) for v in (self.eng.getProperty("voices") or [])]
+        self.default = {"voice": self.eng.getProperty("voice"), "rate": self.eng.getProperty("rate"),
+                        "volume": self.eng.getProperty("volume")}
+        self.current: Dict[str, Any] = {}
+
+    def _set(self, prop: str, value: Any) -> None:
+        if self.current.get(prop) != value:
+            self.eng.setProperty(prop, value)
+            self.current[prop] = value
+
+    def render(self, job: Dict[str, Any]) -> bool:
+        want = (job.get("voice") or "").lower()
+        vid = next((i for n, i in self.voices if want and want in n), None)
+        self._set("voice", vid or self.default["voice"])
+        self._set("rate", int(job.get("rate") or 0) or self.default["rate"])
+        vol = float(job.get("volume") or 0)
+        self._set("volume", max(0.0, min(1.0, vol)) if vol else self.default["volume"])
+        self.eng.save_to_file(job["text"], job["out"])
+        self.eng.runAndWait()
+        return os.path.exists(job["out"])
+
+
+class _StubEngine:
+    """Stand-in engine: 50 ms of silence per word, after simulated load/synthesis delays."""
+
+    def __init__(self) -> None:
+        time.sleep(int(os.getenv("SUKOON_TTS_STUB_LOAD_MS", "0")) / 1000)
+
+    def render(self, job: Dict[str, Any]) -> bool:
+        import wave
+        time.sleep(int(os.getenv("SUKOON_TTS_STUB_MS", "0")) / 1000)
+        with wave.open(job["out"], "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\x00\x00" * 800 * max(1, len(str(job["text"]).split())))
+        return True
+
+
+def serve(engine: str) -> int:
+    """Worker main loop: load `engine`, then answer jobs from stdin until EOF."""
+    out = sys.stdout
+    sys.stdout = sys.stderr  # engines may print; the protocol owns the real stdout
+
+    def send(msg: Dict[str, Any]) -> None:
+        out.write(json.dumps(msg) + "\n")
+        out.flush()
+
+    t0 = time.perf_counter()
+    try:
+        eng = _StubEngine() if engine == "stub" else _Pyttsx3Engine()
+    except Exception as e:
+        send({"ready": False, "error": f"{type(e).__name__}: {e}"})
+        return 1
+    send({"ready": True, "engine": engine, "pid": os.getpid(),
+          "load_ms": round((time.perf_counter() - t0) * 1000, 1)})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        t1 = time.perf_counter()
+        job: Dict[str, Any] = {}
+        try:
+            job = json.loads(line)
+            os.makedirs(os.path.dirname(job["out"]) or ".", exist_ok=True)
+            ok = eng.render(job)
+            res = {"ok": ok, "path": job["out"]} if ok else {"ok": False, "error": "no audio"}
+        except Exception as e:
+            res = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        res.update(id=job.get("id"), ms=round((time.perf_counter() - t1) * 1000, 1))
+        send(res)
+    return 0
+
+
+# System.Speech job loop: voice picked once per (lang, voice, culture), same rules as the
+# former per-request script (forced name, else a female voice of the culture, else any).
+_PS_LOOP = r"""
+$ErrorActionPreference='Stop'
+[Console]::InputEncoding=[Text.Encoding]::UTF8
+[Console]::OutputEncoding=[Text.Encoding]::UTF8
+Add-Type -AssemblyName System.Speech
+$s=New-Object System.Speech.Synthesis.SpeechSynthesizer
+$installed=@($s.GetInstalledVoices() | ForEach-Object { $_.VoiceInfo })
+$picked=@{}
+function Pick($j){
+  $k="$($j.lang)|$($j.voice)|$($j.culture)"
+  if($picked.ContainsKey($k)){ return $picked[$k] }
+  $v=$null
+  if($j.voice){ foreach($vi in $installed){ if($vi.Name -eq $j.voice){ $v=$vi.Name } } }
+  if(-not $v){
+    $f=@(); $a=@()
+    foreach($vi in $installed){
+      $c=$vi.Culture.Name; $d=$vi.Description; $n=$vi.Name
+      if($j.lang -eq 'ur'){ $m=($c -like 'ur*') -or ($d -match 'Urdu|Pakistan') -or ($n -match 'Urdu') }
+      else { $m=($c -like ($j.culture+'*')) -or ($d -match 'India|English \(India\)|en-IN') }
+      if($m){ if($vi.Gender.ToString() -eq 'Female'){ $f+=$n } else { $a+=$n } }
+    }
+    if($f.Count -gt 0){ $v=$f[0] } elseif($a.Count -gt 0){ $v=$a[0] }
+  }
+  $picked[$k]=$v
+  return $v
+}
+[Console]::Out.WriteLine('{"ready":true,"engine":"sapi-ps","pid":' + $PID + '}')
+[Console]::Out.Flush()
+while(($line=[Console]::In.ReadLine()) -ne $null){
+  if(-not $line.Trim()){ continue }
+  $t0=Get-Date; $j=$null
+  try{
+    $j=$line | ConvertFrom-Json
+    $v=Pick $j
+    if($v){ $s.SelectVoice($v) }
+    $s.Rate=[int]$j.rate
+    $s.SetOutputToWaveFile($j.out)
+    $s.Speak([string]$j.text)
+    $s.SetOutputToNull()
+    $r=@{id=$j.id; ok=$true; path=$j.out}
+  }catch{
+    try{ $s.SetOutputToNull() }catch{}
+    $r=@{id=$(if($j){$j.id}else{$null}); ok=$false; error=$_.Exception.Message}
+  }
+  $r.ms=[int]((Get-Date)-$t0).TotalMilliseconds
+  [Console]::Out.WriteLine(($r | ConvertTo-Json -Compress))
+  [Console]::Out.Flush()
+}
+"""
+
+
+def _argv(engine: str) -> List[str]:
+    if engine == "sapi-ps":
+        script = base64.b64encode(_PS_LOOP.encode("utf-16-le")).decode("ascii")
+        return ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+                "-EncodedCommand", script]
+    return [sys.executable, "-m", "app.audio.tts.tts_workers", engine]
+
+
+# ---------- pool side ----------
+class _Proc:
+    """One worker process; a reader thread turns its stdout into a line queue (works on Windows pipes)."""
+
+    def __init__(self, argv: List[str], env: Dict[str, str]):
+        self.p = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, env=env, cwd=os.getcwd(),
+                                  text=True, encoding="utf-8", errors="replace", bufsize=1)
+        self.lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.p.stdout:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def recv(self, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError(f"TTS worker did not answer within {timeout:.0f}s")
+            if line is None:
+                raise RuntimeError(f"TTS worker exited (code {self.p.poll()})")
+            if line.lstrip().startswith("{"):
+                return json.loads(line)
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        self.p.stdin.write(json.dumps(msg) + "\n")  # ASCII JSON: no console code page issues
+        self.p.stdin.flush()
+
+    def alive(self) -> bool:
+        return self.p.poll() is None
+
+    def kill(self) -> None:
+        try:
+            self.p.kill()
+            self.p.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class TTSWorkerPool(BoundedWorkerPool):
+    """Bounded job queue over N resident engine processes; see module header."""
+
+    busy_error = TTSBusy
+    label = "TTS"
+    run_stat = "avg_synth_ms"
+
+    def __init__(self, engine: str, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 timeout: Optional[float] = None, env: Optional[Dict[str, str]] = None):
+        workers = max(1, int(workers or os.getenv("SUKOON_TTS_WORKERS", "2") or 2))
+        super().__init__(f"tts-{engine}", workers,
+                         int(max_queue or os.getenv("SUKOON_TTS_QUEUE", "0") or 0) or 8 * workers)
+        self.engine = engine
+        self.timeout = float(timeout or os.getenv("SUKOON_TTS_TIMEOUT_S", "30"))
+        self._env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+            p for p in (_ROOT, os.environ.get("PYTHONPATH", "")) if p), **(env or {})}
+        self._seq = 0
+        self._n.update(timeouts=0, starts=0)
+
+    def _load(self, i: int) -> _Proc:
+        """Start worker i's engine process and wait for its ready line."""
+        t0 = time.perf_counter()
+        proc = _Proc(_argv(self.engine), self._env)
+        try:
+            hello = proc.recv(self.timeout)
+        except Exception:
+            proc.kill()
+            raise
+        if not hello.get("ready"):
+            proc.kill()
+            raise RuntimeError(hello.get("error") or "TTS engine failed to load")
+        self.load_ms[i] = round((time.perf_counter() - t0) * 1000, 1)
+        with self._lock:
+            self._n["starts"] += 1
+        log.info("TTS worker %s/%d ready in %.0f ms", self.engine, i, self.load_ms[i])
+        return proc
+
+    def _run(self, i: int, msg: Dict[str, Any], t_enq: float, t_start: float) -> str:
+        proc = self._state[i]
+        if proc is None or not proc.alive():   # failed start or dead worker: restart on this job
+            self._state[i] = proc = self._load(i)
+        try:
+            proc.send(msg)
+            res = proc.recv(self.timeout)
+        except TimeoutError:
+            proc.kill()                        # hung engine: restart on the next job
+            self._state[i] = None
+            with self._lock:
+                self._n["timeouts"] += 1
+            raise
+        if not res.get("ok"):
+            raise RuntimeError(res.get("error") or "TTS worker failed")
+        return str(res["path"]).replace("\\", "/")
+
+    def _unload(self, i: int, proc: _Proc) -> None:
+        proc.kill()
+
+    # ---------- API ----------
+    def submit(self, text: str, out: str, voice: Optional[str] = None, rate: Any = None,
+               volume: Any = None, lang: Optional[str] = None, culture: Optional[str] = None) -> "Future[str]":
+        with self._lock:
+            self._seq += 1
+            msg = {"id": self._seq, "text": text, "out": os.path.abspath(out), "voice": voice or "",
+                   "rate": int(rate or 0), "volume": float(volume or 0), "lang": lang or "",
+                   "culture": culture or ""}
+        return super().submit(msg)
+
+    def synth(self, text: str, out: str, **kw: Any) -> str:
+        """Render `text` to `out` on a resident worker; returns the (posix) path. Raises on failure."""
+        return self.submit(text, out, **kw).result()
+
+    def stats(self) -> Dict[str, Any]:
+        st = super().stats()
+        return {"engine": self.engine, "workers": self.workers,
+                "alive": sum(1 for p in list(self._state) if p is not None and p.alive()), **st}
+
+
+_POOLS: Dict[str, TTSWorkerPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+def get_tts_workers(engine: str) -> TTSWorkerPool:
+    """Process-wide pool for `engine` (SUKOON_TTS_WORKER_ENGINE overrides; created on first use)."""
+    engine = os.getenv("SUKOON_TTS_WORKER_ENGINE") or engine
+    pool = _POOLS.get(engine)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(engine)
+            if pool is None:
+                pool = _POOLS[engine] = TTSWorkerPool(engine)
+    return pool
+
+
+def tts_workers_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: pool.stats() for name, pool in list(_POOLS.items())}
+
+
+def close_tts_workers() -> None:
+    """Stop every pool (app shutdown); pools are recreated lazily on next use."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(serve(sys.argv[1] if len(sys.argv) > 1 else "pyttsx3"))
@@ -1,4 +1,4 @@
-﻿from fastapi import APIRouter, UploadFile, File
+﻿from fastapi import APIRouter, UploadFile, File, HTTPException
 from pydantic import BaseModel
 from typing import Any, Dict
 import os, tempfile, uuid, json
@@ -7,8 +7,9 @@ from pathlib import Path
 
 from app.safety.router import SafetyRouter
 from app.ops.cost_meter import CostMeter
-from app.audio.stt_faster_whisper import STTEngine
-from app.pipeline.turn import run_turn  # merged previously
+from app.audio.stt_service import STTBusy, get_stt
+from app.api.audio import audio_url
+from app.pipeline.turn import arun_turn  # merged previously (async driver of run_turn)
 
 import csv  # (snippet) for feedback logging
 
@@ -17,7 +18,7 @@ router = APIRouter(prefix="/api/web", tags=["web"])
 # Singletons
 safety = SafetyRouter()
 meter = CostMeter(config_path="configs/costing.yaml")
-stt = STTEngine()
+stt = get_stt()  # shared replicas; preloaded at startup with SUKOON_STT=whisper, else on first use
 
 AUDIO_ROOT = os.getenv("SUKOON_AUDIO_ROOT", "artifacts/audio")
 
@@ -63,7 +64,10 @@ async def stt_upload(file: UploadFile = File(...)) -> Dict[str, Any]:
         fout.write(await file.read())
 
     # Transcribe
-    result = stt.transcribe_file(up_path)
+    try:
+        result = await stt.atranscribe(up_path)
+    except STTBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
     # Minutes for metering (avoid zero)
     minutes = 0.0
@@ -92,16 +96,16 @@ class TurnIn(BaseModel):
     lang: str | None = None  # align with snippet
 
 @router.post("/turn")
-def run_full_turn(inp: TurnIn):
-    # Preserve existing behavior
-    result = run_turn(inp.text, lang_hint=inp.lang or "ur")
+async def run_full_turn(inp: TurnIn):
+    # Preserve existing behavior (async pipeline: LLM awaited, TTS on the io pool)
+    result = await arun_turn(inp.text, lang_hint=inp.lang or "ur")
     # Add browser-servable URL alongside existing tts_path (if present).
     tts_path = result.get("tts_path")
     if tts_path:
-        web_path = Path(tts_path).as_posix()
-        # Our audio writer already uses artifacts/*; expose it at /artifacts/*
-        if web_path.startswith("artifacts/"):
-            result["tts_url"] = "/" + web_path  # e.g., /artifacts/audio/tts/20251009/xyz.wav
+        # TTS cache entries → /api/audio/<key>.wav (ETag + Range); other files under /artifacts/*
+        url = audio_url(Path(tts_path).as_posix(), "/artifacts/")
+        if url:
+            result["tts_url"] = url
     return result
 
 
@@ -1,8 +1,11 @@
 from __future__ import annotations
+import os
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, Protocol
 
+from app.runtime.session_store import MemoryStore, SessionStore, get_session_store
+
 
 # ---- Time source injection for testability ----------------------------------
 
@@ -24,21 +27,35 @@ class SessionState:
     has_opt_in: bool = False
 
 
-class InMemoryStore:
-    """Simple per-user state store. Replace with DB/cache in production."""
-    def __init__(self) -> None:
-        self._state: Dict[str, SessionState] = {}
+class SessionStateStore:
+    """
+    Per-user state in a SessionStore (app/runtime/session_store.py), so every worker sees the
+    same window and opt-in. Idle users expire after SUKOON_WA_STATE_TTL_S (default 90 days).
+    Each field is its own key ("<user>:<field>"), so concurrent updates of different fields are
+    single writes and cannot overwrite each other.
+    """
+    NS = "wa_session"
+
+    def __init__(self, store: Optional[SessionStore] = None, ttl_s: Optional[float] = None) -> None:
+        self._store = store if store is not None else get_session_store()
+        self.ttl_s = float(ttl_s or os.getenv("SUKOON_WA_STATE_TTL_S", str(90 * 86400)))
 
     def get(self, user_id: str) -> SessionState:
-        if user_id not in self._state:
-            self._state[user_id] = SessionState()
-        return self._state[user_id]
+        last = self._store.get(self.NS, f"{user_id}:last_incoming_utc")
+        return SessionState(last_incoming_utc=datetime.fromisoformat(last) if last else None,
+                            has_opt_in=bool(self._store.get(self.NS, f"{user_id}:has_opt_in")))
 
     def set_opt_in(self, user_id: str, value: bool) -> None:
-        self.get(user_id).has_opt_in = value
+        self._store.set(self.NS, f"{user_id}:has_opt_in", bool(value), ttl_s=self.ttl_s)
 
     def set_last_incoming(self, user_id: str, ts: datetime) -> None:
-        self.get(user_id).last_incoming_utc = ts
+        self._store.set(self.NS, f"{user_id}:last_incoming_utc", ts.isoformat(), ttl_s=self.ttl_s)
+
+
+class InMemoryStore(SessionStateStore):
+    """Per-process state (tests, single worker); the shared store is the default for WhatsAppGuard."""
+    def __init__(self, ttl_s: Optional[float] = None) -> None:
+        super().__init__(MemoryStore(), ttl_s)
 
 
 # ---- Guard policy ------------------------------------------------------------
@@ -50,7 +67,7 @@ class WhatsAppGuard:
       - Free-form messages allowed only within 24h of last *user* message.
       - Outside 24h: only approved templates, and only if user has opted in.
     """
-    store: InMemoryStore = field(default_factory=InMemoryStore)
+    store: SessionStateStore = field(default_factory=SessionStateStore)
     clock: Clock = field(default_factory=SystemClock)
     session_window: timedelta = field(default=timedelta(hours=24))
 
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import List
 from app.ingest.loaders.phq9 import PHQ9Loader
 from app.ingest.loaders.gad7 import GAD7Loader
-from app.retrieval.indexer import build_index
+from app.retrieval.indexer import build_index, update_index
 from app.retrieval.schema import EvidenceRecord
 
 def write_jsonl(records: List[EvidenceRecord], path: str) -> int:
@@ -15,17 +15,32 @@ def write_jsonl(records: List[EvidenceRecord], path: str) -> int:
              f.write(r.model_dump_json() + "\n")
     return len(records)
 
-def run_ingest() -> int:
+def _same_records(records: List[EvidenceRecord], path: str) -> bool:
+    """True when `path` already holds exactly these (evidence_id, hash) pairs, in order."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            have = [(d.get("evidence_id"), d.get("hash")) for d in map(json.loads, filter(str.strip, f))]
+    except (OSError, ValueError):
+        return False
+    return have == [(r.evidence_id, r.hash) for r in records]
+
+def run_ingest(incremental: bool = False) -> int:
     loaders = [PHQ9Loader(), GAD7Loader()]
     all_records: List[EvidenceRecord] = []
     counts = {}
     for L in loaders:
         recs = list(L.iter_records())
         out = f"data/curated/{L.doc_id}.jsonl"
-        counts[L.doc_id] = write_jsonl(recs, out)
+        if incremental and _same_records(recs, out):
+            counts[L.doc_id] = len(recs)  # unchanged loader: keep the file as is
+        else:
+            counts[L.doc_id] = write_jsonl(recs, out)
         all_records.extend(recs)
 
-    idx_meta = build_index(all_records, out_dir="data/index")
+    if incremental:
+        idx_meta = update_index(all_records, out_dir="data/index", scope_doc_ids=[L.doc_id for L in loaders])
+    else:
+        idx_meta = build_index(all_records, out_dir="data/index")
     print(json.dumps({
         "docs": counts,
         "total_chunks": sum(counts.values()),
@@ -36,9 +51,11 @@ def run_ingest() -> int:
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("command", choices=["datasets"], help="datasets → run curated loaders")
+    ap.add_argument("--incremental", action="store_true",
+                    help="diff against data/index by evidence_id/hash; embed + append only new/changed chunks")
     args = ap.parse_args()
     if args.command == "datasets":
-        raise SystemExit(run_ingest())
+        raise SystemExit(run_ingest(incremental=args.incremental))
 
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ from typing import Dict, Any, List
 import statistics, yaml, time
 
 from app.agent.graph import plan_say
+from app.ops.cost_rollup import compact, load, percentiles
 
 def _percentile(vals: List[float], pct: float) -> float:
     if not vals:
@@ -55,6 +56,15 @@ def main(cfg_path: str = "configs/budget.yaml") -> int:
         max_out <= int(thr["tokens_out_max"]) and
         max_cogs <= float(thr["cogs_per_min_max"])
     )
+    # Observed turns from the metering log (columnar rollups, app/ops/cost_rollup.py); informational
+    try:
+        compact()
+        cols = load()
+        for row in percentiles(cols, "total_ms", route="assist"):
+            print(f"LOG: assist total_ms P50={row['p50']:.1f}ms P95={row['p95']:.1f}ms (n={row['n']})")
+    except Exception as e:
+        print(f"LOG: unavailable ({type(e).__name__})")
+
     print(f"VERDICT: {'PASS' if ok else 'FAIL'}")
     return 0 if ok else 1
 
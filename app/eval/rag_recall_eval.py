@@ -34,18 +34,11 @@ def score_chunk(text: str, terms: List[str]) -> int:
         score += t.count(term)  # simple occurrence count
     return score
 
-def score_record(rec: Dict[str, Any], terms: List[str], query_lang: str = "en") -> float:
-    """Term hits in body + small boosts for title/section, topic overlap, and doc_type."""
-    body = rec.get("text", "")
+def prepare_record(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Query-independent part of score_record(): normalized body/header/topics + static boost."""
     title = rec.get("title", "")
     section = " ".join(rec.get("section_path", []))
-    topics = [normalize(x) for x in rec.get("topics", [])]
     doc_type = (rec.get("doc_type") or "").lower()
-
-    base = score_chunk(body, terms)
-    hdr = score_chunk(title + " " + section, terms)
-    topic_hits = sum(1 for t in topics if t in set(terms))
-
     boost = 0.0
     # Prefer psychoeducation; de-emphasize terminology/taxonomy for "what/help" style questions
     if doc_type == "psychoeducation":
@@ -56,14 +49,32 @@ def score_record(rec: Dict[str, Any], terms: List[str], query_lang: str = "en")
         boost -= 3.0
     elif doc_type == "taxonomy":
         boost -= 1.5
+    return {
+        "rec": rec,
+        "body": normalize(rec.get("text", "")),
+        "hdr": normalize(title + " " + section),
+        "topics": [normalize(x) for x in rec.get("topics", [])],
+        "doc_type": doc_type,
+        "lang": (rec.get("language") or "").lower(),
+        "boost": boost,
+    }
 
-    # Light language bonus for Urdu queries hitting Urdu content
-    lang = (rec.get("language") or "").lower()
-    if query_lang == "ur" and lang == "ur":
-        boost += 1.5
+def prepare_corpus(corpus: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [prepare_record(r) for r in corpus]
 
+def _score_prepared(p: Dict[str, Any], terms: List[str], term_set: Set[str], query_lang: str) -> float:
+    base = sum(p["body"].count(t) for t in terms if t)
+    hdr = sum(p["hdr"].count(t) for t in terms if t)
+    topic_hits = sum(1 for t in p["topics"] if t in term_set)
+    boost = p["boost"]
+    if query_lang == "ur" and p["lang"] == "ur":
+        boost += 1.5
     return base + hdr + topic_hits + boost
 
+def score_record(rec: Dict[str, Any], terms: List[str], query_lang: str = "en") -> float:
+    """Term hits in body + small boosts for title/section, topic overlap, and doc_type."""
+    return _score_prepared(prepare_record(rec), terms, set(terms), query_lang)
+
 def topk(
     corpus: List[Dict[str, Any]],
     terms: List[str],
@@ -72,15 +83,21 @@ def topk(
     allow_doc_types: Optional[Set[str]] = None,
     block_sources: Optional[Set[str]] = None,
     query_lang: str = "en",
+    prepared: Optional[List[Dict[str, Any]]] = None,
 ) -> List[Dict[str, Any]]:
+    """`prepared` (from prepare_corpus) skips re-normalizing every record for every query."""
+    if prepared is None:
+        prepared = prepare_corpus(corpus)
+    term_set = set(terms)
     scored = []
-    for rec in corpus:
+    for p in prepared:
+        rec = p["rec"]
         # Optional pre-filters
         if block_sources and rec.get("source_key") in block_sources:
             continue
-        if allow_doc_types and (rec.get("doc_type") or "").lower() not in allow_doc_types:
+        if allow_doc_types and p["doc_type"] not in allow_doc_types:
             continue
-        s = score_record(rec, terms, query_lang=query_lang)
+        s = _score_prepared(p, terms, term_set, query_lang)
         if s > 0:
             scored.append((s, rec))
     scored.sort(key=lambda x: x[0], reverse=True)
@@ -116,6 +133,8 @@ def evaluate(
     misses = []
     # normalize the allow set to lowercase once
     allow_norm = set(d.lower() for d in allow_doc_types) if allow_doc_types else None
+    # normalize the corpus once for the whole gold set, not once per query
+    prepared = prepare_corpus(corpus)
     for item in gold:
         q = item["query"]
         rel_sources = set(item.get("relevant_sources", []))
@@ -132,6 +151,7 @@ def evaluate(
             allow_doc_types=allow_norm,
             block_sources=block_sources,
             query_lang=qlang,
+            prepared=prepared,
         )
         hit_sources = [h.get("source_key", "unknown") for h in hits]
         per_item.append({"id": item["id"], "query": q, "hit_sources": hit_sources})
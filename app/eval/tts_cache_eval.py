@@ -1,6 +1,17 @@
 ﻿# -*- coding: utf-8 -*-
+# Purpose: TTS cache hit rate on representative /say turns, measured against the cache the turn
+# engine really uses (get_cache(), SUKOON_TTS_CACHE_DIR): every `say` action plan_say() produces
+# is looked up under the SAPI engine's own key (engine/voice/rate as tts_engine_sapi.synth keys
+# it, SUKOON_TTS_VOICE / SUKOON_TTS_RATE). Lookups are read-only. --prerender first runs the
+# startup pre-render job (app/audio/tts/prerender.py) with the deployment's engines; lines the
+# engine cannot render stay misses. The configs/tts_cache.yaml rule matcher (graph._TTSCache)
+# is printed alongside for reference.
 from __future__ import annotations
+import argparse, asyncio, os, sys
+from typing import List, Optional
 from app.agent.graph import plan_say
+from app.audio.tts.tts_cache import cache_key, get_cache
+from app.audio.tts.tts_engine_sapi import cache_fields
 
 TARGET_HIT_RATE = 0.80
 UTTERANCES = [
@@ -9,16 +20,32 @@ UTTERANCES = [
     ("ur", "سانس کی کوئی آسان مشق بتائیں۔"),
 ]
 
-def main() -> int:
-    total_say = 0
-    hits = 0
+def _cached(text: str) -> bool:
+    meta = get_cache().meta(cache_key(text, **cache_fields()))
+    return bool(meta) and os.path.exists(meta["file"])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.eval.tts_cache_eval")
+    ap.add_argument("--prerender", action="store_true", help="run the startup pre-render job first")
+    args = ap.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.prerender:
+        from app.audio.tts.prerender import prerender_static
+        print(f"PRERENDER: {asyncio.run(prerender_static())}")
+
+    total_say = hits = legacy_total = legacy_hits = 0
     for lang, text in UTTERANCES:
         d = plan_say(text, lang)
         cost = d.get("cost", {})
-        total_say += int(cost.get("tts_total_say", 0))
-        hits += int(cost.get("tts_cache_hits", 0))
+        legacy_total += int(cost.get("tts_total_say", 0))
+        legacy_hits += int(cost.get("tts_cache_hits", 0))
+        for a in d.get("actions", []):
+            if a.get("type") == "say" and a.get("text"):
+                total_say += 1
+                hits += int(_cached(a["text"]))
     rate = (hits / total_say) if total_say else 0.0
-    print(f"TTS-CACHE: hits={hits} total={total_say} rate={rate:.3f}")
+    legacy = (legacy_hits / legacy_total) if legacy_total else 0.0
+    print(f"TTS-CACHE: cache={get_cache().stats()['root']} hits={hits} total={total_say} rate={rate:.3f}")
+    print(f"TTS-CACHE (rules): hits={legacy_hits} total={legacy_total} rate={legacy:.3f}")
     ok = rate >= TARGET_HIT_RATE
     print(f"VERDICT: {'PASS' if ok else 'FAIL'}")
     return 0 if ok else 1
@@ -49,8 +49,10 @@ def _node_input(ctx: Dict[str, Any]) -> Dict[str, Any]:
 
 def _node_policy_gate(ctx: Dict[str, Any]) -> Dict[str, Any]:
     # Keep the *same* term gates (non-negotiable). We only *observe* here.
+    # A request-scoped SafetyVerdict (app/safety/verdict.py) already holds detect_route(text).
     text = ctx.get("text", "")
-    gate = detect_route(text)
+    verdict = ctx.get("verdict")
+    gate = verdict.gate if verdict is not None else detect_route(text)
     ctx["route"] = gate.get("route", "assist")
     ctx["gate_detail"] = {"route": ctx["route"], "reason": gate.get("reason")}
     return ctx
@@ -92,14 +94,16 @@ def _node_respond(ctx: Dict[str, Any]) -> Dict[str, Any]:
 
 def run(text: str, mode: Optional[str] = "text",
         ui_lang: Optional[str] = None, ui_script: Optional[str] = None,
-        predecided_route: Optional[str] = None) -> Dict[str, Any]:
+        predecided_route: Optional[str] = None, verdict: Optional[Any] = None) -> Dict[str, Any]:
     """
     Execute a tiny 4-node pipeline: input → policy_gate → retrieve → respond.
     Returns a dict conforming to DecisionJSON (route/answer/graph/metrics).
+    `verdict`: the request's SafetyVerdict; when given, policy_gate reads it instead of re-scanning.
     """
     trace: List[TraceItem] = []
     node_ms: Dict[str, int] = {}
-    ctx: Dict[str, Any] = {"text": text, "mode": mode, "ui_lang": ui_lang, "ui_script": ui_script}
+    ctx: Dict[str, Any] = {"text": text, "mode": mode, "ui_lang": ui_lang, "ui_script": ui_script,
+                           "verdict": verdict}
 
     with _Timer() as t:
         ctx = _node_input(ctx)
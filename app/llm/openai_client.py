@@ -1,29 +1,130 @@
+import asyncio
 import os
-from typing import Dict, Any, Tuple, List
-from openai import OpenAI
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import httpx
+import openai
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from app.runtime.providers import ProviderUnavailable, get_provider
+
+# Provider-side failures (connection/timeout, 429, 5xx) count toward the circuit breaker.
+_PROVIDER_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
 
 class LLMClient:
     def __init__(self, model: str | None = None):
         self.model = model or os.getenv("SUKOON_LLM_MODEL", "gpt-4o-mini")
         self.temp = float(os.getenv("SUKOON_LLM_TEMP", "0.4"))
-        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), timeout=get_provider("openai").timeout)
+        self._aclient: AsyncOpenAI | None = None
+        self._aloop = None
 
-    def chat(self, system_prompt: str, user_text: str, lang_hint: str = "ur") -> Tuple[str, Dict[str, Any]]:
-        """Return (text, usage)."""
-        messages: List[Dict[str, str]] = [
+    def _messages(self, system_prompt: str, user_text: str) -> List[Dict[str, str]]:
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_text},
         ]
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temp,
-            max_tokens=400,
-            messages=messages,
-        )
-        out = resp.choices[0].message.content
-        usage = {
-            "prompt_tokens": getattr(resp.usage, "prompt_tokens", None),
-            "completion_tokens": getattr(resp.usage, "completion_tokens", None),
-            "total_tokens": getattr(resp.usage, "total_tokens", None),
+
+    @staticmethod
+    def _usage(u) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": getattr(u, "prompt_tokens", None),
+            "completion_tokens": getattr(u, "completion_tokens", None),
+            "total_tokens": getattr(u, "total_tokens", None),
         }
-        return out, usage
+
+    @classmethod
+    def _result(cls, resp) -> Tuple[str, Dict[str, Any]]:
+        return resp.choices[0].message.content, cls._usage(resp.usage)
+
+    def _request(self, system_prompt: str, user_text: str, stream: bool = False) -> Dict[str, Any]:
+        req: Dict[str, Any] = {
+            "model": self.model,
+            "temperature": self.temp,
+            "max_tokens": 400,
+            "messages": self._messages(system_prompt, user_text),
+        }
+        if stream:
+            req.update(stream=True, stream_options={"include_usage": True})  # usage arrives in the last chunk
+        return req
+
+    def _delta(self, chunk, usage: Optional[Dict[str, Any]]) -> Optional[str]:
+        if usage is not None and getattr(chunk, "usage", None) is not None:
+            usage.update(self._usage(chunk.usage))
+        if chunk.choices:
+            return chunk.choices[0].delta.content or None
+        return None
+
+    @contextmanager
+    def _guard(self):
+        """
+        Circuit breaker (app/runtime/providers.py): while OpenAI is failing, calls raise
+        ProviderUnavailable at once and the turn answers with its LLM-down reply.
+        """
+        breaker = get_provider("openai").breaker
+        probe = breaker.admit()
+        if probe is None:
+            raise ProviderUnavailable("openai circuit open")
+        ok: Optional[bool] = None   # None: no answer and not OpenAI's fault (cancelled, caller error)
+        try:
+            yield
+            ok = True
+        except _PROVIDER_ERRORS:
+            ok = False
+            raise
+        except GeneratorExit:       # stream consumer stopped early: the answer was arriving
+            ok = True
+            raise
+        finally:
+            if ok is None:
+                breaker.release(probe)
+            else:
+                breaker.success() if ok else breaker.failure()
+
+    def chat(self, system_prompt: str, user_text: str, lang_hint: str = "ur") -> Tuple[str, Dict[str, Any]]:
+        """Return (text, usage)."""
+        with self._guard():
+            resp = self.client.chat.completions.create(**self._request(system_prompt, user_text))
+        return self._result(resp)
+
+    def stream(self, system_prompt: str, user_text: str, lang_hint: str = "ur",
+               usage: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Streaming chat(): yields text deltas as the model produces them.
+        Pass a dict as `usage` to receive the token counts once the stream ends.
+        """
+        with self._guard():
+            for chunk in self.client.chat.completions.create(**self._request(system_prompt, user_text, stream=True)):
+                delta = self._delta(chunk, usage)
+                if delta:
+                    yield delta
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async client with a bounded keep-alive connection pool (SUKOON_LLM_MAX_CONN, default 32).
+        Pooled connections belong to one event loop, so a new loop gets a new client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aloop is not loop:
+            self._aloop = loop
+            n = max(1, int(os.getenv("SUKOON_LLM_MAX_CONN", "32")))
+            self._aclient = AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"), timeout=get_provider("openai").timeout,
+                http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(max_connections=n, max_keepalive_connections=n)),
+            )
+        return self._aclient
+
+    async def achat(self, system_prompt: str, user_text: str, lang_hint: str = "ur") -> Tuple[str, Dict[str, Any]]:
+        """Async chat(): same request and return shape, awaits the HTTP call instead of blocking."""
+        with self._guard():
+            resp = await self.aclient.chat.completions.create(**self._request(system_prompt, user_text))
+        return self._result(resp)
+
+    async def astream(self, system_prompt: str, user_text: str, lang_hint: str = "ur",
+                      usage: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Async stream(): the first delta arrives after the first token, not the whole answer."""
+        with self._guard():
+            async for chunk in await self.aclient.chat.completions.create(**self._request(system_prompt, user_text, stream=True)):
+                delta = self._delta(chunk, usage)
+                if delta:
+                    yield delta
@@ -1,21 +1,194 @@
 ﻿# app/ops/cost_meter.py
+# Rows are not written on the request path: log_event() appends to an in-memory buffer and one
+# background thread per CSV (CostWriter) writes them in batches, every SUKOON_COST_FLUSH_ROWS
+# rows (64) or SUKOON_COST_FLUSH_S seconds (2.0), and at shutdown (close_cost_writers(), also
+# registered with atexit). Every CostMeter on the same file shares that writer; each batch is
+# one append under an advisory lock on "<csv>.lock", so several worker processes never
+# interleave rows. A full buffer (SUKOON_COST_BUFFER rows, 10000) is flushed by the caller
+# rather than dropped; SUKOON_COST_BUFFER=0 writes every row at once (old behaviour).
+import atexit
 import csv
+import io
 import json
 import os
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
+
+from app.ops.metrics import get_metrics
 
 try:
     import yaml  # PyYAML
 except ImportError:
     yaml = None
 
+try:
+    import fcntl  # POSIX file lock
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows
+
+HEADER = ["ts_utc", "component", "unit", "units", "unit_cost_pkr", "cost_pkr", "plan", "metadata_json"]
+
+
+class _FileLock:
+    """Advisory inter-process lock on a sidecar file (flock / msvcrt.locking)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+
+    def __enter__(self) -> "_FileLock":
+        self._f = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_EX)
+        else:
+            self._f.seek(0)
+            msvcrt.locking(self._f.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            else:
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._f.close()
+
+
+class CostWriter:
+    """Single writer of one costs CSV: buffered rows, batched appends on a daemon thread."""
+
+    def __init__(self, path: str, flush_rows: Optional[int] = None, flush_s: Optional[float] = None,
+                 capacity: Optional[int] = None):
+        self.path = path
+        self.flush_rows = max(1, int(flush_rows or os.getenv("SUKOON_COST_FLUSH_ROWS", "64")))
+        self.flush_s = float(flush_s or os.getenv("SUKOON_COST_FLUSH_S", "2.0"))
+        self.capacity = int(capacity if capacity is not None else os.getenv("SUKOON_COST_BUFFER", "10000"))
+        self._rows: List[list] = []
+        self._lock = threading.Lock()        # guards _rows
+        self._io = threading.Lock()          # one batch on the file at a time (this process)
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._n = {"rows": 0, "batches": 0, "written": 0, "inline_flushes": 0, "errors": 0}
+
+    def write(self, row: list) -> None:
+        if self.capacity <= 0 or self._closed:
+            with self._lock:
+                self._rows.append(row)
+                self._n["rows"] += 1
+            self.flush()
+            return
+        with self._lock:
+            self._rows.append(row)
+            self._n["rows"] += 1
+            pending = len(self._rows)
+        if pending >= self.capacity:          # writer fell behind: never drop, write it here
+            with self._lock:
+                self._n["inline_flushes"] += 1
+            self.flush()
+        elif pending >= self.flush_rows:
+            self._wake.set()
+        self._start()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None and not self._closed:
+                    self._thread = threading.Thread(target=self._run, name="cost-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered row now; returns how many were written."""
+        with self._io:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            buf = io.StringIO()
+            csv.writer(buf).writerows(rows)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with _FileLock(self.path + ".lock"):
+                    new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                    with open(self.path, "a", newline="", encoding="utf-8") as f:
+                        if new:
+                            csv.writer(f).writerow(HEADER)
+                        f.write(buf.getvalue())
+            except OSError:
+                with self._lock:             # keep the rows for the next attempt
+                    self._rows[:0] = rows
+                    self._n["errors"] += 1
+                return 0
+            with self._lock:
+                self._n["batches"] += 1
+                self._n["written"] += len(rows)
+            return len(rows)
+
+    def close(self) -> None:
+        """Stop the thread and write what is left (app shutdown / interpreter exit)."""
+        self._closed = True
+        self._wake.set()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, "pending": len(self._rows), **self._n}
+
+
+_WRITERS: Dict[str, CostWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_cost_writer(path: str) -> CostWriter:
+    """Process-wide CostWriter for `path` (created on first use)."""
+    key = os.path.abspath(path)
+    w = _WRITERS.get(key)
+    if w is None:
+        with _WRITERS_LOCK:
+            w = _WRITERS.get(key)
+            if w is None:
+                w = _WRITERS[key] = CostWriter(path)
+    return w
+
+
+def flush_cost_writers() -> None:
+    for w in list(_WRITERS.values()):
+        w.flush()
+
+
+def close_cost_writers() -> None:
+    """Flush and stop every writer; a later log_event starts a fresh one."""
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for w in writers:
+        w.close()
+
+
+def cost_writer_stats() -> List[Dict[str, Any]]:
+    return [w.stats() for w in list(_WRITERS.values())]
+
+
+atexit.register(close_cost_writers)
+
 
 class CostMeter:
     """
     Minimal cost/event logger.
     Reads PKR unit costs and plan caps from configs/costing.yaml,
-    writes per-event rows to artifacts/ops/costs_daily.csv.
+    writes per-event rows to artifacts/ops/costs_daily.csv (batched by the shared CostWriter).
     """
 
     def __init__(self, config_path: str = "configs/costing.yaml", log_path: str = "artifacts/ops/costs_daily.csv"):
@@ -23,7 +196,6 @@ class CostMeter:
         self.log_path = log_path
         os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
         self._config = self._load_config()
-        self._ensure_header()
 
     def _load_config(self) -> Dict[str, Any]:
         if yaml is None or not os.path.exists(self.config_path):
@@ -31,14 +203,6 @@ class CostMeter:
         with open(self.config_path, "r", encoding="utf-8") as f:
             return yaml.safe_load(f) or {}
 
-    def _ensure_header(self) -> None:
-        if not os.path.exists(self.log_path):
-            with open(self.log_path, "w", newline="", encoding="utf-8") as f:
-                csv.writer(f).writerow([
-                    "ts_utc", "component", "unit", "units",
-                    "unit_cost_pkr", "cost_pkr", "plan", "metadata_json"
-                ])
-
     def _unit_cost_pkr(self, component: str, unit: str) -> float:
         """
         Supports:
@@ -64,17 +228,17 @@ class CostMeter:
         plan = self.current_plan()
         meta_json = json.dumps(metadata or {}, ensure_ascii=False)
 
-        with open(self.log_path, "a", newline="", encoding="utf-8") as f:
-            csv.writer(f).writerow([
-                datetime.now(timezone.utc).isoformat(),
-                component,
-                unit,
-                units,
-                uc,
-                cost,
-                plan,
-                meta_json
-            ])
+        get_cost_writer(self.log_path).write([
+            datetime.now(timezone.utc).isoformat(),
+            component,
+            unit,
+            units,
+            uc,
+            cost,
+            plan,
+            meta_json
+        ])
+        get_metrics().add_cost(plan, component, cost)
 
         return {
             "component": component,
@@ -85,6 +249,10 @@ class CostMeter:
             "plan": plan
         }
 
+    def flush(self) -> None:
+        """Write buffered rows now (readers of the CSV in the same process, tests)."""
+        get_cost_writer(self.log_path).flush()
+
     # Additive timings logger (no header changes; data goes into metadata_json)
     def log_timings(self, route: str, timings: Dict[str, float]) -> None:
         meta = {"route": route, **timings}
@@ -0,0 +1,302 @@
+# app/ops/cost_rollup.py
+# Purpose: Columnar rollups of the append-only cost log (artifacts/ops/costs_daily.csv), so ops
+# questions ("p95 tts_ms for assist turns last week per plan") read a few NumPy arrays instead of
+# re-parsing every CSV row and every metadata_json string.
+#
+#   compact   new CSV rows → one compressed .npz per UTC day (<out>/costs_<YYYYMMDD>.npz):
+#             ts (epoch s), units, unit_cost_pkr, cost_pkr as float64; component, unit, plan and
+#             route dictionary-encoded (<col> int32 codes + <col>__vocab); every numeric *_ms field
+#             and tts_rtf of metadata_json flattened into its own float64 column (NaN = absent).
+#             Incremental: the byte offset already compacted is kept in <out>/_state.json; a CSV
+#             that was truncated or replaced is rebuilt from the start.
+#   load      the columns of the days in [since, until], concatenated
+#   percentiles / cost_summary   grouped by plan / route / component / unit
+#
+#   python -m app.ops.cost_rollup compact
+#   python -m app.ops.cost_rollup pct --field tts_ms --route assist --days 7 --by plan
+#   python -m app.ops.cost_rollup cost --days 7 --by plan,component [--json]
+from __future__ import annotations
+import argparse, csv, hashlib, io, json, math, os, sys, time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CSV_PATH = "artifacts/ops/costs_daily.csv"
+OUT_DIR = "artifacts/ops/rollups"
+CATEGORICAL = ("component", "unit", "plan", "route")
+NUMERIC = ("units", "unit_cost_pkr", "cost_pkr")
+_STATE = "_state.json"
+
+Columns = Dict[str, np.ndarray]
+
+
+# ---------- compaction ----------
+def _route(meta: Dict[str, Any]) -> str:
+    if meta.get("route"):
+        return str(meta["route"])
+    return "abstain" if meta.get("abstain") else ""
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _epoch(ts: str) -> float:
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return math.nan
+
+
+def _parse(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, list]]:
+    """CSV dict rows → {YYYYMMDD: {column: values}} with metadata timings flattened."""
+    days: Dict[str, Dict[str, list]] = {}
+    for r in rows:
+        ts = _epoch(r.get("ts_utc") or "")
+        if math.isnan(ts):
+            continue
+        try:
+            meta = json.loads(r.get("metadata_json") or "{}")
+        except ValueError:
+            meta = {}
+        if not isinstance(meta, dict):
+            meta = {}
+        day = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d")
+        cols = days.setdefault(day, {"ts": []})
+        n = len(cols["ts"])
+        vals: Dict[str, Any] = {"ts": ts, "component": r.get("component") or "", "unit": r.get("unit") or "",
+                                "plan": r.get("plan") or "", "route": _route(meta)}
+        for k in NUMERIC:
+            vals[k] = _num(r.get(k))
+        for k, v in meta.items():
+            if (k.endswith("_ms") or k == "tts_rtf") and isinstance(v, (int, float)) and not isinstance(v, bool):
+                vals[k] = float(v)
+        for k, v in vals.items():
+            col = cols.get(k)
+            if col is None:   # a field first seen now: earlier rows of the day did not have it
+                col = cols[k] = [math.nan] * n
+            col.append(v)
+        for k, col in cols.items():
+            if len(col) == n:
+                col.append(math.nan)
+    return days
+
+
+def _encode(cols: Dict[str, list]) -> Columns:
+    out: Columns = {}
+    for k, v in cols.items():
+        if k in CATEGORICAL:
+            vocab, codes = np.unique(np.asarray(v, dtype=str), return_inverse=True)
+            out[k] = codes.astype(np.int32)
+            out[k + "__vocab"] = vocab
+        else:
+            out[k] = np.asarray(v, dtype=np.float64)
+    return out
+
+
+def _decode(npz: Dict[str, np.ndarray]) -> Columns:
+    """Stored arrays → columns with categoricals as string arrays."""
+    out: Columns = {}
+    for k, v in npz.items():
+        if k.endswith("__vocab"):
+            continue
+        out[k] = npz[k + "__vocab"][v] if k in CATEGORICAL else v
+    return out
+
+
+def concat(parts: Sequence[Columns]) -> Columns:
+    """Concatenate decoded column sets; a column missing from a part is NaN / '' there."""
+    parts = [p for p in parts if len(p.get("ts", ()))]
+    if not parts:
+        return {}
+    keys = sorted({k for p in parts for k in p})
+    out: Columns = {}
+    for k in keys:
+        chunks = []
+        for p in parts:
+            n = len(p["ts"])
+            chunks.append(p[k] if k in p else (np.full(n, "", dtype=str) if k in CATEGORICAL
+                                               else np.full(n, np.nan)))
+        out[k] = np.concatenate(chunks)
+    return out
+
+
+def _day_path(out_dir: Path, day: str) -> Path:
+    return out_dir / f"costs_{day}.npz"
+
+
+def _read_day(path: Path) -> Columns:
+    with np.load(path, allow_pickle=False) as z:
+        return _decode({k: z[k] for k in z.files})
+
+
+def _write_day(path: Path, cols: Columns) -> None:
+    enc = _encode({k: list(v) for k, v in cols.items()})
+    tmp = path.with_name(path.stem + ".part.npz")
+    np.savez_compressed(tmp, **enc)
+    os.replace(tmp, path)
+
+
+def compact(csv_path: str = CSV_PATH, out_dir: str = OUT_DIR) -> Dict[str, Any]:
+    """Roll the CSV rows not compacted yet into the per-day .npz files; returns a summary."""
+    src, out = Path(csv_path), Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    if not src.exists():
+        return {"rows": 0, "days": [], "offset": 0}
+    state_path = out / _STATE
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except Exception:
+        state = {}
+    with src.open("rb") as f:
+        header = f.readline()
+        head_sha = hashlib.sha1(header).hexdigest()
+        size = src.stat().st_size
+        offset = int(state.get("offset") or 0)
+        if state.get("csv") != str(src) or state.get("header_sha") != head_sha or offset > size or offset < len(header):
+            for old in out.glob("costs_*.npz"):          # new or rotated log: rebuild
+                old.unlink()
+            offset = len(header)
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b"\n") + 1                          # only whole lines; a partial row waits
+    body = chunk[:end].decode("utf-8-sig", errors="replace")
+    names = next(csv.reader(io.StringIO(header.decode("utf-8-sig", errors="replace"))))
+    rows = list(csv.DictReader(io.StringIO(body), fieldnames=names))
+    days = _parse(rows)
+    for day, cols in sorted(days.items()):
+        new = {k: np.asarray(v, dtype=str if k in CATEGORICAL else np.float64) for k, v in cols.items()}
+        path = _day_path(out, day)
+        merged = concat([_read_day(path), new]) if path.exists() else new
+        _write_day(path, merged)
+    state = {"csv": str(src), "header_sha": head_sha, "offset": offset + end, "compacted_at": time.time()}
+    state_path.write_text(json.dumps(state), encoding="utf-8")
+    return {"rows": sum(len(c["ts"]) for c in days.values()), "days": sorted(days), "offset": state["offset"]}
+
+
+# ---------- queries ----------
+def load(out_dir: str = OUT_DIR, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Columns:
+    """Columns of every row with since <= ts < until (UTC datetimes; None = unbounded)."""
+    lo = since.strftime("%Y%m%d") if since else ""
+    hi = until.strftime("%Y%m%d") if until else "99999999"
+    parts = [_read_day(p) for p in sorted(Path(out_dir).glob("costs_*.npz"))
+             if lo <= p.stem.split("_", 1)[1] <= hi]
+    cols = concat(parts)
+    if cols and (since or until):
+        mask = np.ones(len(cols["ts"]), dtype=bool)
+        if since:
+            mask &= cols["ts"] >= since.timestamp()
+        if until:
+            mask &= cols["ts"] < until.timestamp()
+        cols = {k: v[mask] for k, v in cols.items()}
+    return cols
+
+
+def _groups(cols: Columns, by: Sequence[str], mask: np.ndarray) -> List[Tuple[Tuple[str, ...], np.ndarray]]:
+    if not by:
+        return [((), mask)]
+    keys = np.stack([cols[b][mask] for b in by], axis=1) if mask.any() else np.empty((0, len(by)), dtype=str)
+    idx = np.flatnonzero(mask)
+    out = []
+    for key in sorted({tuple(k) for k in keys}):
+        sel = np.ones(len(idx), dtype=bool)
+        for j, b in enumerate(by):
+            sel &= keys[:, j] == key[j]
+        m = np.zeros_like(mask)
+        m[idx[sel]] = True
+        out.append((tuple(str(k) for k in key), m))
+    return out
+
+
+def _filter(cols: Columns, route: Optional[str] = None, component: Optional[str] = None) -> np.ndarray:
+    mask = np.ones(len(cols.get("ts", ())), dtype=bool)
+    if route:
+        mask &= cols["route"] == route
+    if component:
+        mask &= cols["component"] == component
+    return mask
+
+
+def percentiles(cols: Columns, field: str, by: Sequence[str] = (), route: Optional[str] = None,
+                qs: Sequence[float] = (50, 95, 99)) -> List[Dict[str, Any]]:
+    """Percentiles of a numeric column (e.g. tts_ms) per group; rows without the field are skipped."""
+    if not cols or field not in cols:
+        return []
+    mask = _filter(cols, route) & ~np.isnan(cols[field])
+    out = []
+    for key, m in _groups(cols, by, mask):
+        vals = cols[field][m]
+        row: Dict[str, Any] = dict(zip(by, key))
+        row["n"] = int(vals.size)
+        for q, v in zip(qs, np.percentile(vals, qs) if vals.size else [math.nan] * len(qs)):
+            row[f"p{q:g}"] = round(float(v), 2)
+        out.append(row)
+    return out
+
+
+def cost_summary(cols: Columns, by: Sequence[str] = ("plan",), route: Optional[str] = None) -> List[Dict[str, Any]]:
+    """PKR, event count and metered units per group."""
+    if not cols:
+        return []
+    out = []
+    for key, m in _groups(cols, by, _filter(cols, route)):
+        row: Dict[str, Any] = dict(zip(by, key))
+        row.update(events=int(m.sum()), pkr=round(float(np.nansum(cols["cost_pkr"][m])), 6),
+                   units=round(float(np.nansum(cols["units"][m])), 3))
+        out.append(row)
+    return out
+
+
+# ---------- CLI ----------
+def _print(rows: List[Dict[str, Any]], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    if not rows:
+        print("(no rows)")
+        return
+    keys = list(rows[0])
+    print("  ".join(keys))
+    for r in rows:
+        print("  ".join(str(r.get(k, "")) for k in keys))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Columnar rollups of costs_daily.csv and queries over them.")
+    ap.add_argument("--csv", default=CSV_PATH)
+    ap.add_argument("--out", default=OUT_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("compact", help="roll new CSV rows into the per-day .npz files")
+    for name, helptext in (("pct", "latency percentiles"), ("cost", "PKR / event totals")):
+        p = sub.add_parser(name, help=helptext)
+        p.add_argument("--days", type=float, default=7, help="look-back window (0 = everything)")
+        p.add_argument("--by", default="plan", help="comma list of plan, route, component, unit ('' = none)")
+        p.add_argument("--route", default=None, help="assist | crisis | abstain")
+        p.add_argument("--no-compact", action="store_true", help="query the rollups as they are")
+        p.add_argument("--json", action="store_true")
+        if name == "pct":
+            p.add_argument("--field", default="total_ms", help="e.g. tts_ms, llm_ms, total_ms")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "compact":
+        print(json.dumps(compact(args.csv, args.out)))
+        return 0
+    if not args.no_compact:
+        compact(args.csv, args.out)
+    since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+    cols = load(args.out, since=since)
+    by = [b.strip() for b in args.by.split(",") if b.strip()]
+    if args.cmd == "pct":
+        _print(percentiles(cols, args.field, by=by, route=args.route), args.json)
+    else:
+        _print(cost_summary(cols, by=by, route=args.route), args.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# app/ops/debug_sink.py
+# Purpose: Opt-in, sampled debug capture of /api/web/turn results, off the request path. This
+# replaces the synchronous pretty-printed rewrite of artifacts/ICP/last_turn.json on every turn:
+#   - a bounded in-memory ring of the last N sampled turns, served at GET /api/debug/turns
+#   - optional persistence of the latest one to a JSON file by a background thread; turns
+#     that arrive while a write is in progress coalesce (only the newest is written)
+#
+# Env: SUKOON_DEBUG_TURNS    ring size (default 0 = off)
+#      SUKOON_DEBUG_SAMPLE   fraction of turns captured (default 1.0)
+#      SUKOON_DEBUG_PERSIST  1 → artifacts/ICP/last_turn.json, or a path; unset = memory only
+from __future__ import annotations
+import copy, json, logging, os, random, tempfile, threading, time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+log = logging.getLogger("app.debug_sink")
+
+DEFAULT_PERSIST = "artifacts/ICP/last_turn.json"
+
+
+class DebugSink:
+    """Ring of sampled turn snapshots, with optional coalesced background persistence."""
+
+    def __init__(self, capacity: int = 0, sample: float = 1.0, persist: Optional[str] = None):
+        self.capacity = max(0, int(capacity))
+        self.sample = min(1.0, max(0.0, float(sample)))
+        self.persist = persist or None
+        self._ring: Deque[Dict[str, Any]] = deque(maxlen=self.capacity or 1)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._pending: Optional[Dict[str, Any]] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._n = {"seen": 0, "captured": 0, "written": 0, "coalesced": 0, "write_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def record(self, turn: Dict[str, Any]) -> bool:
+        """Capture a snapshot of `turn` if enabled and sampled; never blocks on disk."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._n["seen"] += 1
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return False
+        entry = {"ts": time.time(), "turn": copy.deepcopy(turn)}   # the caller keeps mutating its dict
+        with self._cond:
+            self._ring.append(entry)
+            self._n["captured"] += 1
+            if self.persist and not self._closed:
+                if self._pending is not None:
+                    self._n["coalesced"] += 1
+                self._pending = entry
+                self._cond.notify()
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="debug-sink", daemon=True)
+                    self._thread.start()
+        return True
+
+    def recent(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest first."""
+        with self._lock:
+            items = list(self._ring)[::-1]
+        return items[:n] if n else items
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                entry, self._pending = self._pending, None
+            if entry is not None:
+                self._write(entry["turn"])
+            elif self._closed:
+                return
+
+    def _write(self, turn: Dict[str, Any]) -> None:
+        try:
+            d = os.path.dirname(self.persist) or "."
+            os.makedirs(d, exist_ok=True)
+            with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=d, prefix="last_turn.", suffix=".json",
+                                             encoding="utf-8") as tf:
+                json.dump(turn, tf, ensure_ascii=False, indent=2, default=str)
+            os.replace(tf.name, self.persist)
+            with self._lock:
+                self._n["written"] += 1
+        except Exception as e:
+            log.debug("debug sink write failed: %s", e)
+            with self._lock:
+                self._n["write_errors"] += 1
+
+    def close(self) -> None:
+        """Write the pending snapshot (if any) and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            t = self._thread
+        if t is not None:
+            t.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"capacity": self.capacity, "sample": self.sample, "persist": self.persist,
+                    "buffered": len(self._ring) if self.enabled else 0, **self._n}
+
+
+def _from_env() -> DebugSink:
+    persist = os.getenv("SUKOON_DEBUG_PERSIST", "").strip()
+    if persist in ("", "0"):
+        persist = ""
+    elif persist == "1":
+        persist = DEFAULT_PERSIST
+    return DebugSink(capacity=int(os.getenv("SUKOON_DEBUG_TURNS", "0") or 0),
+                     sample=float(os.getenv("SUKOON_DEBUG_SAMPLE", "1.0")), persist=persist or None)
+
+
+_SINK: Optional[DebugSink] = None
+_SINK_LOCK = threading.Lock()
+
+def get_debug_sink() -> DebugSink:
+    """Process-wide DebugSink configured from the environment (created on first use)."""
+    global _SINK
+    if _SINK is None:
+        with _SINK_LOCK:
+            if _SINK is None:
+                _SINK = _from_env()
+    return _SINK
@@ -0,0 +1,246 @@
+# app/ops/metrics.py
+# Purpose: Live, in-memory cost/latency aggregates, so SLOs can be watched under load without
+# post-processing costs_daily.csv or reading last_turn.json:
+#   latency  per (route, stage): route = assist | crisis | abstain ("all" = every route),
+#            stage = safety | retrieval | llm | tts | stt | total | request (end-to-end /api/web/turn)
+#            p50/p95/p99 over a rolling window (SUKOON_METRICS_WINDOW_S, default 300 s) plus
+#            lifetime count/sum
+#   cost     PKR and events per plan and component (from CostMeter.log_event)
+#   caches   hit rates of the TTS cache and the in-memory audio hot set (read at snapshot time)
+#
+# Histograms are HDR-style log buckets (LogHistogram): constant memory per series, every
+# quantile within SUKOON_METRICS_PRECISION (1%) relative error, mergeable across time slots.
+# Served as JSON or Prometheus text at /api/ops/metrics (app/api/metrics.py).
+from __future__ import annotations
+import math, os, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+
+STAGES = ("safety", "retrieval", "llm", "tts", "stt", "total")
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LogHistogram:
+    """Log-bucketed histogram: bucket i holds (γ^(i-1), γ^i], γ = (1+p)/(1-p) for precision p."""
+
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self.gamma = (1 + precision) / (1 - precision)
+        self._lg = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0                      # values ≤ 0 (e.g. a stage that was skipped at 0 ms)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, v: float) -> None:
+        v = float(v)
+        if v <= 0:
+            self.zeros += 1
+        else:
+            i = math.ceil(math.log(v) / self._lg)
+            self.buckets[i] = self.buckets.get(i, 0) + 1
+        self.count += 1
+        self.sum += v
+        self.min, self.max = min(self.min, v), max(self.max, v)
+
+    def merge(self, other: "LogHistogram") -> None:
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                v = 2 * self.gamma ** i / (self.gamma + 1)   # bucket midpoint (relative error ≤ p)
+                return min(max(v, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count}
+        if self.count:
+            out.update(mean=round(self.sum / self.count, 2), min=round(self.min, 2), max=round(self.max, 2))
+            for q in QUANTILES:
+                out[f"p{int(q * 100)}"] = round(self.quantile(q), 2)
+        return out
+
+
+class RollingHistogram:
+    """`slots` LogHistograms covering `window_s` seconds; older slots are recycled."""
+
+    def __init__(self, window_s: float = 300.0, slots: int = 5, precision: float = 0.01):
+        self.window_s = float(window_s)
+        self.slot_s = self.window_s / max(1, slots)
+        self.precision = precision
+        self._slots: List[Tuple[int, LogHistogram]] = []
+        self.count = 0                      # lifetime
+        self.sum = 0.0
+
+    def add(self, v: float, now: Optional[float] = None) -> None:
+        slot = int((time.time() if now is None else now) // self.slot_s)
+        if not self._slots or self._slots[-1][0] != slot:
+            horizon = slot - int(self.window_s // self.slot_s)
+            self._slots = [s for s in self._slots if s[0] > horizon]
+            self._slots.append((slot, LogHistogram(self.precision)))
+        self._slots[-1][1].add(v)
+        self.count += 1
+        self.sum += float(v)
+
+    def window(self, now: Optional[float] = None) -> LogHistogram:
+        horizon = int((time.time() if now is None else now) // self.slot_s) - int(self.window_s // self.slot_s)
+        merged = LogHistogram(self.precision)
+        for slot, h in self._slots:
+            if slot > horizon:
+                merged.merge(h)
+        return merged
+
+
+class Metrics:
+    """Process-wide registry of latency histograms, cost counters and turn counts."""
+
+    def __init__(self, window_s: Optional[float] = None, precision: Optional[float] = None):
+        self.window_s = float(window_s or os.getenv("SUKOON_METRICS_WINDOW_S", "300"))
+        self.precision = float(precision or os.getenv("SUKOON_METRICS_PRECISION", "0.01"))
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], RollingHistogram] = {}
+        self._turns: Dict[str, int] = {}
+        self._cost: Dict[Tuple[str, str], List[float]] = {}   # (plan, component) → [pkr, events]
+
+    # ---------- recording ----------
+    def observe(self, stage: str, ms: float, route: Optional[str] = None) -> None:
+        """One latency sample for `stage` (and for `route`, when the stage belongs to a turn)."""
+        with self._lock:
+            for key in ((route, stage), ("all", stage)) if route and route != "all" else (("all", stage),):
+                h = self._latency.get(key)
+                if h is None:
+                    h = self._latency[key] = RollingHistogram(self.window_s, precision=self.precision)
+                h.add(ms)
+
+    def record_turn(self, resp: Dict[str, Any]) -> None:
+        """A finished run_turn result: count the route, observe its per-stage timings."""
+        route = str(resp.get("route") or "unknown")
+        m = resp.get("metrics") or {}
+        with self._lock:
+            self._turns[route] = self._turns.get(route, 0) + 1
+        for stage in STAGES:
+            v = m.get(f"{stage}_ms")
+            if isinstance(v, (int, float)):
+                self.observe(stage, v, route)
+
+    def add_cost(self, plan: str, component: str, pkr: float) -> None:
+        with self._lock:
+            c = self._cost.setdefault((plan, component), [0.0, 0])
+            c[0] += float(pkr)
+            c[1] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._turns.clear()
+            self._cost.clear()
+
+    # ---------- reading ----------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = {k: (h.window(), h.count, h.sum) for k, h in self._latency.items()}
+            turns = dict(self._turns)
+            cost = {k: list(v) for k, v in self._cost.items()}
+        routes: Dict[str, Any] = {}
+        for (route, stage), (win, n, total) in sorted(lat.items()):
+            r = routes.setdefault(route, {"turns": turns.get(route, 0) if route != "all" else sum(turns.values()),
+                                          "stages": {}})
+            r["stages"][stage] = {**win.summary(), "lifetime_count": n, "lifetime_sum_ms": round(total, 1)}
+        for route, n in turns.items():
+            routes.setdefault(route, {"turns": n, "stages": {}})
+        plans: Dict[str, Any] = {}
+        for (plan, comp), (pkr, events) in sorted(cost.items()):
+            p = plans.setdefault(plan, {"pkr": 0.0, "events": 0, "by_component": {}})
+            p["pkr"] = round(p["pkr"] + pkr, 6)
+            p["events"] += int(events)
+            p["by_component"][comp] = {"pkr": round(pkr, 6), "events": int(events)}
+        return {"window_s": self.window_s, "precision": self.precision, "routes": routes,
+                "cost": plans, "caches": cache_rates()}
+
+
+def cache_rates() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of the caches on the turn path (modules that are not loaded are skipped)."""
+    out: Dict[str, Dict[str, Any]] = {}
+
+    def put(name: str, hits: int, misses: int) -> None:
+        looked = hits + misses
+        out[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / looked, 4) if looked else 0.0}
+
+    try:
+        from app.audio.tts import tts_cache
+        if tts_cache._CACHE is not None:
+            st = tts_cache._CACHE.stats()
+            put("tts", st["hits"], st["misses"])
+    except Exception:
+        pass
+    try:
+        import sys
+        audio = sys.modules.get("app.api.audio")
+        if audio is not None:
+            st = audio.audio_stats()
+            put("audio_hot", st["hot_hits"], st["disk_reads"])
+    except Exception:
+        pass
+    return out
+
+
+def _labels(**kw: str) -> str:
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in kw.items()) + "}"
+
+
+def prometheus(snap: Dict[str, Any], prefix: str = "sukoon") -> str:
+    """Prometheus text exposition (0.0.4) of a Metrics.snapshot()."""
+    lines: List[str] = [f"# HELP {prefix}_latency_ms Stage latency (ms), quantiles over the rolling window.",
+                        f"# TYPE {prefix}_latency_ms summary"]
+    for route, r in snap["routes"].items():
+        for stage, s in r["stages"].items():
+            for q in QUANTILES:
+                v = s.get(f"p{int(q * 100)}")
+                if v is not None:
+                    lines.append(f"{prefix}_latency_ms{_labels(route=route, stage=stage, quantile=str(q))} {v}")
+            lines.append(f"{prefix}_latency_ms_sum{_labels(route=route, stage=stage)} {s['lifetime_sum_ms']}")
+            lines.append(f"{prefix}_latency_ms_count{_labels(route=route, stage=stage)} {s['lifetime_count']}")
+    lines += [f"# HELP {prefix}_turns_total Finished turns per route.", f"# TYPE {prefix}_turns_total counter"]
+    lines += [f"{prefix}_turns_total{_labels(route=route)} {r['turns']}"
+              for route, r in snap["routes"].items() if route != "all"]
+    lines += [f"# HELP {prefix}_cost_pkr_total Metered cost (PKR) per plan and component.",
+              f"# TYPE {prefix}_cost_pkr_total counter"]
+    for plan, p in snap["cost"].items():
+        for comp, c in p["by_component"].items():
+            lines.append(f"{prefix}_cost_pkr_total{_labels(plan=plan, component=comp)} {c['pkr']}")
+    lines += [f"# HELP {prefix}_cost_events_total Metered events per plan and component.",
+              f"# TYPE {prefix}_cost_events_total counter"]
+    for plan, p in snap["cost"].items():
+        for comp, c in p["by_component"].items():
+            lines.append(f"{prefix}_cost_events_total{_labels(plan=plan, component=comp)} {c['events']}")
+    lines += [f"# HELP {prefix}_cache_hit_ratio Cache hit ratio since start.", f"# TYPE {prefix}_cache_hit_ratio gauge"]
+    lines += [f"{prefix}_cache_hit_ratio{_labels(cache=name)} {c['hit_rate']}" for name, c in snap["caches"].items()]
+    return "\n".join(lines) + "\n"
+
+
+_METRICS: Optional[Metrics] = None
+_METRICS_LOCK = threading.Lock()
+
+def get_metrics() -> Metrics:
+    """Process-wide Metrics (created on first use)."""
+    global _METRICS
+    if _METRICS is None:
+        with _METRICS_LOCK:
+            if _METRICS is None:
+                _METRICS = Metrics()
+    return _METRICS
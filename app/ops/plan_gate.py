@@ -1,17 +1,22 @@
 ﻿import yaml, time
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from app.runtime.pools import run_io
+from app.runtime.session_store import get_session_store
 with open("configs/plan_meter.yaml","r",encoding="utf-8") as f:
     CFG = yaml.safe_load(f)
 def _cap(plan:str)->int:
     try: return int(CFG.get("plans",{}).get(plan,{}).get("minutes_cap",15))
     except: return 15
-_USAGE={}
+_TTL_S=2*86400  # per-day usage counters in the shared session store
+_NS="plan_gate"  # own counters: server._plan_consume charges "plan_usage" for the same requests
 async def gate(request:Request, call_next):
     user_id = request.headers.get("X-User-Id","anon")
     plan = request.headers.get("X-Plan","Free")
     today = time.strftime("%Y%m%d")
-    used = int(_USAGE.get((user_id,today),0)); capm = _cap(plan)
-    if used >= capm:
+    store = get_session_store(); key = f"{user_id}:{today}"
+    capm = _cap(plan)
+    # atomic "charge unless over cap" before the request runs (store calls may block: SQLite)
+    if await run_io(store.incr,_NS,key,1,ttl_s=_TTL_S,limit=capm) is None:
         return JSONResponse({"ok":True,"route":"abstain","answer":f"Plan cap reached for {plan}. Please upgrade to continue today.","abstain":True,"overage":{"user":user_id,"plan":plan,"cap_minutes":capm,"day":today}}, status_code=200)
-    resp = await call_next(request); _USAGE[(user_id,today)] = used + 1; return resp
+    return await call_next(request)
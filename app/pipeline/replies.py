@@ -0,0 +1,33 @@
+# app/pipeline/replies.py
+# Purpose: Fixed (non-LLM) replies of the turn pipeline and the web fast gates. They are spoken
+# often and never change, so app/audio/tts/prerender.py renders them into the TTS cache ahead
+# of the first turn; keep every such line here rather than inline in the handlers.
+from __future__ import annotations
+from typing import List, Tuple
+
+CRISIS_REPLY_URDU = (
+    "مجھے افسوس ہے کہ آپ مشکل میں ہیں۔ ابھی فوراً اپنی حفاظت کو ترجیح دیں۔ "
+    "اگر آپ کو خود کو یا کسی اور کو نقصان پہنچانے کا خیال آ رہا ہے تو "
+    "براہِ کرم مقامی ہنگامی سروس یا قریبی معتمد شخص سے فوراً رابطہ کریں۔ "
+    "پاکستان میں آپ 1122 یا قریبی ہسپتال سے رابطہ کریں۔"
+)
+FINANCE_ABSTAIN_UR = "اس سوال پر میں رائے نہیں دے سکتا/سکتی۔ براہِ کرم مالی مشورے کے لیے مستند ماہر سے رجوع کریں۔"
+LLM_DOWN_UR = "اس وقت میری سروس دستیاب نہیں۔ براہِ کرم کچھ دیر بعد دوبارہ کوشش کریں یا مستند ماہر سے رابطہ کریں۔"
+MODEL_ABSTAIN_UR = "میں اس موضوع پر رائے دینے سے معذرت خواہ ہوں۔ براہِ کرم مستند ماہر سے رجوع کریں۔"
+TTS_FAILED_UR = "آواز بنانے میں مسئلہ آیا؛ میں متن کے طور پر جواب دے رہا/رہی ہوں۔"
+
+# web fast-gate refusal (speculative finance)
+REFUSE_FINANCE_EN = "I can’t provide investment predictions or trading tips."
+REFUSE_FINANCE_UR = "میں سرمایہ کاری سے متعلق پیش گوئیاں یا خرید/فروخت کی تجاویز فراہم نہیں کر سکتی۔"
+
+
+def fixed_replies() -> List[Tuple[str, str, str]]:
+    """(key, lang, text) of every spoken fixed reply above."""
+    return [
+        ("turn.crisis", "ur", CRISIS_REPLY_URDU),
+        ("turn.finance_abstain", "ur", FINANCE_ABSTAIN_UR),
+        ("turn.llm_down", "ur", LLM_DOWN_UR),
+        ("turn.model_abstain", "ur", MODEL_ABSTAIN_UR),
+        ("web.refuse_finance_en", "en", REFUSE_FINANCE_EN),
+        ("web.refuse_finance_ur", "ur", REFUSE_FINANCE_UR),
+    ]
@@ -1,9 +1,9 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Generator, List, Optional, Tuple
+import inspect
 import time
 import re
 import unicodedata  # normalize incoming user text
 from pathlib import Path
-import os
 
 # --- tiny retrieval fallback (≤3) if your main retriever isn't wired ---
 def _mini_tokens(s: str) -> set:
@@ -39,39 +39,18 @@ def _mini_retrieve(query: str, k: int = 3) -> List[Dict]:
     k = max(1, min(k, 3))
     return [it for _, it in scored[:k]] or items[:1]
 
-# --- safety/policy regexes (Urdu + Roman-Urdu + EN) ---
-# Crisis: allow punctuation between words; add common Urdu phrasing "نقصان پہنچانا/پہنچانے"
-CRISIS_RX = re.compile(
-    r"("
-    r"خودکشی|زندگی[\s\W]*ختم|جان[\s\W]*لے[\s\W]*ل(?:وں|و)"
-    r"|خود[\s\W]*کو[\s\W]*نقصان(?:[\s\W]*پہنچا(?:نا|نے))?"
-    r"|مر[\s\W]*نا|مر[\s\W]*جانا"
-    r"|suicid(?:e|al)|kill[\s\W]*myself|take[\s\W]*my[\s\W]*life|self[-\s]?harm"
-    r"|khud[\s\W]*kushi|khudkushi|apni[\s\W]*jaan|jan[\s\W]*le[\s\W]*loon|jan[\s\W]*le[\s\W]*lu|nuqsan[\s\W]*khud[\s\W]*ko"
-    r")",
-    re.I,
-)
-# Finance/speculation: include Urdu script words (کوائن/سٹاک/شیئر/منافع) + Roman-Urdu + EN
-ABSTAIN_RX = re.compile(
-    r"(کریپٹو|کرپٹو|crypto|bitcoin|btc|altcoin[s]?|"
-    r"کوائن|سکہ|سٹاک|شیئر|share[s]?|stock[s]?|"
-    r"coin[s]?|tip|signal[s]?|double|doubling|quick[\s\W]*profit|منافع)",
-    re.I,
-)
-
-# Added: broader finance/out-of-scope pattern for deterministic ABSTAIN (kept from existing file)
-FINANCE_PAT = re.compile(
-    r"(کریپٹو|کرپٹو|crypto|bitcoin|btc|altcoins?|trading|trade|"
-    r"forex|stocks?|signal[s]?|get\s*rich|doubl(e|ing)\s+money)",
-    re.I,
-)
+# --- safety/policy regexes (Urdu + Roman-Urdu + EN): defined with the request-scoped verdict ---
+from app.safety.verdict import CRISIS_RX, ABSTAIN_RX, FINANCE_PAT, SafetyVerdict, assess  # noqa: F401
 
 from app.safety.router import SafetyRouter
 from app.ops.cost_meter import CostMeter
+from app.ops.metrics import get_metrics
 from app.llm.openai_client import LLMClient
 # SNIPPET APPLIED: route TTS through factory (engine decided by SUKOON_TTS_ENGINE)
 from app.audio.tts import synth as tts_synth  # provides {"tts_path": "...", "duration_sec": ...}
 from app.retrieval.mini import retrieve as kb_retrieve
+from app.runtime.pools import run_io
+from app.voice.tts.tts_stream import SentenceSegmenter, split_sentences
 
 safety = SafetyRouter()
 meter = CostMeter(config_path="configs/costing.yaml")
@@ -84,12 +63,8 @@ SYSTEM_URDU = (
     "اگر سوال دائرہ کار سے باہر ہو تو 'ABSTAIN' کریں۔"
 )
 
-CRISIS_REPLY_URDU = (
-    "مجھے افسوس ہے کہ آپ مشکل میں ہیں۔ ابھی فوراً اپنی حفاظت کو ترجیح دیں۔ "
-    "اگر آپ کو خود کو یا کسی اور کو نقصان پہنچانے کا خیال آ رہا ہے تو "
-    "براہِ کرم مقامی ہنگامی سروس یا قریبی معتمد شخص سے فوراً رابطہ کریں۔ "
-    "پاکستان میں آپ 1122 یا قریبی ہسپتال سے رابطہ کریں۔"
-)
+# Fixed replies live in app/pipeline/replies.py (pre-rendered into the TTS cache)
+from app.pipeline.replies import CRISIS_REPLY_URDU, FINANCE_ABSTAIN_UR, LLM_DOWN_UR, MODEL_ABSTAIN_UR, TTS_FAILED_UR
 
 def _extract_tts_path(tts_out: Any) -> str | None:
     """Accept either a plain path or a dict with {'tts_path': ...}."""
@@ -109,56 +84,200 @@ def _mk_timings_alias(metrics: Dict[str, Any]) -> Dict[str, int]:
         "handoff_ms": 0,
         "total_ms": int(metrics.get("total_ms", 0)),
     }
-_client = None
-
-try:
-    # openai >= 1.x
-    from openai import OpenAI
-    _key = os.getenv("OPENAI_API_KEY", "").strip()
-    if _key:
-        _client = OpenAI(api_key=_key)
-except Exception:
-    _client = None
-
-_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # or gpt-4o-mini, o3-mini etc.
-
-SYSTEM_PROMPT = (
-    "You are a calm, supportive mental-wellness assistant. "
-    "Use short, clear sentences. If you use evidence, cite it conversationally."
-)
+# --- One pipeline, two drivers ---
+# _turn_steps is a generator: each blocking step is yielded as an op and its result (or
+# exception) is sent back in. run_turn executes the ops inline; arun_turn awaits them
+# (async LLM client, TTS on the bounded io pool), so the event loop is never blocked.
+#   ("tts", text, lang_hint[, kw])  → tts_synth(text, lang_hint=..., **kw)   (skipped when tts=False)
+#       kw: pinned=True for fixed safety lines (never evicted from the TTS cache);
+#           nowait=True for the crisis reply: cached audio or none, never a wait on synthesis
+#   ("llm", kwargs)           → llm.chat(**kwargs) / await llm.achat(**kwargs)
+#
+# Sentence streaming (`on_sentence`): the LLM op uses llm.stream / llm.astream instead and each
+# finished sentence of the answer is handed to on_sentence while later tokens are still
+# generating; fixed replies (crisis, abstain, fallback) are handed over sentence by sentence
+# too. No audio file is rendered: the callback owns TTS. metrics gain first_token_ms /
+# first_sentence_ms (from the start of the LLM call).
+Op = Tuple[Any, ...]
+OnSentence = Callable[[str], Any]
+_NO_TTS = {"tts_path": None, "duration_sec": None}
 
-def _answer_with_openai(prompt: str, evidence: List[Dict[str, Any]]) -> str:
-    # Build a short context from evidence
-    ctx_lines = []
-    for ev in (evidence or [])[:3]:
-        t = (ev.get("text") or "").strip()
-        if t:
-            ctx_lines.append(t[:400])
-    ctx = "\n\n".join(ctx_lines).strip()
-    user = prompt if not ctx else f"Question:\n{prompt}\n\nContext:\n{ctx}\n\nUse the context if relevant."
-    resp = _client.chat.completions.create(
-        model=_MODEL,
-        messages=[{"role": "system", "content": SYSTEM_PROMPT},
-                  {"role": "user", "content": user}],
-        temperature=0.3,
-        max_tokens=350,
-    )
-    return (resp.choices[0].message.content or "").strip()
+class _SentenceFeed:
+    """
+    Token deltas → finished sentences, held back until the answer cannot be the model's
+    'ABSTAIN' marker (which _turn_steps replaces with a safe message before anything is spoken).
+    """
+    _MARK = "ABSTAIN"
+
+    def __init__(self) -> None:
+        self._seg = SentenceSegmenter()
+        self._parts: List[str] = []
+        self._held: List[str] = []
+        self.t0 = time.perf_counter()
+        self.first_token_ms: Optional[int] = None
+        self.first_sentence_ms: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def _release(self, sentences: List[str], final: bool) -> List[str]:
+        self._held.extend(sentences)
+        head = self.text.lstrip()[:len(self._MARK)].upper()
+        if head.startswith(self._MARK) or (not final and self._MARK.startswith(head)):
+            return []  # abstaining, or still undecided
+        out, self._held = self._held, []
+        if out and self.first_sentence_ms is None:
+            self.first_sentence_ms = int((time.perf_counter() - self.t0) * 1000)
+        return out
+
+    def push(self, delta: str) -> List[str]:
+        if self.first_token_ms is None:
+            self.first_token_ms = int((time.perf_counter() - self.t0) * 1000)
+        self._parts.append(delta)
+        return self._release(self._seg.push(delta), final=False)
+
+    def flush(self) -> List[str]:
+        return self._release(self._seg.flush(), final=True)
+
+def _tts_kw(op: Op) -> Dict[str, Any]:
+    return op[3] if len(op) > 3 else {}
+
+def _stream_marks(res: Dict[str, Any], feed: Optional[_SentenceFeed]) -> Dict[str, Any]:
+    if feed is not None:
+        res["metrics"]["first_token_ms"] = feed.first_token_ms
+        res["metrics"]["first_sentence_ms"] = feed.first_sentence_ms
+    return res
+
+class _CallbackError(Exception):
+    """An on_sentence failure: the caller's own error, re-raised as is (not an LLM/TTS failure)."""
+    def __init__(self, error: BaseException):
+        super().__init__(error)
+        self.error = error
+
+def _say(on_sentence: OnSentence, sentence: str) -> None:
+    try:
+        on_sentence(sentence)
+    except Exception as e:
+        raise _CallbackError(e) from e
+
+def run_turn(user_text: str, lang_hint: str = "ur", verdict: SafetyVerdict | None = None,
+             tts: bool = True, on_sentence: Optional[OnSentence] = None) -> Dict[str, Any]:
+    """
+    `verdict`: the request's SafetyVerdict (app/safety/verdict.assess on the user's own text).
+    When given, it is used as is and the text is not classified again.
+    `tts=False`: no audio file is rendered (callers that stream TTS sentence by sentence).
+    `on_sentence(sentence)`: stream the reply sentence by sentence (see above).
+    """
+    steps = _turn_steps(user_text, lang_hint, verdict)
+    feed: Optional[_SentenceFeed] = None
+    try:
+        op = next(steps)
+        while True:
+            try:
+                if op[0] == "tts":
+                    if on_sentence is not None:
+                        if feed is None or op[1] != feed.text:  # streamed answers were spoken already
+                            for sentence in split_sentences(op[1]):
+                                _say(on_sentence, sentence)
+                        res = dict(_NO_TTS)
+                    else:
+                        res = tts_synth(op[1], lang_hint=op[2], **_tts_kw(op)) if tts else dict(_NO_TTS)
+                elif on_sentence is not None:
+                    feed, usage = _SentenceFeed(), {}
+                    for delta in llm.stream(**op[1], usage=usage):
+                        for sentence in feed.push(delta):
+                            _say(on_sentence, sentence)
+                    for sentence in feed.flush():
+                        _say(on_sentence, sentence)
+                    res = (feed.text, usage)
+                else:
+                    res = llm.chat(**op[1])
+            except _CallbackError as e:   # only LLM/TTS failures are handled by the turn
+                steps.close()
+                raise e.error from None
+            except Exception as e:
+                op = steps.throw(e)
+            else:
+                op = steps.send(res)
+    except StopIteration as done:
+        return _finish(done.value, feed)
+
+def _finish(resp: Dict[str, Any], feed: Optional[_SentenceFeed]) -> Dict[str, Any]:
+    resp = _stream_marks(resp, feed)
+    get_metrics().record_turn(resp)  # per-route / per-stage latency aggregates (/api/ops/metrics)
+    return resp
+
+async def _emit(on_sentence: OnSentence, sentence: str) -> None:
+    try:
+        res = on_sentence(sentence)
+        if inspect.isawaitable(res):
+            await res
+    except Exception as e:
+        raise _CallbackError(e) from e
 
-def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
+async def arun_turn(user_text: str, lang_hint: str = "ur", verdict: SafetyVerdict | None = None,
+                    tts: bool = True, on_sentence: Optional[OnSentence] = None) -> Dict[str, Any]:
+    """
+    run_turn for async callers: same result, the LLM call is awaited and TTS runs off-loop.
+    `on_sentence` may be a coroutine function; it is awaited before the next token is read.
+    """
+    steps = _turn_steps(user_text, lang_hint, verdict)
+    feed: Optional[_SentenceFeed] = None
+    try:
+        op = next(steps)
+        while True:
+            try:
+                if op[0] == "tts":
+                    if on_sentence is not None:
+                        if feed is None or op[1] != feed.text:
+                            for sentence in split_sentences(op[1]):
+                                await _emit(on_sentence, sentence)
+                        res = dict(_NO_TTS)
+                    else:
+                        kw = _tts_kw(op)
+                        if not tts:
+                            res = dict(_NO_TTS)
+                        elif kw.get("nowait"):
+                            res = tts_synth(op[1], lang_hint=op[2], **kw)  # cache lookup only; not queued behind the pool
+                        else:
+                            res = await run_io(tts_synth, op[1], lang_hint=op[2], **kw)
+                elif on_sentence is not None:
+                    feed, usage = _SentenceFeed(), {}
+                    async for delta in llm.astream(**op[1], usage=usage):
+                        for sentence in feed.push(delta):
+                            await _emit(on_sentence, sentence)
+                    for sentence in feed.flush():
+                        await _emit(on_sentence, sentence)
+                    res = (feed.text, usage)
+                else:
+                    res = await llm.achat(**op[1])
+            except _CallbackError as e:   # only LLM/TTS failures are handled by the turn
+                steps.close()
+                raise e.error from None
+            except Exception as e:
+                op = steps.throw(e)
+            else:
+                op = steps.send(res)
+    except StopIteration as done:
+        return _finish(done.value, feed)
+
+def _turn_steps(user_text: str, lang_hint: str, verdict: SafetyVerdict | None) -> Generator[Op, Any, Dict[str, Any]]:
     # --- Normalize once to stabilize Urdu/Arabic forms (NFC) ---
     text_in = unicodedata.normalize("NFC", user_text or "")
 
     # 1) Pre-LLM safety
     t0 = time.perf_counter()
-    s = safety.detect(text_in)
+    if verdict is None:
+        verdict = assess(text_in)
+    s = verdict.router
     safety_ms = int((time.perf_counter() - t0) * 1000)
 
     # === Stage-1: Crisis fast-path (no LLM) ===
-    if s.get("crisis") or CRISIS_RX.search(text_in):
+    if verdict.turn_crisis:
         meter.log_event(component="web", unit="per_message", units=1, metadata={"route": "crisis"})
         t_tts0 = time.perf_counter()
-        tts_out = tts_synth(CRISIS_REPLY_URDU, lang_hint=lang_hint)
+        tts_out = yield ("tts", CRISIS_REPLY_URDU, lang_hint, {"nowait": True, "pinned": True})
         tts_ms = int((time.perf_counter() - t_tts0) * 1000)
         tts_path = _extract_tts_path(tts_out)
         # Minimal evidence for UX grounding (≤3)
@@ -188,10 +307,10 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
         return resp
 
     # === Stage-1: ABSTAIN for speculative finance ===
-    if ABSTAIN_RX.search(text_in) or FINANCE_PAT.search(text_in):
-        safe_msg = "اس سوال پر میں رائے نہیں دے سکتا/سکتی۔ براہِ کرم مالی مشورے کے لیے مستند ماہر سے رجوع کریں۔"
+    if verdict.turn_abstain:
+        safe_msg = FINANCE_ABSTAIN_UR
         t_tts0 = time.perf_counter()
-        tts_out = tts_synth(safe_msg, lang_hint=lang_hint)
+        tts_out = yield ("tts", safe_msg, lang_hint, {"pinned": True})
         tts_ms = int((time.perf_counter() - t_tts0) * 1000)
         tts_path = _extract_tts_path(tts_out)
         meter.log_event(
@@ -248,15 +367,15 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
     )
     try:
         t2 = time.perf_counter()
-        text, usage = llm.chat(
-            system_prompt=SYSTEM_URDU + " " + prompt,
-            user_text=text_in,
-            lang_hint=lang_hint,
-        )
+        text, usage = yield ("llm", {
+            "system_prompt": SYSTEM_URDU + " " + prompt,
+            "user_text": text_in,
+            "lang_hint": lang_hint,
+        })
         llm_ms = int((time.perf_counter() - t2) * 1000)
     except Exception as e:
         # Failure policy: never 500 — safe Urdu fallback; log error_reason
-        safe_msg = "اس وقت میری سروس دستیاب نہیں۔ براہِ کرم کچھ دیر بعد دوبارہ کوشش کریں یا مستند ماہر سے رابطہ کریں۔"
+        safe_msg = LLM_DOWN_UR
         meter.log_event(
             component="llm",
             unit="per_error",
@@ -264,7 +383,7 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
             metadata={"error_reason": type(e).__name__},
         )
         t_tts0 = time.perf_counter()
-        tts_out = tts_synth(safe_msg, lang_hint=lang_hint)
+        tts_out = yield ("tts", safe_msg, lang_hint, {"pinned": True})
         tts_ms = int((time.perf_counter() - t_tts0) * 1000)
         tts_path = _extract_tts_path(tts_out)
         metrics = {
@@ -294,9 +413,9 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
     # 4) ABSTAIN handling (model-driven)
     abstain = text.strip().upper().startswith("ABSTAIN")
     if abstain:
-        safe_msg = "میں اس موضوع پر رائے دینے سے معذرت خواہ ہوں۔ براہِ کرم مستند ماہر سے رجوع کریں۔"
+        safe_msg = MODEL_ABSTAIN_UR
         t_tts0 = time.perf_counter()
-        tts_out = tts_synth(safe_msg, lang_hint=lang_hint)
+        tts_out = yield ("tts", safe_msg, lang_hint, {"pinned": True})
         tts_ms = int((time.perf_counter() - t_tts0) * 1000)
         tts_path = _extract_tts_path(tts_out)
         meter.log_event(component="web", unit="per_message", units=1, metadata={"abstain": True})
@@ -344,12 +463,12 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
     # 6) TTS output + timings
     try:
         t3 = time.perf_counter()
-        tts_out = tts_synth(text, lang_hint=lang_hint)
+        tts_out = yield ("tts", text, lang_hint)
         tts_path = _extract_tts_path(tts_out)  # may be None if engine missing
         tts_status = "ok" if tts_path else "degraded:no_sapi"  # <-- status flag
         tts_ms = int((time.perf_counter() - t3) * 1000)
     except Exception as e:
-        safe_msg = "آواز بنانے میں مسئلہ آیا؛ میں متن کے طور پر جواب دے رہا/رہی ہوں۔"
+        safe_msg = TTS_FAILED_UR
         meter.log_event(
             component="tts",
             unit="per_error",
@@ -380,27 +499,6 @@ def run_turn(user_text: str, lang_hint: str = "ur") -> Dict[str, Any]:
         )
     except Exception:
         pass
-    warnings = []
-    if _client:
-        try:
-            answer = _answer_with_openai(text, evidence)
-        except Exception as e:
-            warnings.append(f"openai_error:{type(e).__name__}")
-            # graceful fallback
-            answer = ""
-
-    if not answer:
-        # offline fallback
-        if evidence:
-            snippet = (evidence[0].get("text") or "").strip()
-            answer = (snippet[:400] + "…") if len(snippet) > 400 else snippet
-        else:
-            answer = (
-                "I’m here. Let’s take a slow 4–6 breath together: inhale 4, exhale 6, three times. "
-                "What would you like to talk about?"
-            )
-
-
     resp = {
         "ok": True,
         "route": "assist",
@@ -0,0 +1,208 @@
+# app/rag/retriever.py
+# Purpose: In-memory BM25 retriever for the B2/B3 graph path.
+# The inverted index, document-length table and IDF are built once per process from
+# data/curated/*.jsonl plus the ingest-script outputs (artifacts/open_evidence/*.jsonl);
+# each query then only walks the postings of its own terms.
+from __future__ import annotations
+import glob, heapq, json, math, re, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_GLOBS = ("data/curated/*.jsonl", "artifacts/open_evidence/*.jsonl")
+_SNIPPET_CHARS = 320
+
+# Same tokenizer family as the CKG adapter: ASCII letters/digits + Arabic block (Urdu)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9\u0600-\u06FF]+")
+
+def _tok(s: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(s or "")]
+
+def _load_jsonl(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except OSError:
+        pass
+    return rows
+
+def _doc_from_record(rec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map curated EvidenceRecord rows and ingest-script chunk rows onto one hit shape."""
+    text = (rec.get("text") or "").strip()
+    if not text:
+        return None
+    return {
+        "id": rec.get("id") or rec.get("evidence_id") or rec.get("chunk_id") or "",
+        "source": rec.get("source_key") or rec.get("doc_id") or "unknown",
+        "title": rec.get("title") or rec.get("cited_as") or rec.get("doc_id") or "",
+        "text": text,
+    }
+
+
+class BM25Index:
+    """
+    Immutable BM25 index over a list of docs ({id, source, title, text}).
+
+    postings: term -> [(doc_idx, tf), ...]
+    idf:      term -> log(1 + (N - df + 0.5) / (df + 0.5))
+    Per-(k1, b) posting weights are materialized lazily and cached, so a query is a
+    sum over the weighted postings of its distinct terms.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.doc_len: List[int] = []
+        self.doc_chars: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for i, d in enumerate(docs):
+            toks = _tok(d["title"] + " " + d["text"])
+            self.doc_len.append(len(toks))
+            self.doc_chars.append(len(d["text"]))
+            tf: Dict[str, int] = {}
+            for t in toks:
+                tf[t] = tf.get(t, 0) + 1
+            for t, c in tf.items():
+                self.postings.setdefault(t, []).append((i, c))
+        n = len(docs)
+        self.avgdl = (sum(self.doc_len) / n) if n else 0.0
+        self.idf: Dict[str, float] = {
+            t: math.log(1.0 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()
+        }
+        self._weighted: Dict[Tuple[float, float], Dict[str, List[Tuple[int, float]]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _weights(self, k1: float, b: float) -> Dict[str, List[Tuple[int, float]]]:
+        key = (k1, b)
+        w = self._weighted.get(key)
+        if w is not None:
+            return w
+        with self._lock:
+            w = self._weighted.get(key)
+            if w is None:
+                avgdl = self.avgdl or 1.0
+                norm = [k1 * (1.0 - b + b * (dl / avgdl)) for dl in self.doc_len]
+                w = {}
+                for t, plist in self.postings.items():
+                    idf = self.idf[t]
+                    w[t] = [(i, idf * (tf * (k1 + 1.0)) / (tf + norm[i])) for i, tf in plist]
+                self._weighted[key] = w
+        return w
+
+    def scores(self, query: str, k1: float = 1.5, b: float = 0.75) -> Dict[int, float]:
+        weights = self._weights(k1, b)
+        acc: Dict[int, float] = {}
+        for t in set(_tok(query)):
+            for i, s in weights.get(t, ()):
+                acc[i] = acc.get(i, 0.0) + s
+        return acc
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        k1: float = 1.5,
+        b: float = 0.75,
+        per_source_cap: int = 0,
+        min_chars: int = 0,
+        min_score: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        acc = self.scores(query, k1=k1, b=b)
+        if not acc:
+            return []
+        cands = [
+            (s, i) for i, s in acc.items()
+            if s > min_score and self.doc_chars[i] >= min_chars
+        ]
+        if per_source_cap and per_source_cap > 0:
+            ordered: Iterable[Tuple[float, int]] = sorted(cands, key=lambda x: (-x[0], x[1]))
+        else:
+            ordered = heapq.nsmallest(top_k, cands, key=lambda x: (-x[0], x[1]))
+
+        out: List[Dict[str, Any]] = []
+        per_src: Dict[str, int] = {}
+        for s, i in ordered:
+            d = self.docs[i]
+            if per_source_cap and per_source_cap > 0:
+                c = per_src.get(d["source"], 0)
+                if c >= per_source_cap:
+                    continue
+                per_src[d["source"]] = c + 1
+            out.append({
+                "id": d["id"],
+                "source": d["source"],
+                "title": d["title"],
+                "score": round(float(s), 4),
+                "snippet": d["text"][:_SNIPPET_CHARS],
+            })
+            if len(out) >= top_k:
+                break
+        return out
+
+
+def load_corpus(globs: Iterable[str] = DEFAULT_GLOBS) -> List[Dict[str, Any]]:
+    docs: List[Dict[str, Any]] = []
+    seen = set()
+    for pattern in globs:
+        for path in sorted(glob.glob(pattern)):
+            for rec in _load_jsonl(path):
+                d = _doc_from_record(rec)
+                if d is None:
+                    continue
+                key = (d["id"], d["source"]) if d["id"] else None
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                docs.append(d)
+    return docs
+
+# ---------- process-wide index (built once, lazily) ----------
+_INDEX: Optional[BM25Index] = None
+_INDEX_GLOBS: Optional[Tuple[str, ...]] = None
+_BUILD_LOCK = threading.Lock()
+
+def get_index(globs: Optional[Iterable[str]] = None) -> BM25Index:
+    global _INDEX, _INDEX_GLOBS
+    g = tuple(globs or DEFAULT_GLOBS)
+    idx = _INDEX
+    if idx is not None and _INDEX_GLOBS == g:
+        return idx
+    with _BUILD_LOCK:
+        if _INDEX is None or _INDEX_GLOBS != g:
+            _INDEX = BM25Index(load_corpus(g))
+            _INDEX_GLOBS = g
+        return _INDEX
+
+def reload() -> BM25Index:
+    """Drop the cached index (e.g. after re-ingest) and rebuild on the next call."""
+    global _INDEX
+    with _BUILD_LOCK:
+        _INDEX = None
+    return get_index(_INDEX_GLOBS)
+
+def retriever(query: str, cfg: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    BM25 top-k over the curated corpus.
+    Returns [{id, source, title, score, snippet}], best first, with at most
+    `per_source_cap` hits per source and only chunks of at least `min_chars` chars.
+    """
+    cfg = cfg or {}
+    idx = get_index(cfg.get("corpus_globs") or None)
+    return idx.search(
+        query or "",
+        top_k=int(cfg.get("top_k", 3)),
+        k1=float(cfg.get("k1", 1.5)),
+        b=float(cfg.get("b", 0.75)),
+        per_source_cap=int(cfg.get("per_source_cap", 1) or 0),
+        min_chars=int(cfg.get("min_chars", 0) or 0),
+        min_score=float(cfg.get("min_score", 0.0) or 0.0),
+    )
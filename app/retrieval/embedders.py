@@ -0,0 +1,181 @@
+# app/retrieval/embedders.py
+# Purpose: Pluggable embedding backends for app/retrieval/indexer + a content-hash → vector
+# cache persisted next to the index, so re-ingest only embeds new or changed chunks.
+#
+# Backends (configs/retrieval.yaml `embedding_backend`, env SUKOON_EMBED_BACKEND overrides):
+#   hash                  — deterministic SHA1 pseudo-vector (default; offline, no deps, no semantics)
+#   sentence-transformers — local CPU model (`embedding_model`), e.g. a multilingual MiniLM
+#                           that covers Urdu; optional dependency, never touches the network
+#                           once the model is in the local HF cache.
+from __future__ import annotations
+import hashlib, math, os, re, threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from sentence_transformers import SentenceTransformer  # optional
+except Exception:
+    SentenceTransformer = None  # type: ignore
+
+DEFAULT_BACKEND = "hash"
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DEFAULT_DIM = 384
+DEFAULT_BATCH = 64
+_CFG_PATH = "configs/retrieval.yaml"
+
+
+class HashEmbedder:
+    """Stable, deterministic, no network. Vectors carry no semantic signal."""
+    backend = "hash"
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = int(dim)
+        self.model = ""
+
+    @property
+    def key(self) -> str:
+        return f"hash-{self.dim}"
+
+    def embed_one(self, text: str) -> List[float]:
+        h = hashlib.sha1(text.encode("utf-8")).digest()
+        # Repeat hash to fill dim, then L2 normalize
+        raw = (h * ((self.dim // len(h)) + 1))[:self.dim]
+        vec = [(b - 128) / 128.0 for b in raw]
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_batch(self, texts: Sequence[str]):
+        import numpy as np
+        return np.asarray([self.embed_one(t) for t in texts], dtype="float32").reshape(len(texts), self.dim)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-transformers model; L2-normalized so inner product == cosine."""
+    backend = "sentence-transformers"
+
+    def __init__(self, model: str = DEFAULT_MODEL, batch_size: int = DEFAULT_BATCH):
+        if SentenceTransformer is None:
+            raise RuntimeError("embedding_backend=sentence-transformers requires `pip install sentence-transformers`")
+        self.model = model
+        self.batch_size = int(batch_size)
+        self._m = SentenceTransformer(model, device="cpu")
+        self.dim = int(self._m.get_sentence_embedding_dimension())
+
+    @property
+    def key(self) -> str:
+        return "st-" + re.sub(r"[^A-Za-z0-9._-]+", "_", self.model)
+
+    def embed_one(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0].tolist()
+
+    def embed_batch(self, texts: Sequence[str]):
+        import numpy as np
+        if not texts:
+            return np.zeros((0, self.dim), dtype="float32")
+        X = self._m.encode(list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+                           convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(X, dtype="float32")
+
+
+# ---------- resolution (process-wide, one instance per backend/model) ----------
+_EMBEDDERS: Dict[tuple, Any] = {}
+_LOCK = threading.Lock()
+
+def _cfg() -> Dict[str, Any]:
+    try:
+        import yaml
+        with open(_CFG_PATH, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
+def get_embedder(backend: Optional[str] = None, model: Optional[str] = None, dim: Optional[int] = None):
+    """Resolve an embedder; explicit args win, then env, then configs/retrieval.yaml."""
+    cfg = _cfg() if (backend is None or model is None or dim is None) else {}
+    backend = (backend or os.getenv("SUKOON_EMBED_BACKEND") or cfg.get("embedding_backend") or DEFAULT_BACKEND).lower()
+    if backend == "hash":
+        key = ("hash", int(dim or cfg.get("embedding_dim") or DEFAULT_DIM))
+    else:
+        model = model or os.getenv("SUKOON_EMBED_MODEL") or cfg.get("embedding_model") or DEFAULT_MODEL
+        key = (backend, model)
+    e = _EMBEDDERS.get(key)
+    if e is not None:
+        return e
+    with _LOCK:
+        e = _EMBEDDERS.get(key)
+        if e is None:
+            if backend == "hash":
+                e = HashEmbedder(key[1])
+            elif backend in ("sentence-transformers", "st", "local"):
+                e = SentenceTransformerEmbedder(model, batch_size=int(cfg.get("embedding_batch_size", DEFAULT_BATCH)))
+            else:
+                raise ValueError(f"unknown embedding_backend: {backend}")
+            _EMBEDDERS[key] = e
+    return e
+
+
+# ---------- on-disk text-hash → vector cache ----------
+class EmbeddingCache:
+    """
+    <index_dir>/embed_cache/<embedder.key>.npz with `keys` (str) and `vectors` (float32).
+    Keyed on EvidenceRecord.hash (or sha1 of the text), one file per backend/model so a
+    backend switch never mixes vector spaces.
+    """
+
+    def __init__(self, index_dir: str, embedder):
+        self.embedder = embedder
+        self.path = Path(index_dir) / "embed_cache" / f"{embedder.key}.npz"
+        self._rows: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        import numpy as np
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as z:
+                keys, X = z["keys"], z["vectors"]
+            if X.ndim == 2 and X.shape[1] == self.embedder.dim:
+                self._rows = {str(k): X[i] for i, k in enumerate(keys.tolist())}
+        except Exception:
+            self._rows = {}  # corrupt/partial cache → rebuild
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def embed(self, texts: Sequence[str], keys: Optional[Sequence[str]] = None, batch_size: int = DEFAULT_BATCH):
+        """Vectors for texts (n, dim); only cache misses are sent to the backend, in batches."""
+        import numpy as np
+        keys = list(keys) if keys is not None else [None] * len(texts)
+        keys = [k or hashlib.sha1(t.encode("utf-8")).hexdigest() for k, t in zip(keys, texts)]
+        out = np.zeros((len(texts), self.embedder.dim), dtype="float32")
+        todo: Dict[str, List[int]] = {}
+        for i, k in enumerate(keys):
+            v = self._rows.get(k)
+            if v is not None:
+                out[i] = v
+                self.hits += 1
+            else:
+                todo.setdefault(k, []).append(i)
+        miss_keys = list(todo)
+        self.misses += len(miss_keys)
+        for s in range(0, len(miss_keys), max(1, batch_size)):
+            chunk = miss_keys[s:s + batch_size]
+            X = self.embedder.embed_batch([texts[todo[k][0]] for k in chunk])
+            for k, v in zip(chunk, X):
+                self._rows[k] = v
+                out[todo[k]] = v
+        return out
+
+    def save(self, keep: Optional[Sequence[str]] = None) -> None:
+        """Persist the cache (optionally only `keep` keys), atomically."""
+        import numpy as np
+        rows = self._rows if keep is None else {k: self._rows[k] for k in keep if k in self._rows}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        keys = np.asarray(list(rows), dtype=str)
+        X = np.asarray(list(rows.values()), dtype="float32").reshape(len(rows), self.embedder.dim)
+        tmp = self.path.with_name(self.path.stem + ".tmp.npz")
+        np.savez(tmp, keys=keys, vectors=X)
+        os.replace(tmp, self.path)
@@ -1,9 +1,8 @@
-# Purpose: Offline index builder + search (tries FAISS, falls back to pure Python cosine).
+# Purpose: Offline index builder + search (tries FAISS, falls back to a memory-mapped float32 matrix).
 from __future__ import annotations
-import json, os, math, pickle
+import bisect, json, os, mmap, pickle, re, threading
 from typing import List, Dict, Tuple
 from pathlib import Path
-import hashlib
 from datetime import datetime
 
 try:
@@ -12,87 +11,418 @@ except Exception:
     faiss = None  # type: ignore
 
 from app.retrieval.schema import EvidenceRecord
+from app.retrieval.embedders import EmbeddingCache, get_embedder
 
-# Offline embedding: stable, deterministic, no network
+# Embedding goes through the pluggable backend in app/retrieval/embedders.py
+# (default "hash": stable, deterministic, no network).
 def embed(text: str, dim: int = 384) -> List[float]:
-    h = hashlib.sha1(text.encode("utf-8")).digest()
-    # Repeat hash to fill dim, then L2 normalize
-    raw = (h * ((dim // len(h)) + 1))[:dim]
-    vec = [(b - 128) / 128.0 for b in raw]
-    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
-    return [v / norm for v in vec]
-
-def build_index(records: List[EvidenceRecord], out_dir: str = "data/index") -> Dict[str, str]:
+    return get_embedder(dim=dim).embed_one(text)
+
+# On-disk format versions (recorded in manifest.json as "format_version"):
+#   1 (implicit) — meta.pkl + vectors.pkl (List[List[float]]) or faiss.index
+#   2            — vectors.npy (contiguous float32, np.memmap-able) + meta.jsonl with
+#                  meta.offsets.npy (int64 byte offsets, n+1) so metadata is read per hit;
+#                  meta.pkl is still written for legacy readers (full builds/compactions only).
+#                  Incremental updates (update_index) add "segments" (seg-NNNN.* files appended
+#                  after the base rows) and "tombstones" (int64 global row ids, skipped by search).
+#                  Each segment stays its own memmap: search scores segment by segment (one
+#                  GEMM each) and merges the per-segment top-k by global row id.
+# Data files are never rewritten in place (readers np.load/mmap them; truncating a mapped file
+# is a SIGBUS). Every build writes a new "generation" of files (g0007.vectors.npy, ...) and then
+# switches manifest.json atomically; files the new manifest no longer names are unlinked, which
+# leaves the mappings of handles still in use intact.
+FORMAT_VERSION = 2
+
+_DATA_RE = re.compile(r"^(g\d+\.|seg-|tombstones|faiss\.|vectors\.npy$|meta\.jsonl$|meta\.offsets\.npy$)")
+
+def _write_segment(out_dir: str, prefix: str, xb, records: List[EvidenceRecord]) -> Dict[str, str]:
+    """Write one vectors/meta/offsets triple; returns the manifest file names."""
+    import numpy as np
+    files = {"vectors": f"{prefix}vectors.npy", "meta": f"{prefix}meta.jsonl", "offsets": f"{prefix}meta.offsets.npy"}
+    np.save(os.path.join(out_dir, files["vectors"]), np.ascontiguousarray(xb, dtype="float32"))
+    offsets = [0]
+    with open(os.path.join(out_dir, files["meta"]), "wb") as f:
+        for r in records:
+            line = (r.model_dump_json() + "\n").encode("utf-8")
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(out_dir, files["offsets"]), np.asarray(offsets, dtype="int64"))
+    return files
+
+def _write_manifest(out_dir: str, manifest: Dict) -> None:
+    tmp = os.path.join(out_dir, "manifest.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, "manifest.json"))
+
+def _manifest_files(manifest: Dict) -> set:
+    names = {manifest.get(k) for k in ("vectors", "meta", "offsets", "faiss", "tombstones")}
+    for sg in manifest.get("segments", []):
+        names.update(sg.get(k) for k in ("vectors", "meta", "offsets"))
+    return {n for n in names if n}
+
+def _prune(out_dir: str, manifest: Dict) -> None:
+    """Unlink index data files of superseded generations (call after the manifest switch)."""
+    keep = _manifest_files(manifest)
+    for name in os.listdir(out_dir):
+        if name in keep or not _DATA_RE.match(name):
+            continue
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except OSError:
+            pass  # still mapped on Windows: left for the next build
+
+def build_index(records: List[EvidenceRecord], out_dir: str = "data/index", embedder=None,
+                batch_size: int = 64) -> Dict[str, str]:
+    import numpy as np
     Path(out_dir).mkdir(parents=True, exist_ok=True)
-    vectors, metas = [], []
-    for r in records:
-        vectors.append(embed(r.text))
-        metas.append(r.model_dump())
+    gen = int(_read_manifest(out_dir).get("generation", 0)) + 1
+    embedder = embedder or get_embedder()
+    # Only chunks whose EvidenceRecord.hash is not in <out_dir>/embed_cache are embedded (batched)
+    cache = EmbeddingCache(out_dir, embedder)
+    keys = [r.hash for r in records]
+    xb = cache.embed([r.text for r in records], keys=keys, batch_size=batch_size)
+    cache.save(keep=keys)
+    metas = [r.model_dump() for r in records]
 
-    # Persist portable pickle (fallback index)
-    with open(os.path.join(out_dir, "meta.pkl"), "wb") as f:
+    # Persist portable pickle (legacy readers)
+    tmp = os.path.join(out_dir, "meta.pkl.tmp")
+    with open(tmp, "wb") as f:
         pickle.dump(metas, f)
+    os.replace(tmp, os.path.join(out_dir, "meta.pkl"))
 
-    backend = "python"
-    if faiss:
-        import numpy as np
-        xb = np.array(vectors, dtype="float32")
+    # v2: packed float32 matrix + JSONL metadata with byte offsets (new generation files)
+    files = _write_segment(out_dir, f"g{gen:04d}.", xb, records)
+
+    backend, files["faiss"] = "python", None
+    if faiss and len(metas):
         index = faiss.IndexFlatIP(xb.shape[1])
         index.add(xb)
-        faiss.write_index(index, os.path.join(out_dir, "faiss.index"))
+        files["faiss"] = f"faiss.g{gen:04d}.index"
+        faiss.write_index(index, os.path.join(out_dir, files["faiss"]))
         backend = "faiss"
-    else:
-        # Save vectors for python fallback
-        with open(os.path.join(out_dir, "vectors.pkl"), "wb") as f:
-            pickle.dump(vectors, f)
 
     # Write manifest for audits
     manifest = {
         "backend": backend,
+        "format_version": FORMAT_VERSION,
+        "generation": gen,
         "count": len(metas),
-        "embedding_dim": len(vectors[0]) if vectors else 0,
+        "embedding_dim": int(embedder.dim),
+        "embedding_backend": embedder.backend,
+        "embedding_model": embedder.model,
+        "dtype": "float32",
+        **files,
         "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
     }
-    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2)
+    _write_manifest(out_dir, manifest)
+    invalidate(out_dir)
+    _prune(out_dir, manifest)  # also drops any incremental segments/tombstones
 
-    return {"backend": backend, "count": str(len(metas))}
+    return {"backend": backend, "count": str(len(metas)),
+            "embedded": str(cache.misses), "embed_cache_hits": str(cache.hits)}
 
-def search(query: str, k: int = 5, index_dir: str = "data/index") -> List[Dict]:
+def update_index(
+    records: List[EvidenceRecord],
+    out_dir: str = "data/index",
+    scope_doc_ids: List[str] | None = None,
+    compact_ratio: float = 0.25,
+    max_segments: int = 8,
+    embedder=None,
+    batch_size: int = 64,
+) -> Dict[str, str]:
+    """
+    Incremental update keyed on evidence_id/hash: new or changed records are embedded and
+    appended as a segment, changed/removed rows are tombstoned. Records of doc_ids in
+    `scope_doc_ids` (default: the doc_ids present in `records`) that are no longer supplied
+    count as removed. Compacts (full rewrite from the embedding cache, no re-embedding) once
+    tombstones exceed `compact_ratio` of the rows or there are more than `max_segments`.
+    Falls back to build_index when there is no compatible v2 index.
+    """
     import numpy as np
-    q = np.array(embed(query), dtype="float32")
+    embedder = embedder or get_embedder()
+    man = _read_manifest(out_dir)
+    if (int(man.get("format_version", 1)) < 2
+            or man.get("embedding_backend", "hash") != embedder.backend
+            or int(man.get("embedding_dim") or 0) != embedder.dim
+            or (man.get("embedding_model") or "") != embedder.model):
+        out = build_index(records, out_dir=out_dir, embedder=embedder, batch_size=batch_size)
+        return {**out, "mode": "full"}
+
+    h = load_index(out_dir)
+    total = len(h.metas)
+    dead = set(int(i) for i in h.dead.tolist())
+    live: Dict[str, Tuple[int, str]] = {}
+    for i in range(total):
+        if i not in dead:
+            m = h.metas[i]
+            live[m["evidence_id"]] = (i, m["hash"])
+
+    scope = set(scope_doc_ids) if scope_doc_ids is not None else {r.doc_id for r in records}
+    incoming = {r.evidence_id: r for r in records}
+    added: List[EvidenceRecord] = []
+    removed: List[int] = []
+    for eid, r in incoming.items():
+        cur = live.get(eid)
+        if cur is None:
+            added.append(r)
+        elif cur[1] != r.hash:
+            removed.append(cur[0])
+            added.append(r)
+    for eid, (row, _) in live.items():
+        if eid not in incoming and h.metas[row]["doc_id"] in scope:
+            removed.append(row)
 
-    with open(os.path.join(index_dir, "meta.pkl"), "rb") as f:
-        metas = pickle.load(f)
+    stats = {"mode": "incremental", "added": str(len(added)), "removed": str(len(removed)),
+             "unchanged": str(len(incoming) - len(added))}
+    if not added and not removed:
+        return {"backend": man.get("backend", "python"), "count": str(man.get("count", len(live))), **stats}
 
-    faiss_idx = None
-    if faiss and os.path.exists(os.path.join(index_dir, "faiss.index")):
-        faiss_idx = faiss.read_index(os.path.join(index_dir, "faiss.index"))
+    dead.update(removed)
+    segments = list(man.get("segments", []))
+    n_dead, n_rows = len(dead), total + len(added)
+    if n_dead > compact_ratio * n_rows or len(segments) + (1 if added else 0) > max_segments:
+        keep = [EvidenceRecord(**h.metas[i]) for i in range(total) if i not in dead and h.metas[i]["evidence_id"] not in incoming]
+        keep.extend(incoming[eid] for eid in incoming)  # incoming wins (and keeps its order)
+        out = build_index(keep, out_dir=out_dir, embedder=embedder, batch_size=batch_size)
+        return {**out, **stats, "compacted": "1"}
+
+    # Same rule as build_index: only new generation files, manifest last, then prune
+    gen = int(man.get("generation", 0)) + 1
+    cache = EmbeddingCache(out_dir, embedder)
+    if added:
+        xb = cache.embed([r.text for r in added], keys=[r.hash for r in added], batch_size=batch_size)
+        seg_no = 1 + max([int(sg["vectors"].split(".")[0].split("-")[1]) for sg in segments] or [0])
+        files = _write_segment(out_dir, f"seg-{seg_no:04d}.g{gen:04d}.", xb, added)
+        segments.append({**files, "count": len(added)})
+        fpath = os.path.join(out_dir, man.get("faiss", "faiss.index") or "")
+        if faiss and man.get("backend") == "faiss" and os.path.isfile(fpath):
+            index = faiss.read_index(fpath)
+            index.add(np.ascontiguousarray(xb, dtype="float32"))  # FAISS row ids stay == global row ids
+            man["faiss"] = f"faiss.g{gen:04d}.index"
+            faiss.write_index(index, os.path.join(out_dir, man["faiss"]))
+        live_keys = [h.metas[i]["hash"] for i in range(total) if i not in dead] + [r.hash for r in added]
+        cache.save(keep=live_keys)
+    tomb = f"tombstones.g{gen:04d}.npy"
+    np.save(os.path.join(out_dir, tomb), np.asarray(sorted(dead), dtype="int64"))
+
+    man.update({
+        "generation": gen,
+        "count": n_rows - n_dead,
+        "rows": n_rows,
+        "segments": segments,
+        "tombstones": tomb,
+        "tombstone_count": n_dead,
+        "updated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+    })
+    _write_manifest(out_dir, man)
+    invalidate(out_dir)
+    _prune(out_dir, man)
+    return {"backend": man.get("backend", "python"), "count": str(man["count"]),
+            "embedded": str(cache.misses), **stats, "compacted": "0"}
+
+def _read_manifest(index_dir: str) -> Dict:
+    try:
+        with open(os.path.join(index_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f) or {}
+    except (OSError, ValueError):
+        return {}
+
+class _MetaSidecar:
+    """Read-only sequence over meta.jsonl; rows are decoded on access via byte offsets."""
+    def __init__(self, meta_path: str, offsets_path: str):
+        import numpy as np
+        self._off = np.load(offsets_path, mmap_mode="r")
+        self._f = open(meta_path, "rb")
+        size = os.fstat(self._f.fileno()).st_size
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
 
-    if faiss_idx is not None:
-        D, I = faiss_idx.search(q.reshape(1, -1), k)
-        idxs = I[0].tolist()
-        sims = D[0].tolist()
+    def __len__(self) -> int:
+        return max(0, int(self._off.shape[0]) - 1)
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        a, b = int(self._off[i]), int(self._off[i + 1])
+        return json.loads(bytes(self._mm[a:b]).decode("utf-8"))
+
+class _ConcatSeq:
+    """Global row ids over base + incremental segment sidecars."""
+    def __init__(self, parts: List[_MetaSidecar]):
+        self._parts = parts
+        self._starts = [0]
+        for p in parts:
+            self._starts.append(self._starts[-1] + len(p))
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def __getitem__(self, i: int) -> Dict:
+        import bisect
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        j = bisect.bisect_right(self._starts, i) - 1
+        return self._parts[j][i - self._starts[j]]
+
+# ---------- process-wide index handle (lazy, invalidated by manifest.json) ----------
+class _IndexHandle:
+    """Loaded index for one index_dir: metas + FAISS index or fallback matrices (one per segment)."""
+    def __init__(self, index_dir: str, sig: Tuple[int, int]):
+        import numpy as np
+        self.sig = sig
+        self.manifest = _read_manifest(index_dir)
+        self.format_version = int(self.manifest.get("format_version", 1))
+        # Queries must be embedded in the same space the index was built with
+        self.embedder = get_embedder(
+            backend=self.manifest.get("embedding_backend", "hash"),
+            model=self.manifest.get("embedding_model") or None,
+            dim=int(self.manifest.get("embedding_dim") or 384),
+        )
+        self.faiss_idx = None
+        self.Xs: List = []            # fallback: per-segment (rows, dim) matrices, in row order
+        self.offsets: List[int] = []  # global row id of each matrix's first row
+        faiss_name = self.manifest.get("faiss", "faiss.index")
+        use_faiss = bool(faiss and faiss_name and os.path.exists(os.path.join(index_dir, faiss_name)))
+
+        self.dead = np.zeros(0, dtype="int64")
+
+        if self.format_version >= 2:
+            base = {k: self.manifest.get(k, d) for k, d in
+                    (("vectors", "vectors.npy"), ("meta", "meta.jsonl"), ("offsets", "meta.offsets.npy"))}
+            segs = [base] + list(self.manifest.get("segments", []))
+            sidecars = [_MetaSidecar(os.path.join(index_dir, sg["meta"]), os.path.join(index_dir, sg["offsets"]))
+                        for sg in segs]
+            self.metas = sidecars[0] if len(sidecars) == 1 else _ConcatSeq(sidecars)
+            if not use_faiss:
+                # Shared, page-cached, read-only views: load time is independent of corpus size.
+                # Never joined into one array: that would copy every segment into private RAM.
+                self.Xs = [np.load(os.path.join(index_dir, sg["vectors"]), mmap_mode="r") for sg in segs]
+            if self.manifest.get("tombstones"):
+                self.dead = np.load(os.path.join(index_dir, self.manifest["tombstones"]))
+        else:
+            with open(os.path.join(index_dir, "meta.pkl"), "rb") as f:
+                self.metas = pickle.load(f)
+            if not use_faiss:
+                with open(os.path.join(index_dir, "vectors.pkl"), "rb") as f:
+                    vectors = pickle.load(f)
+                self.Xs = [np.array(vectors, dtype="float32")]
+        if use_faiss:
+            self.faiss_idx = faiss.read_index(os.path.join(index_dir, faiss_name))
+        n = 0
+        for X in self.Xs:
+            self.offsets.append(n)
+            n += int(X.shape[0])
+        self.rows = n
+
+    def row(self, i: int):
+        """Stored vector of global row `i` (fallback matrices only)."""
+        j = bisect.bisect_right(self.offsets, i) - 1
+        return self.Xs[j][i - self.offsets[j]]
+
+_HANDLES: Dict[str, _IndexHandle] = {}
+_HANDLES_LOCK = threading.Lock()
+
+def _manifest_sig(index_dir: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(os.path.join(index_dir, "manifest.json"))
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (0, 0)
+
+def load_index(index_dir: str = "data/index") -> _IndexHandle:
+    """Return the cached handle for index_dir, reloading only when manifest.json changed."""
+    key = os.path.abspath(index_dir)
+    sig = _manifest_sig(index_dir)
+    h = _HANDLES.get(key)
+    if h is not None and h.sig == sig:
+        return h
+    with _HANDLES_LOCK:
+        h = _HANDLES.get(key)
+        if h is None or h.sig != sig:
+            try:
+                h = _IndexHandle(index_dir, sig)
+            except FileNotFoundError:
+                # manifest switched (and the old generation pruned) while this one was opening
+                h = _IndexHandle(index_dir, _manifest_sig(index_dir))
+            _HANDLES[key] = h
+    return h
+
+def invalidate(index_dir: str | None = None) -> None:
+    # Handles are only dropped, never closed: in-flight searches keep their reference. Their
+    # mapped files are never rewritten (see FORMAT_VERSION), only unlinked once superseded, so
+    # the mappings stay valid until the last reference goes away.
+    with _HANDLES_LOCK:
+        if index_dir is None:
+            _HANDLES.clear()
+        else:
+            _HANDLES.pop(os.path.abspath(index_dir), None)
+
+def _hit(rec: Dict, rank: int, sim: float) -> Dict:
+    return {
+        "rank": rank,
+        "similarity": sim,
+        "evidence_id": rec["evidence_id"],
+        "doc_id": rec["doc_id"],
+        "text": rec["text"],
+        "cited_as": rec["cited_as"],
+        "license": rec["license"],
+        "topic": rec["topic"],
+        "ctype": rec["ctype"],
+        "source_path": rec["source_path"],
+    }
+
+def search_many(queries: List[str], k: int = 5, index_dir: str = "data/index") -> List[List[Dict]]:
+    """
+    Batched search: all queries are embedded into one (m, dim) matrix and scored with a
+    single GEMM (or one FAISS call). Returns one hit list per query, same shape as search().
+    """
+    import numpy as np
+    if not queries:
+        return []
+    h = load_index(index_dir)
+    Q = np.asarray(h.embedder.embed_batch(list(queries)), dtype="float32")
+    metas = h.metas
+
+    n_dead = int(h.dead.shape[0])
+    if h.faiss_idx is not None:
+        # Over-fetch by the tombstone count, then drop tombstoned rows
+        D, I = h.faiss_idx.search(Q, k + n_dead)
+        dead = set(h.dead.tolist())
+        rows = [
+            [(int(i), float(d)) for i, d in zip(I[r].tolist(), D[r].tolist()) if i >= 0 and i not in dead][:k]
+            for r in range(Q.shape[0])
+        ]
     else:
-        with open(os.path.join(index_dir, "vectors.pkl"), "rb") as f:
-            vectors = pickle.load(f)
-        X = np.array(vectors, dtype="float32")
-        sims = (X @ q).tolist()
-        idxs = list(np.argsort(sims)[::-1][:k])
-
-    out = []
-    for i, idx in enumerate(idxs):
-        rec = metas[idx]
-        out.append({
-            "rank": i + 1,
-            "similarity": float(sims[idx]) if not faiss_idx else float(sims[i]),
-            "evidence_id": rec["evidence_id"],
-            "doc_id": rec["doc_id"],
-            "text": rec["text"],
-            "cited_as": rec["cited_as"],
-            "license": rec["license"],
-            "topic": rec["topic"],
-            "ctype": rec["ctype"],
-            "source_path": rec["source_path"],
-        })
-    return out
+        kk = min(k, h.rows - n_dead)
+        if kk <= 0:
+            return [[] for _ in queries]
+        # One GEMM per segment; each keeps its own top-kk (global row ids), then one merge
+        cand_i, cand_s = [], []
+        for off, X in zip(h.offsets, h.Xs):
+            nj = int(X.shape[0])
+            if not nj:
+                continue
+            S = Q @ X.T  # (m, nj)
+            if n_dead:
+                local = h.dead[(h.dead >= off) & (h.dead < off + nj)] - off
+                if local.size:
+                    S[:, local] = -np.inf
+            kj = min(kk, nj)
+            top = np.argpartition(-S, kj - 1, axis=1)[:, :kj]
+            cand_i.append(top + off)
+            cand_s.append(np.take_along_axis(S, top, axis=1))
+        I = cand_i[0] if len(cand_i) == 1 else np.concatenate(cand_i, axis=1)
+        D = cand_s[0] if len(cand_s) == 1 else np.concatenate(cand_s, axis=1)
+        order = np.argsort(-D, axis=1, kind="stable")[:, :kk]
+        top = np.take_along_axis(I, order, axis=1)
+        top_s = np.take_along_axis(D, order, axis=1)
+        rows = [list(zip(top[r].tolist(), top_s[r].tolist())) for r in range(Q.shape[0])]
+
+    return [[_hit(metas[idx], i + 1, float(sim)) for i, (idx, sim) in enumerate(pairs)] for pairs in rows]
+
+def search(query: str, k: int = 5, index_dir: str = "data/index") -> List[Dict]:
+    return search_many([query], k=k, index_dir=index_dir)[0]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import json, os, math, re, unicodedata
 from json import JSONDecodeError
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # --- FILE-RELATIVE KB PATH (snippet applied) ---
 HERE = os.path.dirname(__file__)
@@ -39,8 +39,21 @@ def _idf_vocab(kb: List[Dict]) -> Dict[str, float]:
   return {t: math.log((N + 1) / (df[t] + 0.5)) for t in df}
 
 # ---------- Robust lazy initialization (prevents import-time crashes) ----------
+# Built once per kb_ur.json version (reloaded when its mtime/size changes):
+#   _KB       items
+#   _IDF      token -> idf
+#   _POSTINGS token -> [item index, ...]   (each item's token set, inverted)
 _KB: List[Dict] | None = None
 _IDF: Dict[str, float] | None = None
+_POSTINGS: Dict[str, List[int]] = {}
+_KB_SIG: tuple | None = None
+
+def _kb_sig() -> tuple:
+  try:
+    st = os.stat(KB_PATH)
+    return (st.st_mtime_ns, st.st_size)
+  except OSError:
+    return (0, 0)
 
 def _ensure_dir(path: str) -> None:
   os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
@@ -54,7 +67,8 @@ def _seed_items() -> List[Dict]:
       i += 1
   return kb[:120]
 
-def _load_or_seed() -> List[Dict]:
+def _load_or_seed() -> Optional[List[Dict]]:
+  """KB items; None when kb_ur.json exists but can't be used (e.g. caught mid-save). Seeds only a missing file."""
   _ensure_dir(KB_PATH)
   if os.path.exists(KB_PATH):
     try:
@@ -63,8 +77,8 @@ def _load_or_seed() -> List[Dict]:
         if isinstance(data, list) and data:
           return data
     except (JSONDecodeError, UnicodeDecodeError, OSError):
-      # fall through to seed
       pass
+    return None  # never overwrite an existing KB with the seed
   kb = _seed_items()
   try:
     with open(KB_PATH, "w", encoding="utf-8") as f:
@@ -74,26 +88,45 @@ def _load_or_seed() -> List[Dict]:
     pass
   return kb
 
+def _build_postings(kb: List[Dict]) -> Dict[str, List[int]]:
+  postings: Dict[str, List[int]] = {}
+  for i, it in enumerate(kb):
+    for t in set(_tok_ur(_normalize(it["title"] + " " + it["body"]))):
+      postings.setdefault(t, []).append(i)
+  return postings
+
 def _ensure_ready() -> None:
-  global _KB, _IDF
-  if _KB is None:
-    _KB = _load_or_seed()
-    _IDF = _idf_vocab(_KB)
+  global _KB, _IDF, _POSTINGS, _KB_SIG
+  sig = _kb_sig()
+  if _KB is None or sig != _KB_SIG:
+    kb = _load_or_seed()
+    if kb is None:
+      if _KB is not None:  # unreadable on reload: keep serving the previous version
+        _KB_SIG = sig
+        return
+      kb = _seed_items()   # unreadable at first load: seed in memory only
+    else:
+      sig = _kb_sig()  # _load_or_seed may have just written the seed file
+    idf, postings = _idf_vocab(kb), _build_postings(kb)
+    _KB, _IDF, _POSTINGS, _KB_SIG = kb, idf, postings, sig
 
 # --------------------------------- API ---------------------------------
 def retrieve(q: str, k: int = 2) -> List[Dict]:
   _ensure_ready()
+  kb, idf, postings = _KB, _IDF, _POSTINGS  # one consistent snapshot across a reload
   qn = _normalize(q)
   qtok = _tok_ur(qn)
   if not qtok:
     return []
-  scores: List[tuple[float, Dict]] = []
-  for it in _KB:  # type: ignore[arg-type]
-    toks = _tok_ur(_normalize(it["title"] + " " + it["body"]))
-    overlap = set(qtok) & set(toks)
-    score = sum(_IDF.get(t, 0.0) for t in overlap) + 0.01 * len(overlap)  # type: ignore[union-attr]
-    if score > 0:
-      excerpt = it["body"][:120]
-      scores.append((score, {"id": it["id"], "title": it["title"], "excerpt": excerpt}))
-  scores.sort(key=lambda x: x[0], reverse=True)
-  return [e for _, e in scores[:max(1, min(3, k))]]
+  # Only items sharing a query token are scored: sum of IDF over the overlap + 0.01/token
+  acc: Dict[int, float] = {}
+  for t in set(qtok):
+    w = idf.get(t, 0.0) + 0.01  # type: ignore[union-attr]
+    for i in postings.get(t, ()):
+      acc[i] = acc.get(i, 0.0) + w
+  scores = sorted(((s, i) for i, s in acc.items() if s > 0), key=lambda x: (-x[0], x[1]))
+  out: List[Dict] = []
+  for _, i in scores[:max(1, min(3, k))]:
+    it = kb[i]  # type: ignore[index]
+    out.append({"id": it["id"], "title": it["title"], "excerpt": it["body"][:120]})
+  return out
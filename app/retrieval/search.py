@@ -1,18 +1,38 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import List, Dict, Any
-import re, yaml
-from app.retrieval.indexer import search as _idx_search
+import os, re, yaml
+from app.retrieval.indexer import search as _idx_search, search_many as _idx_search_many
 
-def _load_cfg() -> dict:
+_CFG_FILES = ("configs/retrieval.yaml", "configs/planner.yaml")
+_CFG_CACHE: Dict[str, Any] = {"sig": None, "cfg": {}}
+
+def _cfg_sig() -> tuple:
+    sig = []
+    for p in _CFG_FILES:
+        try:
+            st = os.stat(p)
+            sig.append((p, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((p, 0, 0))
+    return tuple(sig)
+
+def load_cfg() -> dict:
+    """Merged retrieval+planner config; re-read from disk only when a file changes."""
+    sig = _cfg_sig()
+    if _CFG_CACHE["sig"] == sig:
+        return _CFG_CACHE["cfg"]
     cfg = {}
-    for p in ("configs/retrieval.yaml", "configs/planner.yaml"):
+    for p in _CFG_FILES:
         path = Path(p)
         if path.exists():
             with path.open("r", encoding="utf-8") as f:
                 cfg.update(yaml.safe_load(f) or {})
+    _CFG_CACHE.update(sig=sig, cfg=cfg)
     return cfg
 
+_load_cfg = load_cfg  # back-compat alias
+
 def _boost(results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
     ql = query.lower()
     q_tokens = set(re.findall(r"[a-z]+", ql))
@@ -36,8 +56,16 @@ def _boost(results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
     return boosted
 
 def search(query: str, k: int | None = None) -> List[Dict[str, Any]]:
-    cfg = _load_cfg()
+    cfg = load_cfg()
     top_k = int(k or cfg.get("top_k", 5))
     index_dir = cfg.get("index_dir", "data/index")
     base = _idx_search(query, k=top_k, index_dir=index_dir)
     return _boost(base, query)
+
+def search_many(queries: List[str], k: int | None = None) -> List[List[Dict[str, Any]]]:
+    """Batched search(): one config read and one index scoring pass for all queries."""
+    cfg = load_cfg()
+    top_k = int(k or cfg.get("top_k", 5))
+    index_dir = cfg.get("index_dir", "data/index")
+    bases = _idx_search_many(list(queries), k=top_k, index_dir=index_dir)
+    return [_boost(base, q) for base, q in zip(bases, queries)]
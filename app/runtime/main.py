@@ -11,10 +11,16 @@ from app.safety.router import SafetyRouter
 # ----------------------------------
 
 # Extras from snippet
-import glob, time, shutil
+import asyncio
 from fastapi.staticfiles import StaticFiles
 from app.channels.web.router import router as web_router
-from app.audio.tts import synth as tts_synth  # warmup
+from app.audio.stt_service import get_stt
+from app.audio.tts.tts_cache import get_cache as get_tts_cache
+from app.audio.tts.prerender import prerender_static
+from app.audio.tts.tts_workers import close_tts_workers
+from app.api.audio import router as audio_router
+from app.ops.cost_meter import close_cost_writers
+from app.api.metrics import router as metrics_router
 
 app = FastAPI(title="SukoonAI Runtime (Week-7)")
 
@@ -26,35 +32,31 @@ app.mount("/artifacts", StaticFiles(directory="artifacts"), name="artifacts")
 
 # Mount routers
 app.include_router(web_router)
+app.include_router(audio_router)   # /api/audio/<key>: TTS cache entries with ETag + Range
+app.include_router(metrics_router)  # /api/ops/metrics: live latency/cost aggregates (JSON, Prometheus)
 
-# Ensure essential dirs at startup + warmup + purge + fingerprint
+_prerender_task = None
+
+# Ensure essential dirs at startup + prerender + retention + fingerprint
 @app.on_event("startup")
 async def _ensure_dirs():
     os.makedirs("logs", exist_ok=True)
     os.makedirs("configs", exist_ok=True)
     os.makedirs("artifacts/audio/tts", exist_ok=True)
 
-    # Optional TTS warmup (prevents first-turn stutter)
-    if os.getenv("SUKOON_TTS_WARMUP", "0") == "1":
-        out = tts_synth("آواز کی جانچ ہو رہی ہے", lang_hint="ur") or {}
-        # best-effort cleanup of warmup file
-        p = out.get("tts_path") if isinstance(out, dict) else None
-        if p and os.path.exists(p):
-            try:
-                os.remove(p)
-            except Exception:
-                pass
-
-    # Optional purge of old WAVs (artifacts hygiene)
+    # Load the shared STT replicas in the background (used by /api/web/stt), as server.py does
+    if os.getenv("SUKOON_STT", "").lower() == "whisper":
+        get_stt().start()
+
+    # Pre-render the static utterance bank into the TTS cache in the background
+    # (replaces the one-line SUKOON_TTS_WARMUP; SUKOON_TTS_PRERENDER=0 disables)
+    global _prerender_task
+    _prerender_task = asyncio.ensure_future(prerender_static())
+
+    # Optional retention: TTS cache entries unused for N days are evicted (pinned lines stay)
     ndays = os.getenv("ARTIFACT_RETENTION_DAYS")
     if ndays and ndays.isdigit():
-        cutoff = time.time() - (int(ndays) * 86400)
-        for wav in glob.glob("artifacts/audio/tts/**/*.*", recursive=True):
-            try:
-                if os.path.getmtime(wav) < cutoff:
-                    os.remove(wav)
-            except Exception:
-                pass
+        get_tts_cache().expire(int(ndays) * 86400)
 
     # --- startup fingerprint (no behavior change) ---
     logger = logging.getLogger("uvicorn.error")
@@ -63,6 +65,15 @@ async def _ensure_dirs():
     logger.info(f"[startup-fingerprint] abstain_block={has_abstain} crisis_detect={crisis_probe}")
     # -------------------------------------------------
 
+@app.on_event("shutdown")
+async def _flush_caches():
+    if _prerender_task is not None:
+        _prerender_task.cancel()
+    close_tts_workers()
+    get_stt().close()
+    get_tts_cache().flush()  # last_used/hit counts of the TTS cache index
+    close_cost_writers()     # buffered cost rows → costs_daily.csv
+
 @app.get("/healthz")
 def healthz():
     return {
@@ -165,8 +176,8 @@ turnBtn.onclick = async ()=>{
       audio.preload = "auto";
       document.body.appendChild(audio);
     }
-    // cache-bust to avoid stale audio
-    audio.src = json.tts_url + "?t=" + Date.now();
+    // cache entries are content-addressed (ETag/304), no cache-buster needed
+    audio.src = json.tts_url;
     audio.play().catch(() => { /* browsers may gate autoplay; controls remain */ });
   }
   // -----------------------------------------------------------------------
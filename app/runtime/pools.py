@@ -0,0 +1,61 @@
+# app/runtime/pools.py
+# Purpose: Bounded executor for the blocking parts of a turn, so async endpoints never run
+# them on the event loop. One slow TTS call then occupies a pool slot, not the worker.
+#
+#   io   — blocking I/O and subprocess work: SAPI/pyttsx3 TTS, ffmpeg, the graph skeleton
+#          (SUKOON_IO_WORKERS, default 16)
+# STT has its own replica workers and queue (app/audio/stt_service.py).
+#
+# Work beyond the pool size queues inside the executor; pool_stats() exposes the backlog.
+from __future__ import annotations
+import asyncio, functools, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_LOCK = threading.Lock()
+_POOL: Optional[ThreadPoolExecutor] = None
+_PENDING = 0
+
+
+def _size() -> int:
+    return max(1, int(os.getenv("SUKOON_IO_WORKERS", "16")))
+
+
+def get_pool() -> ThreadPoolExecutor:
+    global _POOL
+    ex = _POOL
+    if ex is None:
+        with _LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(max_workers=_size(), thread_name_prefix="sukoon-io")
+            ex = _POOL
+    return ex
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking I/O / subprocess call on the io pool."""
+    global _PENDING
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        _PENDING += 1
+    try:
+        return await loop.run_in_executor(get_pool(), functools.partial(fn, *args, **kwargs))
+    finally:
+        with _LOCK:
+            _PENDING -= 1
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    with _LOCK:
+        return {"io": {"workers": _size(), "in_flight": _PENDING}}
+
+
+def shutdown(wait: bool = False) -> None:
+    """Stop the pool (app shutdown); it is recreated lazily on next use."""
+    global _POOL
+    with _LOCK:
+        ex, _POOL = _POOL, None
+    if ex is not None:
+        ex.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,235 @@
+# app/runtime/providers.py
+# Purpose: One HTTP client per external provider (ElevenLabs, OpenAI), shared by every caller:
+#   - keep-alive connection pool, one per event loop (pooled connections belong to one loop)
+#   - bounded concurrency: at most `max_inflight` requests on the wire, the rest wait
+#   - in-flight coalescing: concurrent requests with the same `coalesce` key share one call
+#   - circuit breaker: after `fails` consecutive provider failures (transport error, timeout,
+#     429, 5xx) the circuit opens for `open_s` seconds and requests fail at once with
+#     ProviderUnavailable, so callers drop to their fallback (SAPI, the LLM-down reply)
+#     instead of waiting out timeouts. One probe request then decides whether it closes.
+#
+# Env per provider (NAME = ELEVENLABS | OPENAI):
+#   SUKOON_<NAME>_TIMEOUT_S       read timeout (default 15, OpenAI 30; connect timeout 3)
+#   SUKOON_<NAME>_INFLIGHT        concurrent requests (default: the connection limit)
+#   SUKOON_<NAME>_BREAKER_FAILS   consecutive failures that open the circuit (default 3)
+#   SUKOON_<NAME>_BREAKER_OPEN_S  seconds the circuit stays open (default 30)
+#   SUKOON_ELEVENLABS_URL         base URL (default https://api.elevenlabs.io; mock: app/utils/mock_provider.py)
+# Connection limits keep their existing knobs: SUKOON_TTS_MAX_CONN (8), SUKOON_LLM_MAX_CONN (32).
+from __future__ import annotations
+import asyncio, logging, os, threading, time
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+
+log = logging.getLogger("app.providers")
+
+
+class ProviderUnavailable(RuntimeError):
+    """The provider's circuit is open after repeated failures; fall back without calling it."""
+
+
+class CircuitBreaker:
+    """closed → (fails consecutive failures) → open → (open_s elapsed) → half-open: one probe."""
+
+    def __init__(self, name: str, fails: int = 3, open_s: float = 30.0):
+        self.name = name
+        self.fails = max(1, int(fails))
+        self.open_s = float(open_s)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._until = 0.0          # open until (monotonic)
+        self._probing = False
+        self._n = {"opened": 0, "short_circuited": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._failures < self.fails:
+            return "closed"
+        return "open" if time.monotonic() < self._until else "half_open"
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def admit(self) -> Optional[bool]:
+        """None: short-circuited; True: this request is the half-open probe; False: a normal request."""
+        with self._lock:
+            st = self._state()
+            if st == "closed":
+                return False
+            if st == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._n["short_circuited"] += 1
+            return None
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures, self._probing = 0, False
+
+    def release(self, probe: bool) -> None:
+        """A request ended without a provider verdict (cancelled, caller error): no state change,
+        except that a probe's slot is freed for the next request."""
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures == self.fails:
+                self._until = time.monotonic() + self.open_s
+                self._n["opened"] += 1
+                log.warning("%s circuit open for %.0fs", self.name, self.open_s)
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures, **self._n}
+
+
+def _failed(resp: httpx.Response) -> bool:
+    """Provider-side failure (counts toward the breaker); other 4xx are the caller's problem."""
+    return resp.status_code == 429 or resp.status_code >= 500
+
+
+class ProviderClient:
+    """Pooled, bounded, coalescing, circuit-broken async HTTP for one provider; see module header."""
+
+    def __init__(self, name: str, base_url: str = "", max_conn: int = 8, max_inflight: Optional[int] = None,
+                 timeout: float = 15.0, connect_timeout: float = 3.0, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.max_conn = max(1, int(max_conn))
+        self.max_inflight = max(1, int(max_inflight or self.max_conn))
+        self.timeout = httpx.Timeout(float(timeout), connect=float(connect_timeout))
+        self.breaker = breaker or CircuitBreaker(name)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Hashable, "asyncio.Task[httpx.Response]"] = {}
+        self._active = 0
+        self._n = {"requests": 0, "calls": 0, "coalesced": 0, "failures": 0}
+
+    # ---------- per-loop state ----------
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_conn, max_keepalive_connections=self.max_conn))
+            self._sem = asyncio.Semaphore(self.max_inflight)
+            self._inflight = {}
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+    # ---------- requests ----------
+    async def request(self, method: str, url: str, coalesce: Optional[Hashable] = None, **kw: Any) -> httpx.Response:
+        """
+        httpx request through the pool. `coalesce`: key of an idempotent request; a concurrent
+        request with the same key awaits the call already on the wire instead of making its own.
+        Raises ProviderUnavailable while the circuit is open; transport errors propagate.
+        """
+        client = self.client()
+        with self._lock:
+            self._n["requests"] += 1
+        if coalesce is not None:
+            task = self._inflight.get(coalesce)
+            if task is not None:
+                with self._lock:
+                    self._n["coalesced"] += 1
+                return await asyncio.shield(task)
+        probe = self.breaker.admit()
+        if probe is None:
+            raise ProviderUnavailable(f"{self.name} circuit open")
+        task = asyncio.ensure_future(self._send(client, method, url, probe, **kw))
+        if coalesce is not None:
+            self._inflight[coalesce] = task
+            task.add_done_callback(lambda _t, k=coalesce: self._inflight.pop(k, None))
+        return await asyncio.shield(task)
+
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, probe: bool,
+                    **kw: Any) -> httpx.Response:
+        failed: Optional[bool] = None   # None: no verdict (cancelled, bad arguments): not the provider's fault
+        try:
+            async with self._sem:
+                with self._lock:
+                    self._n["calls"] += 1
+                    self._active += 1
+                try:
+                    resp = await client.request(method, url, **kw)
+                    failed = _failed(resp)
+                except (httpx.TransportError, asyncio.TimeoutError):
+                    failed = True
+                    raise
+                finally:
+                    with self._lock:
+                        self._active -= 1
+        finally:
+            if failed is None:
+                self.breaker.release(probe)
+            elif failed:
+                self._fail()
+            else:
+                self.breaker.success()
+        return resp
+
+    def _fail(self) -> None:
+        with self._lock:
+            self._n["failures"] += 1
+        self.breaker.failure()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"max_conn": self.max_conn, "max_inflight": self.max_inflight, "active": self._active,
+                    "waiting_keys": len(self._inflight), **self._n, "breaker": self.breaker.stats()}
+
+
+def _env(name: str, key: str, default: str) -> str:
+    return os.getenv(f"SUKOON_{name.upper()}_{key}", default)
+
+
+def _make(name: str) -> ProviderClient:
+    base, conn, timeout = "", "8", "15"
+    if name == "elevenlabs":
+        base, conn = os.getenv("SUKOON_ELEVENLABS_URL", "https://api.elevenlabs.io"), os.getenv("SUKOON_TTS_MAX_CONN", "8")
+    elif name == "openai":  # the SDK owns the pool (LLMClient.aclient); breaker + timeout come from here
+        conn, timeout = os.getenv("SUKOON_LLM_MAX_CONN", "32"), "30"
+    breaker = CircuitBreaker(name, fails=int(_env(name, "BREAKER_FAILS", "3")),
+                             open_s=float(_env(name, "BREAKER_OPEN_S", "30")))
+    return ProviderClient(name, base_url=base, max_conn=int(conn),
+                          max_inflight=int(_env(name, "INFLIGHT", "0")) or None,
+                          timeout=float(_env(name, "TIMEOUT_S", timeout)), breaker=breaker)
+
+
+_PROVIDERS: Dict[str, ProviderClient] = {}
+_PROVIDERS_LOCK = threading.Lock()
+
+def get_provider(name: str) -> ProviderClient:
+    """Process-wide ProviderClient for `name` (created on first use)."""
+    p = _PROVIDERS.get(name)
+    if p is None:
+        with _PROVIDERS_LOCK:
+            p = _PROVIDERS.get(name)
+            if p is None:
+                p = _PROVIDERS[name] = _make(name)
+    return p
+
+
+def provider_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: p.stats() for name, p in list(_PROVIDERS.items())}
+
+
+async def close_providers() -> None:
+    """Close the pooled connections (app shutdown); clients are recreated on next use."""
+    for p in list(_PROVIDERS.values()):
+        await p.aclose()
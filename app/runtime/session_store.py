@@ -0,0 +1,250 @@
+# app/runtime/session_store.py
+# Purpose: One key/value session store with per-key TTL for the small per-user state the apps
+# keep between requests: plan usage per day (server._plan_consume → "plan_usage", ops/plan_gate
+# → "plan_gate"), consent records (/consent), and the WhatsApp 24h window / opt-in
+# (channels/whatsapp_guard). Process-local dicts are wrong with several uvicorn workers and
+# grow without bound.
+#
+#   MemoryStore   one process; expiry through a heap of deadlines, so only entries that are
+#                 actually due are touched (no full scans); bounded by max_entries (soonest
+#                 deadlines evicted first, then keys without a TTL, least recently set first)
+#   SQLiteStore   one file shared by every worker on the host (WAL, busy timeout); atomic
+#                 incr via BEGIN IMMEDIATE; expired rows deleted through an index on `expires`
+#
+# Values are JSON-serializable. incr(..., limit=) is the atomic "charge unless over cap".
+# SQLiteStore calls block (busy timeout): from async code they go through run_io.
+#
+# Env: SUKOON_SESSION_STORE = memory (default) | sqlite | sqlite:<path>
+#      (sqlite → artifacts/state/sessions.db)
+#      SUKOON_SESSION_MAX    MemoryStore entry bound (default 100000)
+from __future__ import annotations
+import heapq, itertools, json, os, sqlite3, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DB = "artifacts/state/sessions.db"
+_PURGE_EVERY_S = 60.0
+
+
+class SessionStore:
+    """Interface: namespaced keys, JSON values, optional TTL (seconds) per key."""
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, ns: str, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, ns: str, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, ns: str, key: str, by: int = 1, ttl_s: Optional[float] = None,
+             limit: Optional[int] = None) -> Optional[int]:
+        """Atomically add `by`; returns the new value, or None (nothing added) when it would exceed `limit`."""
+        raise NotImplementedError
+
+    def purge(self) -> int:
+        """Drop expired entries now; returns how many."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStore(SessionStore):
+    """In-process store; see module header."""
+
+    def __init__(self, max_entries: Optional[int] = None, clock=time.time):
+        self.max_entries = int(max_entries or os.getenv("SUKOON_SESSION_MAX", "100000"))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: Dict[Tuple[str, str], Tuple[Any, float]] = {}     # → (value, expires; inf = never)
+        self._heap: List[Tuple[float, str, str]] = []                 # (expires, ns, key); stale ones skipped
+        self._n = {"expired": 0, "evicted": 0}
+
+    def _expire(self, now: float) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            exp, ns, key = heapq.heappop(heap)
+            cur = self._data.get((ns, key))
+            if cur is not None and cur[1] == exp:   # not re-set with a later deadline since
+                del self._data[(ns, key)]
+                self._n["expired"] += 1
+
+    def _put(self, ns: str, key: str, value: Any, ttl_s: Optional[float], now: float) -> None:
+        exp = now + ttl_s if ttl_s else float("inf")
+        self._data.pop((ns, key), None)             # re-set → newest in insertion order
+        self._data[(ns, key)] = (value, exp)
+        if ttl_s:
+            heapq.heappush(self._heap, (exp, ns, key))
+        if len(self._data) > self.max_entries:   # over the bound: the soonest deadlines go first
+            while self._heap and len(self._data) > self.max_entries:
+                e, n, k = heapq.heappop(self._heap)
+                cur = self._data.get((n, k))
+                if cur is not None and cur[1] == e and (n, k) != (ns, key):
+                    del self._data[(n, k)]
+                    self._n["evicted"] += 1
+            if len(self._data) > self.max_entries:   # only keys without a TTL left: oldest set first
+                over = len(self._data) - self.max_entries
+                for k in list(itertools.islice(self._data, over + 1)):
+                    if over and k != (ns, key):
+                        del self._data[k]
+                        self._n["evicted"] += 1
+                        over -= 1
+        if len(self._heap) > 2 * len(self._data) + 64:   # many stale deadlines: rebuild
+            self._heap = [(e, n, k) for (n, k), (_, e) in self._data.items() if e != float("inf")]
+            heapq.heapify(self._heap)
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            cur = self._data.get((ns, key))
+            return default if cur is None else cur[0]
+
+    def set(self, ns: str, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            self._put(ns, key, value, ttl_s, now)
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._data.pop((ns, key), None)
+
+    def incr(self, ns: str, key: str, by: int = 1, ttl_s: Optional[float] = None,
+             limit: Optional[int] = None) -> Optional[int]:
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            cur = self._data.get((ns, key))
+            new = int(cur[0] if cur else 0) + by
+            if limit is not None and new > limit:
+                return None
+            if cur is None:
+                self._put(ns, key, new, ttl_s, now)
+            else:                                         # a counter keeps its first deadline
+                self._data[(ns, key)] = (new, cur[1])
+            return new
+
+    def purge(self) -> int:
+        with self._lock:
+            before = self._n["expired"]
+            self._expire(self._clock())
+            return self._n["expired"] - before
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._data), "max_entries": self.max_entries,
+                    "deadlines": len(self._heap), **self._n}
+
+
+class SQLiteStore(SessionStore):
+    """Shared-file store for every worker on one host; see module header."""
+
+    def __init__(self, path: str = DEFAULT_DB, clock=time.time):
+        self.path = path
+        self._clock = clock
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._purged = 0.0
+        self._n = {"expired": 0}
+        with self._conn() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv (ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                       " expires REAL, PRIMARY KEY (ns, key))")
+            db.execute("CREATE INDEX IF NOT EXISTS kv_expires ON kv (expires) WHERE expires IS NOT NULL")
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._purged >= _PURGE_EVERY_S:
+            self._purged = now
+            self.purge()
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        now = self._clock()
+        row = self._conn().execute("SELECT value FROM kv WHERE ns=? AND key=? AND (expires IS NULL OR expires>?)",
+                                   (ns, key, now)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, ns: str, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        now = self._clock()
+        self._conn().execute("INSERT OR REPLACE INTO kv (ns, key, value, expires) VALUES (?,?,?,?)",
+                             (ns, key, json.dumps(value), now + ttl_s if ttl_s else None))
+        self._maybe_purge(now)
+
+    def delete(self, ns: str, key: str) -> None:
+        self._conn().execute("DELETE FROM kv WHERE ns=? AND key=?", (ns, key))
+
+    def incr(self, ns: str, key: str, by: int = 1, ttl_s: Optional[float] = None,
+             limit: Optional[int] = None) -> Optional[int]:
+        now = self._clock()
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")   # one writer across processes for the read-modify-write
+        try:
+            row = db.execute("SELECT value, expires FROM kv WHERE ns=? AND key=? AND (expires IS NULL OR expires>?)",
+                             (ns, key, now)).fetchone()
+            new = int(json.loads(row[0]) if row else 0) + by
+            if limit is not None and new > limit:
+                db.execute("ROLLBACK")
+                return None
+            expires = row[1] if row else (now + ttl_s if ttl_s else None)
+            db.execute("INSERT OR REPLACE INTO kv (ns, key, value, expires) VALUES (?,?,?,?)",
+                       (ns, key, json.dumps(new), expires))
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        self._maybe_purge(now)
+        return new
+
+    def purge(self) -> int:
+        cur = self._conn().execute("DELETE FROM kv WHERE expires IS NOT NULL AND expires<=?", (self._clock(),))
+        with self._lock:
+            self._n["expired"] += cur.rowcount
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        n = self._conn().execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+        with self._lock:
+            return {"backend": "sqlite", "path": self.path, "entries": n, **self._n}
+
+    def close(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def make_store(spec: Optional[str] = None) -> SessionStore:
+    """'memory' | 'sqlite' | 'sqlite:<path>' (default: SUKOON_SESSION_STORE, else memory)."""
+    spec = (spec if spec is not None else os.getenv("SUKOON_SESSION_STORE", "memory")).strip()
+    if spec.startswith("sqlite"):
+        return SQLiteStore(spec.split(":", 1)[1] if ":" in spec else DEFAULT_DB)
+    if spec not in ("", "memory"):
+        raise ValueError(f"unknown SUKOON_SESSION_STORE: {spec!r}")
+    return MemoryStore()
+
+
+_STORE: Optional[SessionStore] = None
+_STORE_LOCK = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Process-wide SessionStore (created on first use)."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = make_store()
+    return _STORE
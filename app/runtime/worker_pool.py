@@ -0,0 +1,154 @@
+# app/runtime/worker_pool.py
+# Purpose: The bounded worker pool shared by the STT service (app/audio/stt_service.py) and the
+# resident TTS workers (app/audio/tts/tts_workers.py): N long-lived worker threads, each owning
+# a resource loaded once (a Whisper replica, an engine process), pulling jobs from one bounded
+# queue. When every worker is busy and the queue is full, submit() fails fast with the pool's
+# Busy error (backpressure) instead of piling up work.
+#
+# Subclasses implement _load(i) (the per-worker resource; a failure is recorded in load_error
+# and jobs then fail in _run instead of hanging) and _run(i, payload) (one job). stats() gives
+# queue depth, busy workers, counters and average queue/run times.
+from __future__ import annotations
+import logging, queue, threading, time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Type
+
+log = logging.getLogger("app.worker_pool")
+
+
+class BoundedWorkerPool:
+    """Bounded job queue over `workers` resident worker threads; see module header."""
+
+    busy_error: Type[Exception] = RuntimeError
+    label = "worker"                        # in error messages ("STT queue full ...")
+    run_stat = "avg_run_ms"                 # name of the average-run-time entry in stats()
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._state: List[Any] = [None] * self.workers
+        self.load_ms: List[Optional[float]] = [None] * self.workers
+        self.load_error: Optional[str] = None
+        self._busy = 0
+        self._n = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._wait_ms = 0.0
+        self._run_ms = 0.0
+
+    # ---------- subclass hooks ----------
+    def _load(self, i: int) -> Any:
+        """Per-worker resource (runs on the worker thread, before its first job)."""
+        return None
+
+    def _run(self, i: int, payload: Any, t_enq: float, t_start: float) -> Any:
+        raise NotImplementedError
+
+    def _unload(self, i: int, state: Any) -> None:
+        """Release a worker's resource (close())."""
+
+    # ---------- lifecycle ----------
+    def start(self) -> "BoundedWorkerPool":
+        """Spawn the workers; each loads its resource in parallel (non-blocking)."""
+        with self._lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    t = threading.Thread(target=self._worker, args=(i,), name=f"sukoon-{self.name}-{i}", daemon=True)
+                    t.start()
+                    self._threads.append(t)
+        return self
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Fail queued jobs, let running ones finish (up to `timeout`), release the resources."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._fail_queued()
+        for _ in threads:
+            try:
+                self._q.put(None, timeout=timeout)
+            except queue.Full:      # raced with late submits; workers are daemons
+                break
+        for t in threads:
+            t.join(timeout)
+        self._fail_queued()
+        for i, state in enumerate(self._state):
+            if state is not None:
+                self._unload(i, state)
+                self._state[i] = None
+
+    def _fail_queued(self) -> None:
+        """Jobs nobody will run: fail them rather than leave callers waiting."""
+        while True:
+            try:
+                job = self._q.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[0].set_running_or_notify_cancel():
+                job[0].set_exception(RuntimeError(f"{self.label} worker pool closed"))
+
+    def _worker(self, i: int) -> None:
+        t0 = time.perf_counter()
+        try:
+            self._state[i] = self._load(i)
+        except Exception as e:  # missing model/engine: jobs fail, never hang
+            with self._lock:
+                self.load_error = f"{type(e).__name__}: {e}"
+            log.warning("%s worker %s/%d failed to load: %s", self.label, self.name, i, e)
+        self.load_ms[i] = round((time.perf_counter() - t0) * 1000, 1)
+
+        while True:
+            job = self._q.get()
+            if job is None:
+                return
+            fut, payload, t_enq = job
+            if not fut.set_running_or_notify_cancel():
+                continue
+            t_start = time.perf_counter()
+            with self._lock:
+                self._busy += 1
+                self._wait_ms += (t_start - t_enq) * 1000
+            res, exc = None, None
+            try:
+                res = self._run(i, payload, t_enq, t_start)
+            except Exception as e:
+                exc = e
+            with self._lock:  # stats first: a caller woken by the future sees this job counted
+                self._busy -= 1
+                self._run_ms += (time.perf_counter() - t_start) * 1000
+                self._n["failed" if exc else "completed"] += 1
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(res)
+
+    # ---------- API ----------
+    def submit(self, payload: Any) -> "Future[Any]":
+        if not self._threads:
+            self.start()
+        fut: "Future[Any]" = Future()
+        try:
+            self._q.put_nowait((fut, payload, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._n["rejected"] += 1
+            raise self.busy_error(f"{self.label} queue full ({self.max_queue} waiting)")
+        with self._lock:
+            self._n["submitted"] += 1
+        return fut
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self._n["completed"] + self._n["failed"]
+            return {
+                "started": bool(self._threads),
+                "load_ms": list(self.load_ms),
+                "load_error": self.load_error,
+                "queue_depth": self._q.qsize(),
+                "queue_max": self.max_queue,
+                "busy": self._busy,
+                **self._n,
+                "avg_queue_ms": round(self._wait_ms / done, 1) if done else 0.0,
+                self.run_stat: round(self._run_ms / done, 1) if done else 0.0,
+            }
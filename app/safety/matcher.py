@@ -0,0 +1,280 @@
+# app/safety/matcher.py
+# Purpose: One compiled multi-pattern automaton (Aho–Corasick, DFA form) shared by every
+# safety/policy check on a turn: term_gates.detect_route, SafetyRouter and the run_turn
+# regexes (CRISIS_RX / ABSTAIN_RX / FINANCE_PAT).
+#
+# Three kinds of entries are registered under a tag ("gate.crisis_inline", "router.self-harm", ...):
+#   terms        literal substrings of text.lower()            → Scan.terms(tag)
+#   token terms  words in order (not necessarily adjacent)     → Scan.token_terms(tag)
+#   regex        compiled pattern; its required literals are    → Scan.search(tag)
+#                extracted once and used as AC anchors, the
+#                original regex only runs when an anchor is present
+# One pass over the text finds every literal/anchor of every tag, so the cost of a check is
+# O(len(text)) however many terms the policy YAML files grow to. Verdicts are identical to
+# the per-module checks they replace: literals are exact, regexes are still the final word.
+from __future__ import annotations
+import re, threading
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:  # Python 3.11+
+    import re._parser as _sre_parse
+    import re._constants as _sre_c
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre_parse  # type: ignore
+    import sre_constants as _sre_c  # type: ignore
+
+# ---------- case folding compatible with re.IGNORECASE ----------
+# str.lower() plus the extra equivalences `re` applies under IGNORECASE (ı/i, ſ/s, K/k, σ/ς, …),
+# each class mapped to its smallest code point. Anchor search runs on this fold so it never
+# misses text the regex itself would accept.
+def _extra_case_table() -> Dict[int, str]:
+    try:
+        from re._casefix import _EXTRA_CASES  # type: ignore
+    except Exception:
+        _EXTRA_CASES = {0x69: (0x131,), 0x73: (0x17F,)}
+    table: Dict[int, str] = {}
+    for lo, others in _EXTRA_CASES.items():
+        canon = min((lo, *others))
+        for cp in (lo, *others):
+            if cp != canon:
+                table[cp] = chr(canon)
+    return table
+
+_PRE_FOLD = {0x130: "i"}  # İ: full lowercase is "i̇", re compares the simple lowercase "i"
+_POST_FOLD = _extra_case_table()
+
+def fold(text: str) -> str:
+    return (text or "").translate(_PRE_FOLD).lower().translate(_POST_FOLD)
+
+
+# ---------- Aho–Corasick ----------
+class AhoCorasick:
+    """Keyword automaton compiled to a DFA (fail links folded into the transitions)."""
+
+    def __init__(self, patterns: Iterable[str]):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+        for p in dict.fromkeys(p for p in patterns if p):
+            s = 0
+            for ch in p:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append(())
+                    goto[s][ch] = nxt
+                s = nxt
+            out[s] = out[s] + (p,)
+
+        fail = [0] * len(goto)
+        order: List[int] = []
+        q = deque(goto[0].values())
+        while q:
+            r = q.popleft()
+            order.append(r)
+            for ch, u in goto[r].items():
+                q.append(u)
+                f = fail[r]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                v = goto[f].get(ch, 0)
+                fail[u] = v if v != u else 0
+                out[u] = out[u] + out[fail[u]]
+
+        delta = [dict(g) for g in goto]
+        for r in order:  # BFS order: a state's fail target is already complete
+            d, fd = delta[r], delta[fail[r]]
+            for ch, v in fd.items():
+                d.setdefault(ch, v)
+        self._delta = delta
+        self._out = out
+
+    def findall(self, text: str) -> Set[str]:
+        delta, out = self._delta, self._out
+        s = 0
+        found: Set[str] = set()
+        for ch in text:
+            s = delta[s].get(ch, 0)
+            if out[s]:
+                found.update(out[s])
+        return found
+
+
+# ---------- required literals of a regex ----------
+_REPEATS = {_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT}
+if hasattr(_sre_c, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(_sre_c.POSSESSIVE_REPEAT)
+
+def _required(sub) -> Optional[FrozenSet[str]]:
+    """A set of literals such that every match contains at least one of them (None: unknown)."""
+    cands: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in sub:
+        if op is _sre_c.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            cands.append(frozenset(["".join(run)]))
+            run = []
+        r: Optional[FrozenSet[str]] = None
+        if op is _sre_c.SUBPATTERN:
+            r = _required(av[-1])
+        elif op is _sre_c.BRANCH:
+            alts = [_required(b) for b in av[1]]
+            if all(a is not None for a in alts):
+                r = frozenset().union(*alts)  # type: ignore[arg-type]
+        elif op in _REPEATS and av[0] >= 1:
+            r = _required(av[2])
+        if r:
+            cands.append(r)
+    if run:
+        cands.append(frozenset(["".join(run)]))
+    if not cands:
+        return None
+    # Most selective: longest shortest-anchor, then fewest anchors
+    return max(cands, key=lambda s: (min(len(x) for x in s), -len(s)))
+
+def regex_anchors(rx: "re.Pattern[str]") -> Optional[FrozenSet[str]]:
+    try:
+        req = _required(_sre_parse.parse(rx.pattern, rx.flags))
+    except Exception:
+        return None
+    if not req or not all(req):
+        return None
+    return frozenset(fold(a) for a in req)
+
+
+# ---------- shared matcher ----------
+# Python 're' has no \p{…}: keep the Urdu/Arabic range U+0600–U+06FF and Latin \w explicitly.
+_SPLIT_RE = re.compile(r"[^\w\u0600-\u06FF]+")
+
+def _tokenize(s: str) -> List[str]:
+    return [tok for tok in _SPLIT_RE.split(s) if tok]
+
+
+class Scan:
+    """All hits of one text. Literal hits are computed up front; regexes lazily, once."""
+
+    def __init__(self, matcher: "SafetyMatcher", text: str, low_hits: Set[str], fold_hits: Set[str]):
+        self._m = matcher
+        self.text = text
+        self._low_hits = low_hits
+        self._fold_hits = fold_hits
+        self._rx: Dict[str, Optional[re.Match]] = {}
+        self._toks: Optional[List[str]] = None
+
+    def terms(self, tag: str) -> List[str]:
+        """Literal (lowercase) terms of `tag` found in text.lower(), in registration order."""
+        hits = self._low_hits
+        return [t for t in self._m._terms.get(tag, ()) if t in hits]
+
+    def any(self, tag: str) -> bool:
+        hits = self._low_hits
+        return any(t in hits for t in self._m._terms.get(tag, ()))
+
+    def token_terms(self, tag: str) -> List[str]:
+        """Terms whose words all occur as tokens, in order (not necessarily adjacent)."""
+        hits = self._low_hits
+        out: List[str] = []
+        for term, words in self._m._token_terms.get(tag, ()):
+            if not all(w in hits for w in words):
+                continue  # a missing word can't be a token either
+            if self._toks is None:
+                self._toks = _tokenize(self.text.lower())
+            toks, i = self._toks, 0
+            for w in words:
+                try:
+                    i = toks.index(w, i) + 1
+                except ValueError:
+                    break
+            else:
+                out.append(term)
+        return out
+
+    def search(self, tag: str) -> Optional[re.Match]:
+        """rx.search(text) for the regex registered under `tag`, skipped when no anchor is present."""
+        if tag in self._rx:
+            return self._rx[tag]
+        rx = self._m._regex[tag]
+        anchors = self._m._anchors[tag]
+        m = rx.search(self.text) if anchors is None or not anchors.isdisjoint(self._fold_hits) else None
+        self._rx[tag] = m
+        return m
+
+
+class SafetyMatcher:
+    """Registry of tagged terms/regexes compiled into one automaton; scan() results are memoized per text."""
+
+    def __init__(self, memo_size: int = 256):
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._token_terms: Dict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]] = {}
+        self._regex: Dict[str, "re.Pattern[str]"] = {}
+        self._anchors: Dict[str, Optional[FrozenSet[str]]] = {}
+        self._ac: Optional[AhoCorasick] = None
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[str, Scan]" = OrderedDict()
+        self._memo_size = memo_size
+
+    # -- registration (module import time) --
+    def add_terms(self, tag: str, terms: Iterable[str]) -> None:
+        with self._lock:
+            self._terms[tag] = tuple(terms)
+            self._dirty()
+
+    def add_token_terms(self, tag: str, terms: Iterable[str]) -> None:
+        with self._lock:
+            self._token_terms[tag] = tuple((t, tuple(_tokenize(t))) for t in terms if _tokenize(t))
+            self._dirty()
+
+    def add_regex(self, tag: str, rx: "re.Pattern[str]") -> None:
+        with self._lock:
+            self._regex[tag] = rx
+            self._anchors[tag] = regex_anchors(rx)
+            self._dirty()
+
+    def _dirty(self) -> None:
+        self._ac = None
+        self._memo.clear()
+
+    def _automaton(self) -> AhoCorasick:
+        ac = self._ac
+        if ac is None:
+            with self._lock:
+                if self._ac is None:
+                    pats: List[str] = []
+                    for terms in self._terms.values():
+                        pats.extend(terms)
+                    for entries in self._token_terms.values():
+                        for _, words in entries:
+                            pats.extend(words)
+                    for anchors in self._anchors.values():
+                        pats.extend(anchors or ())
+                    self._ac = AhoCorasick(pats)
+                ac = self._ac
+        return ac
+
+    # -- matching --
+    def scan(self, text: str) -> Scan:
+        text = text or ""
+        sc = self._memo.get(text)
+        if sc is not None:
+            return sc
+        ac = self._automaton()
+        low = text.lower()
+        folded = fold(text)
+        low_hits = ac.findall(low)
+        fold_hits = low_hits if folded == low else ac.findall(folded)
+        sc = Scan(self, text, low_hits, fold_hits)
+        with self._lock:
+            self._memo[text] = sc
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return sc
+
+
+# Process-wide instance; policy modules register their terms at import.
+MATCHER = SafetyMatcher()
+
+def scan(text: str) -> Scan:
+    return MATCHER.scan(text)
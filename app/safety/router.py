@@ -1,6 +1,7 @@
 ﻿# app/safety/router.py
 import re
 from typing import Dict, List, Optional
+from app.safety.matcher import MATCHER
 
 # Additional high-signal Urdu-script crisis phrases (self-harm)
 # (Broadened for Stage-1 drill reliability)
@@ -18,6 +19,39 @@ URDU_CRISIS_PATTERNS: List[str] = [
     r"end\s*my\s*life",
 ]
 
+# Categories -> keyword lists (extend as needed); order matters: first hit wins
+CATEGORY_PATTERNS: Dict[str, List[str]] = {
+    "self-harm": [
+        # English / Roman Urdu base set
+        r"suicide", r"self[\s-]?harm", r"end my life", r"kill myself",
+        r"take my own life", r"hurt myself",
+        r"khud\s?kushi", r"khudkushi", r"apni\s+jaan\s+le(na)?",
+        r"apne\s+aap\s+ko\s+maar(na)?", r"apne\s+aap\s+ko\s+nuksan"
+    ] + URDU_CRISIS_PATTERNS,  # augmented with broader Urdu/EN patterns
+    "harm-others": [
+        r"kill (him|her|them|someone)", r"murder", r"shoot", r"stab", r"bomb",
+        r"harm others", r"attack",
+        r"qatal", r"maar\s+d(o|u)nga", r"hamla"
+    ],
+    "abuse/assault": [
+        r"rape", r"sexual assault", r"molest", r"abuse", r"harass(ment)?",
+        r"z(i|e)ad(a|aa)ti", r"jinsi\s+tashaddud", r"tashaddud"
+    ],
+    "medical-emergency": [
+        r"overdose", r"poison", r"bleeding", r"emergency",
+        r"panic attack", r"heart attack", r"choking", r"stroke", r"zehar"
+    ],
+}
+
+# Compiled once at import: one regex per category, registered with the shared automaton
+# so detect() only runs a category regex when one of its literals occurs in the text.
+_COMPILED: Dict[str, re.Pattern] = {
+    cat: re.compile(r"(" + r"|".join(pats) + r")", flags=re.IGNORECASE)
+    for cat, pats in CATEGORY_PATTERNS.items()
+}
+for _cat, _rx in _COMPILED.items():
+    MATCHER.add_regex("router." + _cat, _rx)
+
 class SafetyRouter:
     """
     Lightweight regex-based crisis detector (pre-LLM).
@@ -26,46 +60,17 @@ class SafetyRouter:
     """
 
     def __init__(self) -> None:
-        # Categories -> keyword lists (extend as needed)
-        self._patterns: Dict[str, List[str]] = {
-            "self-harm": [
-                # English / Roman Urdu base set
-                r"suicide", r"self[\s-]?harm", r"end my life", r"kill myself",
-                r"take my own life", r"hurt myself",
-                r"khud\s?kushi", r"khudkushi", r"apni\s+jaan\s+le(na)?",
-                r"apne\s+aap\s+ko\s+maar(na)?", r"apne\s+aap\s+ko\s+nuksan"
-            ],
-            "harm-others": [
-                r"kill (him|her|them|someone)", r"murder", r"shoot", r"stab", r"bomb",
-                r"harm others", r"attack",
-                r"qatal", r"maar\s+d(o|u)nga", r"hamla"
-            ],
-            "abuse/assault": [
-                r"rape", r"sexual assault", r"molest", r"abuse", r"harass(ment)?",
-                r"z(i|e)ad(a|aa)ti", r"jinsi\s+tashaddud", r"tashaddud"
-            ],
-            "medical-emergency": [
-                r"overdose", r"poison", r"bleeding", r"emergency",
-                r"panic attack", r"heart attack", r"choking", r"stroke", r"zehar"
-            ],
-        }
-
-        # >>> Patch: augment self-harm with broader Urdu/EN patterns <<<
-        self._patterns["self-harm"].extend(URDU_CRISIS_PATTERNS)
-
-        # Compile one regex per category
-        self._compiled: Dict[str, re.Pattern] = {
-            cat: re.compile(r"(" + r"|".join(pats) + r")", flags=re.IGNORECASE)
-            for cat, pats in self._patterns.items()
-        }
+        self._patterns: Dict[str, List[str]] = CATEGORY_PATTERNS
+        self._compiled: Dict[str, re.Pattern] = _COMPILED
 
     def detect(self, text: str) -> Dict[str, Optional[object]]:
         text = text or ""
         matches: List[str] = []
         hit_category: Optional[str] = None
 
-        for cat, rx in self._compiled.items():
-            m = rx.search(text)
+        sc = MATCHER.scan(text)
+        for cat in self._compiled:
+            m = sc.search("router." + cat)
             if m:
                 hit_category = cat
                 matches.append(m.group(0))
@@ -0,0 +1,118 @@
+# app/safety/verdict.py
+# Purpose: Request-scoped safety verdict. One call to assess() per turn classifies the user's
+# text with every safety check the turn needs (term gates, SafetyRouter, run_turn regexes)
+# from a single matcher pass; web_turn → run_turn → run_graph → plan_say/safety_node read the
+# same object instead of re-scanning.
+from __future__ import annotations
+import re, unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.policies.term_gates import detect_route
+from app.safety.matcher import MATCHER
+from app.safety.router import SafetyRouter
+
+# --- run_turn safety/policy regexes (Urdu + Roman-Urdu + EN) ---
+# Crisis: allow punctuation between words; add common Urdu phrasing "نقصان پہنچانا/پہنچانے"
+CRISIS_RX = re.compile(
+    r"("
+    r"خودکشی|زندگی[\s\W]*ختم|جان[\s\W]*لے[\s\W]*ل(?:وں|و)"
+    r"|خود[\s\W]*کو[\s\W]*نقصان(?:[\s\W]*پہنچا(?:نا|نے))?"
+    r"|مر[\s\W]*نا|مر[\s\W]*جانا"
+    r"|suicid(?:e|al)|kill[\s\W]*myself|take[\s\W]*my[\s\W]*life|self[-\s]?harm"
+    r"|khud[\s\W]*kushi|khudkushi|apni[\s\W]*jaan|jan[\s\W]*le[\s\W]*loon|jan[\s\W]*le[\s\W]*lu|nuqsan[\s\W]*khud[\s\W]*ko"
+    r")",
+    re.I,
+)
+# Finance/speculation: include Urdu script words (کوائن/سٹاک/شیئر/منافع) + Roman-Urdu + EN
+ABSTAIN_RX = re.compile(
+    r"(کریپٹو|کرپٹو|crypto|bitcoin|btc|altcoin[s]?|"
+    r"کوائن|سکہ|سٹاک|شیئر|share[s]?|stock[s]?|"
+    r"coin[s]?|tip|signal[s]?|double|doubling|quick[\s\W]*profit|منافع)",
+    re.I,
+)
+
+# Added: broader finance/out-of-scope pattern for deterministic ABSTAIN (kept from existing file)
+FINANCE_PAT = re.compile(
+    r"(کریپٹو|کرپٹو|crypto|bitcoin|btc|altcoins?|trading|trade|"
+    r"forex|stocks?|signal[s]?|get\s*rich|doubl(e|ing)\s+money)",
+    re.I,
+)
+
+MATCHER.add_regex("turn.crisis", CRISIS_RX)
+MATCHER.add_regex("turn.abstain", ABSTAIN_RX)
+MATCHER.add_regex("turn.finance", FINANCE_PAT)
+
+_ROUTER = SafetyRouter()
+_URDU_SCRIPT_RE = re.compile(r"[\u0600-\u06FF]")
+
+
+@dataclass
+class SafetyVerdict:
+    """
+    Everything a turn needs to know about the safety of its input, computed once.
+
+      gate         term_gates.detect_route(text)        → route / reason / matched_terms
+      router       SafetyRouter.detect(NFC(text))       → category / crisis
+      crisis_rx    CRISIS_RX on NFC(text)
+      finance_rx   ABSTAIN_RX or FINANCE_PAT on NFC(text)
+      language     'ur' | 'en' (or the caller's finer-grained value)
+      policy_tags  filled lazily by agent.graph.safety_node, keyed by topic
+    """
+    text: str
+    gate: Dict[str, Any]
+    router: Dict[str, Any]
+    crisis_rx: bool
+    finance_rx: bool
+    language: str
+    policy_tags: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        return str(self.gate.get("route", "assist"))
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self.gate.get("reason")
+
+    @property
+    def category(self) -> Optional[str]:
+        return self.router.get("category")
+
+    @property
+    def matched_terms(self) -> List[str]:
+        return list(self.gate.get("matched_terms") or []) + list(self.router.get("matched_terms") or [])
+
+    @property
+    def turn_crisis(self) -> bool:
+        """run_turn's crisis fast-path condition."""
+        return bool(self.router.get("crisis")) or self.crisis_rx
+
+    @property
+    def turn_abstain(self) -> bool:
+        """run_turn's speculative-finance condition (checked after crisis)."""
+        return self.finance_rx
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "route": self.route,
+            "reason": self.reason,
+            "category": self.category,
+            "matched_terms": self.matched_terms,
+            "language": self.language,
+        }
+
+
+def assess(text: str, language: Optional[str] = None) -> SafetyVerdict:
+    """Classify `text` once; all checks share one memoized matcher scan."""
+    raw = text or ""
+    nfc = unicodedata.normalize("NFC", raw)
+    sc = MATCHER.scan(nfc)
+    return SafetyVerdict(
+        text=raw,
+        gate=detect_route(raw),
+        router=_ROUTER.detect(nfc),
+        crisis_rx=sc.search("turn.crisis") is not None,
+        finance_rx=sc.search("turn.abstain") is not None or sc.search("turn.finance") is not None,
+        language=language or ("ur" if _URDU_SCRIPT_RE.search(raw) else "en"),
+    )
@@ -0,0 +1,116 @@
+"""
+Concurrency bench for /api/web/turn (offline, in-process).
+
+Drives the FastAPI app through httpx.ASGITransport with C concurrent sessions for each C in
+BENCH_SESSIONS and reports throughput (turns/s) and p50/p95 latency. The provider is simulated:
+the LLM call takes BENCH_LLM_MS and, when BENCH_TTS_MS > 0, the SAPI TTS step takes BENCH_TTS_MS.
+
+  BENCH_MODE=async     (default) LLM awaited via arun_turn, TTS on the bounded io pool
+  BENCH_MODE=blocking  the same simulated latency spent blocking the event loop, i.e. what
+                       the previous inline LLMClient.chat / urlopen / subprocess calls did
+
+With the async pipeline throughput grows with C (until the LLM connection pool or io pool
+bound is reached); in blocking mode it stays flat at ~1000 / (LLM_MS + TTS_MS) turns/s.
+Writes logs/bench-concurrency-*.json.
+
+  python -m app.utils.bench_concurrency
+  BENCH_MODE=blocking python -m app.utils.bench_concurrency
+"""
+from __future__ import annotations
+import asyncio, json, os, statistics, time, pathlib
+from typing import Any, Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-bench")  # LLMClient needs a key; no request is sent
+
+import httpx
+
+MODE = os.environ.get("BENCH_MODE", "async").lower()
+SESSIONS = [int(x) for x in os.environ.get("BENCH_SESSIONS", "1,2,4,8,16,32").split(",") if x.strip()]
+TURNS = int(os.environ.get("BENCH_TURNS", "4"))  # turns per session
+LLM_MS = float(os.environ.get("BENCH_LLM_MS", "200"))
+TTS_MS = float(os.environ.get("BENCH_TTS_MS", "0"))
+TEXT = os.environ.get("BENCH_TEXT", "I feel anxious lately. What can I do?")
+
+LOG_DIR = pathlib.Path("logs")
+
+
+class _SimLLM:
+    """Stands in for LLMClient: fixed latency, fixed answer."""
+
+    def __init__(self, blocking: bool):
+        self.blocking = blocking
+
+    def _result(self):
+        return "Try a slow 4-6 breath: inhale 4, exhale 6.", {"prompt_tokens": 120, "completion_tokens": 20, "total_tokens": 140}
+
+    def chat(self, **_: Any):
+        time.sleep(LLM_MS / 1000.0)
+        return self._result()
+
+    async def achat(self, **kw: Any):
+        if self.blocking:  # LLM + TTS time spent on the loop, as before
+            time.sleep((LLM_MS + TTS_MS) / 1000.0)
+            return self._result()
+        await asyncio.sleep(LLM_MS / 1000.0)
+        return self._result()
+
+
+def _sim_tts(text: str, **_: Any):
+    time.sleep(TTS_MS / 1000.0)
+    return {"tts_path": None, "duration_sec": None}
+
+
+def p95(xs: List[float]) -> float:
+    if not xs: return 0.0
+    xs_sorted = sorted(xs)
+    k = max(0, int(round(0.95 * (len(xs_sorted) - 1))))
+    return xs_sorted[k]
+
+
+async def _session(client: httpx.AsyncClient, sid: int, lat: List[float]) -> None:
+    for _ in range(TURNS):
+        t0 = time.perf_counter()
+        r = await client.post("/api/web/turn", json={"text": TEXT, "ui_lang": "en"},
+                              headers={"X-User-Id": f"bench-{sid}", "X-Plan": "Premium"})
+        r.raise_for_status()
+        lat.append((time.perf_counter() - t0) * 1000.0)
+
+
+async def _level(app, c: int) -> Dict[str, float]:
+    lat: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_session(client, s, lat) for s in range(c)))
+        wall = time.perf_counter() - t0
+    return {
+        "sessions": c,
+        "turns": len(lat),
+        "wall_s": round(wall, 3),
+        "throughput_tps": round(len(lat) / wall, 2),
+        "p50_ms": round(statistics.median(lat), 1),
+        "p95_ms": round(p95(lat), 1),
+    }
+
+
+def main() -> None:
+    from app.pipeline import turn
+    from app.api import server
+
+    turn.llm = _SimLLM(blocking=(MODE == "blocking"))
+    if TTS_MS > 0 and MODE != "blocking":
+        turn.tts_synth = _sim_tts
+    rows = [asyncio.run(_level(server.app, c)) for c in SESSIONS]
+
+    print(f"mode={MODE} llm_ms={LLM_MS:.0f} tts_ms={TTS_MS:.0f} turns/session={TURNS}")
+    print(f"{'sessions':>8} {'turns/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for r in rows:
+        print(f"{r['sessions']:>8} {r['throughput_tps']:>9.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    out = LOG_DIR / f"bench-concurrency-{MODE}-{int(time.time())}.json"
+    out.write_text(json.dumps({"mode": MODE, "llm_ms": LLM_MS, "tts_ms": TTS_MS, "rows": rows}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Local stand-in for the ElevenLabs TTS API (offline tests and benches of app/runtime/providers.py).
+
+POST /v1/text-to-speech/<voice>[/stream] answers 200 ms of silence after MOCK_DELAY_MS: raw
+s16le PCM for ?output_format=pcm_<rate>, else a WAV (MockProvider.mp3, when set, is sent instead).
+HTTP/1.1 keep-alive, one thread per connection. Behaviour can be changed while running:
+  POST /_mock   {"delay_ms": 50, "status": 503}   (status 0 = healthy)
+  GET  /_mock   counters: requests, connections, by path, in_flight peak
+
+  python -m app.utils.mock_provider --port 8765
+  SUKOON_ELEVENLABS_URL=http://127.0.0.1:8765 SUKOON_TTS_API_KEY=x SUKOON_TTS_UR_VOICEID=v ...
+"""
+from __future__ import annotations
+import argparse, io, json, os, threading, time, wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+def _wav(ms: int = 200) -> bytes:
+    bio = io.BytesIO()
+    with wave.open(bio, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * (16 * ms))
+    return bio.getvalue()
+
+
+class MockProvider(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, delay_ms: Optional[int] = None, status: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.delay_ms = int(os.getenv("MOCK_DELAY_MS", "0") if delay_ms is None else delay_ms)
+        self.status = status
+        self.lock = threading.Lock()
+        self.counts: Dict[str, Any] = {"requests": 0, "connections": 0, "paths": {}, "in_flight": 0, "peak": 0}
+        self.audio = _wav()
+        self.mp3: Optional[bytes] = None   # set to answer with MP3 instead of PCM/WAV
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "MockProvider":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server: MockProvider
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.counts["connections"] += 1
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _send(self, code: int, body: bytes, ctype: str) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, code: int, obj: Any) -> None:
+        self._send(code, json.dumps(obj).encode("utf-8"), "application/json")
+
+    def do_GET(self) -> None:
+        if self.path == "/_mock":
+            with self.server.lock:
+                return self._json(200, self.server.counts)
+        self._json(404, {"detail": "not found"})
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        srv = self.server
+        if self.path == "/_mock":
+            cfg = json.loads(body or b"{}")
+            srv.delay_ms = int(cfg.get("delay_ms", srv.delay_ms))
+            srv.status = int(cfg.get("status", srv.status))
+            return self._json(200, {"delay_ms": srv.delay_ms, "status": srv.status})
+        url = urlsplit(self.path)
+        if not url.path.startswith("/v1/text-to-speech/"):
+            return self._json(404, {"detail": "not found"})
+        fmt = (parse_qs(url.query).get("output_format") or [""])[0]
+        with srv.lock:
+            c = srv.counts
+            c["requests"] += 1
+            c["paths"][url.path] = c["paths"].get(url.path, 0) + 1
+            c["in_flight"] += 1
+            c["peak"] = max(c["peak"], c["in_flight"])
+        try:
+            time.sleep(srv.delay_ms / 1000)
+            if not self.headers.get("xi-api-key"):
+                return self._json(401, {"detail": "missing api key"})
+            if srv.status:
+                return self._json(srv.status, {"detail": "mock failure"})
+            if srv.mp3 is not None:
+                self._send(200, srv.mp3, "audio/mpeg")
+            elif fmt.startswith("pcm_"):
+                self._send(200, b"\x00\x00" * (int(fmt[4:]) // 5), "audio/pcm")
+            else:
+                self._send(200, srv.audio, "audio/wav")
+        finally:
+            with srv.lock:
+                c["in_flight"] -= 1
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Local mock of the ElevenLabs TTS API.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--delay-ms", type=int, default=None)
+    ap.add_argument("--status", type=int, default=0, help="answer every TTS call with this status (e.g. 503)")
+    args = ap.parse_args()
+    srv = MockProvider(args.port, args.delay_ms, args.status)
+    print(f"mock provider on {srv.url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,19 +1,263 @@
 """
-Early toggle for local ASR (whisper.cpp) — default OFF.
+Streaming ASR over faster-whisper: PCM frames in, partial and final hypotheses out.
 
-Env: VOICE_BACKEND_ASR={mock|whispercpp}, NO_NETWORK=1 required for local offline.
-This module is a stub for Week-2; returns mock partials unless explicitly toggled.
+Env: VOICE_BACKEND_ASR={mock|faster-whisper} (else configs/voice.yaml `asr_backend`).
+mock keeps the Week-2 passthrough (each chunk is already text; MockStreamingTranscriber is the
+push-based equivalent, used by /api/voice/ws when the backend is not faster-whisper).
+
+faster-whisper: frames follow configs/voice.yaml (16 kHz mono, 20 ms; s16le bytes or float
+arrays). The open segment is re-decoded on the shared STT replicas (app/audio/stt_service)
+every `partial_every_ms` of new audio, giving a partial hypothesis; an energy endpoint
+(`endpoint_silence_ms` of silence after speech, or `max_segment_ms`) closes the segment with a
+final hypothesis. `stable` is the word prefix two consecutive decodes agreed on.
+
+gated_stream() runs the request safety verdict on every hypothesis and stops at the first
+crisis, so the crisis handoff starts while the user is still speaking.
 """
+from __future__ import annotations
 import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+_CFG_PATH = "configs/voice.yaml"
+_DEFAULTS = {
+    "sample_rate_hz": 16000,
+    "frame_ms": 20,
+    "partial_every_ms": 500,
+    "endpoint_silence_ms": 600,
+    "max_segment_ms": 15000,
+    "speech_rms": 0.01,  # ~ -40 dBFS
+}
+
+
+def _cfg() -> Dict[str, Any]:
+    try:
+        import yaml
+        with open(_CFG_PATH, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
 
 def asr_backend_name() -> str:
-    return os.environ.get("VOICE_BACKEND_ASR", "mock")
+    return os.environ.get("VOICE_BACKEND_ASR") or str(_cfg().get("asr_backend") or "mock")
+
+
+def _common_prefix(a: List[str], b: List[str]) -> List[str]:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return a[:n]
+
+
+def _stt_transcribe(audio, language: Optional[str]) -> str:
+    from app.audio.stt_service import get_stt
+    return (get_stt().transcribe(audio, language=language).get("text") or "").strip()
+
+
+async def _stt_atranscribe(audio, language: Optional[str]) -> str:
+    from app.audio.stt_service import get_stt
+    return ((await get_stt().atranscribe(audio, language=language)).get("text") or "").strip()
+
+
+class StreamingTranscriber:
+    """
+    Push-based: push(frame) / flush() return the hypotheses that became due, as dicts
+    {"text", "stable", "final", "segment", "audio_ms"}. apush/aflush await the decode instead.
+    `transcribe(audio_f32, language) -> str` defaults to the shared STT service.
+    """
+
+    def __init__(self, language: Optional[str] = None, transcribe: Optional[Callable[..., str]] = None,
+                 atranscribe: Optional[Callable[..., Any]] = None, **overrides: Any):
+        import numpy as np
+        self._np = np
+        file_cfg = _cfg()
+        cfg = dict(_DEFAULTS)
+        cfg.update({k: v for k, v in file_cfg.items() if k in _DEFAULTS})
+        cfg.update(file_cfg.get("asr_stream") or {})
+        cfg.update(overrides)
+        self.rate = int(cfg["sample_rate_hz"])
+        self.frame_ms = int(cfg["frame_ms"])
+        self.partial_every = int(cfg["partial_every_ms"]) * self.rate // 1000
+        self.endpoint_silence = int(cfg["endpoint_silence_ms"]) * self.rate // 1000
+        self.max_segment = int(cfg["max_segment_ms"]) * self.rate // 1000
+        self.speech_rms = float(cfg["speech_rms"])
+        self.language = language
+        self._transcribe = transcribe or _stt_transcribe
+        self._atranscribe = atranscribe
+        self._chunks: List[Any] = []
+        self._n = 0               # samples in the open segment
+        self._since_decode = 0    # samples since the last partial decode
+        self._silence = 0         # trailing silent samples
+        self._speech = False
+        self._prev: List[str] = []
+        self._audio_ms = 0
+        self.segment = 0
+
+    # ---------- framing ----------
+    def _as_f32(self, frame):
+        np = self._np
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            return np.frombuffer(frame, dtype="<i2").astype("float32") / 32768.0
+        a = np.asarray(frame)
+        if a.dtype.kind in "iu":
+            return a.astype("float32") / 32768.0
+        return a.astype("float32", copy=False)
+
+    def _ingest(self, frame) -> Optional[str]:
+        """Buffer one frame; return 'final', 'partial' or None for the decode now due."""
+        np = self._np
+        a = self._as_f32(frame).reshape(-1)
+        if a.size == 0:
+            return None
+        self._audio_ms += a.size * 1000 // self.rate
+        loud = float(np.sqrt(np.mean(a * a))) >= self.speech_rms
+        if not self._speech and not loud:
+            return None  # leading silence is not part of a segment
+        self._speech = True
+        self._chunks.append(a)
+        self._n += a.size
+        self._since_decode += a.size
+        self._silence = 0 if loud else self._silence + a.size
+        if self._silence >= self.endpoint_silence or self._n >= self.max_segment:
+            return "final"
+        if self._since_decode >= self.partial_every:
+            return "partial"
+        return None
+
+    def _audio(self):
+        return self._np.concatenate(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+
+    def _emit(self, kind: str, text: str) -> Dict[str, Any]:
+        words = text.split()
+        final = kind == "final"
+        stable = words if final else _common_prefix(self._prev, words)
+        hyp = {"text": text, "stable": " ".join(stable), "final": final,
+               "segment": self.segment, "audio_ms": self._audio_ms}
+        if final:
+            self._chunks, self._n, self._silence, self._speech, self._prev = [], 0, 0, False, []
+            self.segment += 1
+        else:
+            self._prev = words
+        self._since_decode = 0
+        return hyp
+
+    # ---------- sync ----------
+    def push(self, frame) -> List[Dict[str, Any]]:
+        kind = self._ingest(frame)
+        if kind is None:
+            return []
+        return [self._emit(kind, self._transcribe(self._audio(), self.language))]
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Close the open segment (end of stream)."""
+        if not self._chunks:
+            return []
+        return [self._emit("final", self._transcribe(self._audio(), self.language))]
 
-def transcribe_stream(chunks):
-    if asr_backend_name() != "whispercpp":
+    # ---------- async ----------
+    async def _adecode(self) -> str:
+        if self._atranscribe is not None:
+            return await self._atranscribe(self._audio(), self.language)
+        if self._transcribe is _stt_transcribe:
+            return await _stt_atranscribe(self._audio(), self.language)
+        return self._transcribe(self._audio(), self.language)
+
+    async def apush(self, frame) -> List[Dict[str, Any]]:
+        kind = self._ingest(frame)
+        if kind is None:
+            return []
+        return [self._emit(kind, await self._adecode())]
+
+    async def aflush(self) -> List[Dict[str, Any]]:
+        if not self._chunks:
+            return []
+        return [self._emit("final", await self._adecode())]
+
+
+class MockStreamingTranscriber:
+    """
+    StreamingTranscriber interface for the mock backend: each frame is UTF-8 text, every frame
+    yields a partial of the text so far and flush() the final. No model, no STT service.
+    """
+
+    def __init__(self, language: Optional[str] = None, **_: Any):
+        self.language = language
+        self._words: List[str] = []
+        self.segment = 0
+
+    def _hyp(self, final: bool) -> Dict[str, Any]:
+        text = " ".join(self._words)
+        return {"text": text, "stable": text if final else "", "final": final,
+                "segment": self.segment, "audio_ms": 0}
+
+    def push(self, frame) -> List[Dict[str, Any]]:
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            frame = bytes(frame).decode("utf-8", errors="replace")
+        words = str(frame).split()
+        if not words:
+            return []
+        self._words += words
+        return [self._hyp(False)]
+
+    def flush(self) -> List[Dict[str, Any]]:
+        if not self._words:
+            return []
+        hyp = self._hyp(True)
+        self._words, self.segment = [], self.segment + 1
+        return [hyp]
+
+    async def apush(self, frame) -> List[Dict[str, Any]]:
+        return self.push(frame)
+
+    async def aflush(self) -> List[Dict[str, Any]]:
+        return self.flush()
+
+
+def is_whisper_backend() -> bool:
+    return asr_backend_name() in ("faster-whisper", "whisper")
+
+
+def transcribe_stream(chunks: Iterable[Any], language: Optional[str] = None, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+    if not is_whisper_backend():
         for c in chunks:
             yield {"text": c, "final": True}  # mock passthrough
         return
-    # Placeholder for whisper.cpp binding; implement in Week-3/5
-    for c in chunks:
-        yield {"text": c, "final": True}
+    st = StreamingTranscriber(language=language, **kwargs)
+    for frame in chunks:
+        yield from st.push(frame)
+    yield from st.flush()
+
+
+class PartialSafetyGate:
+    """
+    Safety verdict on the transcript so far (committed finals + the current hypothesis).
+    check(hyp) adds "safety" (SafetyVerdict.as_dict()) and, on crisis, "crisis": True.
+    Partials are not held back for stability: a false early crisis only costs a handoff.
+    """
+
+    def __init__(self, language: Optional[str] = None):
+        self.language = language
+        self.committed = ""
+        self.verdict = None
+
+    def check(self, hyp: Dict[str, Any]) -> Dict[str, Any]:
+        from app.safety.verdict import assess
+        full = (self.committed + " " + str(hyp.get("text") or "")).strip()
+        self.verdict = v = assess(full, language=self.language)
+        hyp["safety"] = v.as_dict()
+        if v.route == "crisis" or v.turn_crisis:
+            hyp["crisis"] = True
+        elif hyp.get("final"):
+            self.committed = full
+        return hyp
+
+
+def gated_stream(chunks: Iterable[Any], language: Optional[str] = None, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+    """transcribe_stream() through PartialSafetyGate; ends right after the first crisis hypothesis."""
+    gate = PartialSafetyGate(language)
+    for hyp in transcribe_stream(chunks, language=language, **kwargs):
+        yield gate.check(hyp)
+        if hyp.get("crisis"):
+            return
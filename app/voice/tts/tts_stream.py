@@ -1,16 +1,134 @@
 """
-Early toggle for local TTS (piper) — default OFF.
+Sentence-by-sentence TTS for streamed voice replies (/api/voice/ws).
 
-Env: VOICE_BACKEND_TTS={mock|piper}
-This is a Week-2 placeholder that preserves the TTS cache hook.
+Env: VOICE_BACKEND_TTS={mock|sapi|piper} (else configs/voice.yaml `tts_backend`).
+  mock   b"" (no audio; protocol/latency tests)
+  sapi   app.audio.tts.synth (pyttsx3/SAPI) → WAV bytes
+  piper  `piper --model $PIPER_MODEL --output_raw` → s16le at PIPER_SAMPLE_RATE (22050), as WAV
+Both go through the shared TTS cache (app/audio/tts/tts_cache.py), so repeated sentences are
+read back from disk instead of re-synthesized; nowait=True (crisis lines) returns cached audio
+or b"" at once and never waits on synthesis.
+
+synthesize(text) renders one piece of text; iter_synthesize(text) splits it with
+split_sentences() (Urdu ۔ ؟ and Latin . ! ?) and yields each sentence's WAV as soon as it is
+rendered, so playback starts after the first sentence instead of the whole answer.
+SentenceSegmenter does the same splitting incrementally over streamed LLM token deltas.
 """
-import os
+import os, re, shutil, subprocess
+from typing import Iterator, List, Tuple
+
+from app.audio.transcode import pcm_to_wav
 
 def tts_backend_name() -> str:
-    return os.environ.get("VOICE_BACKEND_TTS", "mock")
+    env = os.environ.get("VOICE_BACKEND_TTS")
+    if env:
+        return env
+    try:
+        import yaml
+        with open("configs/voice.yaml", "r", encoding="utf-8") as f:
+            return str((yaml.safe_load(f) or {}).get("tts_backend") or "mock")
+    except Exception:
+        return "mock"
+
+# ---- sentence splitting ----
+_ENDERS = ".!?۔؟"
+_END_RE = re.compile(r"[.!?۔؟]+[\"'”’)\]]*(?=\s|$)|\n+")
+_LISTNUM_RE = re.compile(r"(?:^|\s)\d{1,2}[.)]$")
+
+class SentenceSegmenter:
+    """
+    Incremental split_sentences(): push(delta) returns the sentences the new text completed.
+    A terminator only counts once text follows it (more '?!' or a closing quote may still
+    arrive); flush() closes the stream and returns the rest.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._start = 0   # start of the open sentence
+        self._pos = 0     # scan resumes here
+
+    def push(self, delta: str) -> List[str]:
+        self._buf += delta or ""
+        return self._take(final=False)
+
+    def flush(self) -> List[str]:
+        out = self._take(final=True)
+        tail = self._buf[self._start:].strip()
+        if tail.strip(_ENDERS + " "):
+            out.append(tail)
+        self._buf, self._start, self._pos = "", 0, 0
+        return out
+
+    def _take(self, final: bool) -> List[str]:
+        out: List[str] = []
+        buf = self._buf
+        for m in _END_RE.finditer(buf, self._pos):
+            if not final and m.end() >= len(buf):
+                break  # may still grow
+            self._pos = m.end()
+            if _LISTNUM_RE.search(buf[self._start:m.end()]):
+                continue
+            piece = buf[self._start:m.end()].strip()
+            if piece.strip(_ENDERS + " \n"):
+                out.append(piece)
+            self._start = m.end()
+        return out
 
-def synthesize(text: str):
-    if tts_backend_name() != "piper":
+
+def split_sentences(text: str) -> List[str]:
+    """Split after . ! ? ۔ ؟ (closing quotes kept) or newlines; '1.' style list numbers stay attached."""
+    seg = SentenceSegmenter()
+    return seg.push((text or "").strip()) + seg.flush()
+
+# ---- backends ----
+def _sapi(text: str, lang_hint: str, pinned: bool = False, nowait: bool = False) -> bytes:
+    from app.audio.tts import synth
+    out = synth(text, lang_hint=lang_hint, pinned=pinned, nowait=nowait) or {}
+    path = out.get("tts_path") if isinstance(out, dict) else out
+    if not path or not os.path.exists(path):
+        return b""
+    with open(path, "rb") as f:  # cached file: read, never delete
+        return f.read()
+
+def _piper(text: str, lang_hint: str, pinned: bool = False, nowait: bool = False) -> bytes:
+    from app.audio.tts.tts_cache import cache_enabled, get_cache
+    exe = shutil.which(os.environ.get("PIPER_BIN", "piper"))
+    model = os.environ.get("PIPER_MODEL_UR" if lang_hint == "ur" else "PIPER_MODEL_EN") or os.environ.get("PIPER_MODEL")
+    if not exe or not model:
+        return b""
+    rate = int(os.environ.get("PIPER_SAMPLE_RATE", "22050"))
+
+    def render() -> bytes:
+        res = subprocess.run([exe, "--model", model, "--output_raw"], input=text.encode("utf-8"),
+                             capture_output=True, timeout=30)
+        if res.returncode != 0 or not res.stdout:
+            return b""
+        return pcm_to_wav(res.stdout, rate)
+
+    if not cache_enabled():
+        return b"" if nowait else render()
+    path, _hit = get_cache().synth_cached(render, text, engine="piper", voice=model, rate=rate, lang=lang_hint,
+                                          nowait=nowait, pinned=pinned or nowait)
+    if not path:
+        return b""
+    with open(path, "rb") as f:
+        return f.read()
+
+def synthesize(text: str, lang_hint: str = "en", pinned: bool = False, nowait: bool = False) -> bytes:
+    """
+    WAV bytes for `text` (b"" when the backend is mock or unavailable). pinned: keep in the TTS
+    cache; nowait: cached audio or b"" (a miss is rendered in the background for next time).
+    """
+    backend = tts_backend_name()
+    if not (text or "").strip() or backend == "mock":
         return b""  # mock audio bytes
-    # Placeholder for piper synth; implement later; return WAV/PCM bytes
+    if backend == "sapi":
+        return _sapi(text, lang_hint, pinned, nowait)
+    if backend == "piper":
+        return _piper(text, lang_hint, pinned, nowait)
     return b""
+
+def iter_synthesize(text: str, lang_hint: str = "en") -> Iterator[Tuple[int, str, bytes]]:
+    """(index, sentence, wav) per sentence, each yielded as soon as it is rendered."""
+    for i, s in enumerate(split_sentences(text)):
+        yield i, s, synthesize(s, lang_hint=lang_hint)
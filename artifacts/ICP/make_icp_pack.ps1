@@ -38,7 +38,8 @@ if (Test-Path $AudioSrc) {
   Copy-Item -Recurse -Force -Path $AudioSrc -Destination (Join-Path $Stage 'artifacts\audio\tts') -ErrorAction SilentlyContinue
 }
 
-# 4) Try to include a representative last_turn.json (if exists)
+# 4) Try to include a representative last_turn.json (if exists; the server writes it when
+#    SUKOON_DEBUG_TURNS > 0 and SUKOON_DEBUG_PERSIST=1)
 $LastTurn = Join-Path $RepoRoot 'artifacts\ICP\last_turn.json'
 if (Test-Path $LastTurn) {
   Copy-Item -Force -Path $LastTurn -Destination (Join-Path $Stage 'artifacts\ICP\last_turn.json')
@@ -264,9 +264,8 @@
           // A2: canonical one-source text used for BOTH on-screen text and the audio caption
           const answer = canonicalAnswer(data);
 
-          // Prefer tts_url; fallback to /media/... from tts_path; cache-bust once if missing
-          let tts = data?.tts_url || toMediaUrl(data?.tts_path);
-          if (tts && !/\?v=/.test(tts)) tts += `?v=${Date.now()}`;
+          // Prefer tts_url (/api/audio/<key>: ETag-revalidated, no cache-buster); fallback to /media/... from tts_path
+          const tts = data?.tts_url || toMediaUrl(data?.tts_path);
 
           // Assistant parity line
           if (vOut) {
@@ -1,6 +1,9 @@
 ﻿import csv, json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from app.ops.cost_rollup import compact, cost_summary, load, percentiles
+
 plans = {
   "Free":     {"minutes": 15,  "price_pkr":    0, "turns":  50},
   "Standard": {"minutes": 75,  "price_pkr":  499, "turns": 200},
@@ -18,6 +21,7 @@ mix = [
 
 out_csv   = Path("artifacts/rap/cost_report.csv")
 out_json  = Path("artifacts/rap/plan_checks.json")
+out_obs   = Path("artifacts/rap/cost_observed.json")
 plans_yaml= Path("configs/plan_meter.yaml")
 
 rows = []
@@ -61,4 +65,17 @@ Premium:
     encoding="utf-8",
 )
 
-print("WROTE", out_csv, out_json, plans_yaml, sep="\n")
+# Observed cost/latency from the metering log (columnar rollups of costs_daily.csv, last 7 days)
+compact()
+cols = load(since=datetime.now(timezone.utc) - timedelta(days=7))
+observed = {
+  "window_days": 7,
+  "cost_by_plan": cost_summary(cols, by=("plan",)),
+  "cost_by_component": cost_summary(cols, by=("plan", "component")),
+  "assist_latency_ms": {f: percentiles(cols, f, by=("plan",), route="assist") for f in ("llm_ms", "tts_ms", "total_ms")},
+}
+out_obs.write_text(json.dumps(observed, indent=2, ensure_ascii=False), encoding="utf-8")
+for row in observed["cost_by_plan"]:
+  print(f"OBSERVED {row['plan']}: {row['pkr']} PKR over {row['events']} events")
+
+print("WROTE", out_csv, out_json, out_obs, plans_yaml, sep="\n")
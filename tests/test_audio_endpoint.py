@@ -0,0 +1,97 @@
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import audio
+from app.audio.tts import tts_cache
+from app.audio.tts.tts_cache import TTSCache
+
+DATA = bytes(range(256)) * 8   # 2048 bytes
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    cache = TTSCache(root=str(tmp_path / "c"))
+    monkeypatch.setattr(tts_cache, "_CACHE", cache)
+    monkeypatch.setattr(audio, "_HOT", audio.HotAudio(1 << 20))
+    monkeypatch.setattr(audio, "_N", dict.fromkeys(audio._N, 0))
+    path, _ = cache.synth_cached(lambda: DATA, "سانس لیں", engine="sapi", lang="ur", ext=".wav")
+    app = FastAPI()
+    app.include_router(audio.router)
+    return TestClient(app), cache, path
+
+
+def test_url_is_content_addressed_and_etag_is_the_audio_hash(served):
+    client, cache, path = served
+    url = audio.audio_url(path)
+    assert url == "/api/audio/" + os.path.basename(path) and "?" not in url
+    r = client.get(url)
+    assert r.status_code == 200 and r.content == DATA and r.headers["content-type"] == "audio/wav"
+    assert r.headers["etag"] == f'"{hashlib.sha256(DATA).hexdigest()}"'
+    assert r.headers["accept-ranges"] == "bytes" and "max-age" in r.headers["cache-control"]
+    assert audio.audio_url("artifacts/audio/tts/20250101/x.wav") == "/media/audio/tts/20250101/x.wav"
+
+
+def test_repeat_request_revalidates_to_304(served):
+    client, _, path = served
+    url = audio.audio_url(path)
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    os.remove(path)                                 # removed from the cache: not served from RAM either
+    assert client.get(url).status_code == 404
+    st = client.get("/api/audio/stats").json()
+    assert st["not_modified"] == 1 and st["disk_reads"] == 1
+
+
+def test_hot_entries_skip_the_disk(served):
+    client, _, path = served
+    url = audio.audio_url(path)
+    for _ in range(3):
+        assert client.get(url).content == DATA
+    st = client.get("/api/audio/stats").json()
+    assert st["disk_reads"] == 1 and st["hot_hits"] == 2 and st["hot"]["bytes"] == len(DATA)
+
+
+def test_range_requests(served):
+    client, _, path = served
+    url = audio.audio_url(path)
+    r = client.get(url, headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206 and r.content == DATA[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+    assert client.get(url, headers={"Range": "bytes=-48"}).content == DATA[-48:]
+    assert client.get(url, headers={"Range": "bytes=2000-"}).content == DATA[2000:]
+    bad = client.get(url, headers={"Range": "bytes=5000-"})
+    assert bad.status_code == 416 and bad.headers["content-range"] == f"bytes */{len(DATA)}"
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == DATA
+    head = client.head(url, headers={"Range": "bytes=0-9"})
+    assert head.status_code == 206 and head.headers["content-length"] == "10" and head.content == b""
+
+
+def test_unknown_names_are_404(served):
+    client, _, _ = served
+    assert client.get("/api/audio/" + "0" * 64 + ".wav").status_code == 404
+    assert client.get("/api/audio/..%2Findex.json").status_code == 404
+
+
+def test_byte_range_parsing():
+    assert audio.byte_range("bytes=0-", 10) == (0, 9)
+    assert audio.byte_range("bytes=5-100", 10) == (5, 9)
+    assert audio.byte_range("bytes=-100", 10) == (0, 9)
+    assert audio.byte_range("bytes=0-1,4-5", 10) is None      # multiple ranges: whole body
+    assert audio.byte_range("items=0-1", 10) is None
+    with pytest.raises(ValueError):
+        audio.byte_range("bytes=9-3", 10)
+
+
+def test_entry_stored_by_another_worker_is_served(served, tmp_path):
+    client, _, _ = served
+    other = TTSCache(root=str(tmp_path / "c"))      # a second process on the same directory
+    path, _ = other.synth_cached(lambda: DATA[::-1], "آہستہ سانس", engine="sapi", lang="ur", ext=".wav")
+    r = client.get("/api/audio/" + os.path.basename(path))
+    assert r.status_code == 200 and r.content == DATA[::-1]
+    assert tts_cache._CACHE.key_of(path) == os.path.basename(path)[:-4]
+    assert client.get("/api/audio/" + "0" * 64 + ".wav").status_code == 404
@@ -0,0 +1,77 @@
+import csv
+import multiprocessing
+import threading
+
+from app.ops import cost_meter
+from app.ops.cost_meter import CostMeter, CostWriter, close_cost_writers, get_cost_writer
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_events_are_buffered_and_written_in_one_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUKOON_COST_FLUSH_S", "60")
+    log = tmp_path / "ops" / "costs.csv"
+    meter = CostMeter(config_path=str(tmp_path / "none.yaml"), log_path=str(log))
+    for i in range(5):
+        meter.log_event("web", "per_message", metadata={"i": i})
+    meter.log_timings("assist", {"total_ms": 12.0})
+    assert not log.exists()                                   # nothing on the request path
+    meter.flush()
+    rows = _rows(log)
+    assert rows[0] == cost_meter.HEADER and len(rows) == 7 and rows[-1][1] == "timings"
+    assert get_cost_writer(str(log)).stats()["batches"] == 1
+    close_cost_writers()
+
+
+def test_size_threshold_wakes_the_writer(tmp_path):
+    w = CostWriter(str(tmp_path / "c.csv"), flush_rows=3, flush_s=60)
+    for i in range(3):
+        w.write(["t", "web", "per_message", 1, 0, 0, "standard", "{}"])
+    for _ in range(100):
+        if w.stats()["written"] == 3:
+            break
+        threading.Event().wait(0.02)
+    assert w.stats()["written"] == 3 and len(_rows(tmp_path / "c.csv")) == 4
+    w.close()
+
+
+def test_meters_share_one_writer_and_close_loses_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUKOON_COST_FLUSH_S", "60")
+    log = str(tmp_path / "costs.csv")
+    a, b = CostMeter(config_path="x", log_path=log), CostMeter(config_path="x", log_path=log)
+    threads = [threading.Thread(target=lambda m=m: [m.log_event("web", "per_message") for _ in range(200)])
+               for m in (a, b, a, b)]
+    [t.start() for t in threads]
+    [t.join() for t in threads]
+    close_cost_writers()
+    rows = _rows(log)
+    assert len(rows) == 801 and all(len(r) == 8 for r in rows)
+
+
+def test_full_buffer_is_flushed_by_the_caller(tmp_path):
+    w = CostWriter(str(tmp_path / "c.csv"), flush_rows=1000, flush_s=60, capacity=4)
+    for _ in range(4):
+        w.write(["t", "web", "per_message", 1, 0, 0, "standard", "{}"])
+    assert w.stats()["inline_flushes"] == 1 and w.stats()["pending"] == 0
+    w.close()
+
+
+def _worker(path, n):
+    meter = CostMeter(config_path="x", log_path=path)
+    for i in range(n):
+        meter.log_event("web", "per_message", metadata={"pad": "x" * 200, "i": i})
+    close_cost_writers()
+
+
+def test_worker_processes_do_not_interleave_rows(tmp_path):
+    log = str(tmp_path / "costs.csv")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker, args=(log, 300)) for _ in range(3)]
+    [p.start() for p in procs]
+    [p.join(60) for p in procs]
+    rows = _rows(log)
+    assert rows.count(cost_meter.HEADER) == 1
+    assert len(rows) == 901 and all(len(r) == 8 for r in rows)
@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+
+from app.ops import cost_rollup
+from app.ops.cost_meter import HEADER, CostMeter, close_cost_writers
+
+
+def _log(path, plan, n, monkeypatch):
+    monkeypatch.setenv("SUKOON_PLAN", plan)
+    meter = CostMeter(config_path="configs/costing.yaml", log_path=str(path))
+    for i in range(n):
+        meter.log_timings("assist", {"safety_ms": 1, "tts_ms": 100 + i, "total_ms": 500 + i})
+        meter.log_event("llm:gpt_4o_mini", "input_token", 100, metadata={"model": "gpt-4o-mini"})
+    meter.log_event("web", "per_message", metadata={"route": "crisis"})
+    meter.log_event("web", "per_message", metadata={"abstain": True})
+    close_cost_writers()
+
+
+def test_compaction_flattens_timings_into_typed_columns(tmp_path, monkeypatch):
+    csv_path, out = tmp_path / "costs.csv", tmp_path / "roll"
+    _log(csv_path, "standard", 10, monkeypatch)
+    res = cost_rollup.compact(str(csv_path), str(out))
+    assert res["rows"] == 22 and len(res["days"]) == 1
+    with np.load(next(out.glob("costs_*.npz")), allow_pickle=False) as z:
+        assert z["tts_ms"].dtype == np.float64 and z["plan"].dtype == np.int32
+        assert set(z["route__vocab"]) == {"", "assist", "crisis", "abstain"}
+    cols = cost_rollup.load(str(out))
+    assert np.isnan(cols["tts_ms"][cols["component"] == "web"]).all()
+
+
+def test_compaction_is_incremental_and_rebuilds_a_replaced_log(tmp_path, monkeypatch):
+    csv_path, out = tmp_path / "costs.csv", tmp_path / "roll"
+    _log(csv_path, "standard", 3, monkeypatch)
+    cost_rollup.compact(str(csv_path), str(out))
+    _log(csv_path, "premium", 2, monkeypatch)
+    with csv_path.open("a", encoding="utf-8") as f:
+        f.write("2025-01-01T00:00:00+00:00,web,per_message")          # row still being written
+    assert cost_rollup.compact(str(csv_path), str(out))["rows"] == 6
+    assert len(cost_rollup.load(str(out))["ts"]) == 14
+
+    csv_path.write_text(",".join(HEADER) + "\n", encoding="utf-8")   # rotated
+    _log(csv_path, "free", 1, monkeypatch)
+    cost_rollup.compact(str(csv_path), str(out))
+    assert set(cost_rollup.load(str(out))["plan"]) == {"free"}
+
+
+def test_percentiles_and_costs_per_plan(tmp_path, monkeypatch):
+    csv_path, out = tmp_path / "costs.csv", tmp_path / "roll"
+    _log(csv_path, "standard", 20, monkeypatch)
+    _log(csv_path, "premium", 5, monkeypatch)
+    cost_rollup.compact(str(csv_path), str(out))
+    cols = cost_rollup.load(str(out))
+    rows = {r["plan"]: r for r in cost_rollup.percentiles(cols, "tts_ms", by=["plan"], route="assist")}
+    assert rows["standard"]["n"] == 20 and rows["standard"]["p50"] == np.percentile(range(100, 120), 50)
+    assert rows["premium"]["p95"] == np.percentile(range(100, 105), 95)
+    costs = {(r["plan"], r["component"]): r for r in cost_rollup.cost_summary(cols, by=["plan", "component"])}
+    assert costs[("premium", "llm:gpt_4o_mini")]["units"] == 500
+    assert costs[("standard", "web")]["events"] == 2
+
+
+def test_cli_queries_compact_first(tmp_path, monkeypatch, capsys):
+    csv_path, out = tmp_path / "costs.csv", tmp_path / "roll"
+    _log(csv_path, "standard", 4, monkeypatch)
+    argv = ["--csv", str(csv_path), "--out", str(out)]
+    assert cost_rollup.main(argv + ["pct", "--field", "total_ms", "--route", "assist", "--json"]) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert rows == [{"plan": "standard", "n": 4, "p50": 501.5, "p95": 502.85, "p99": 502.97}]
+    assert cost_rollup.main(argv + ["cost", "--by", "route", "--days", "0"]) == 0
+    assert "crisis" in capsys.readouterr().out
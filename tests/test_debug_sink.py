@@ -0,0 +1,58 @@
+import importlib
+import json
+
+from fastapi.testclient import TestClient
+
+from app.ops import debug_sink
+from app.ops.debug_sink import DebugSink
+
+
+def test_off_by_default_and_nothing_is_written(monkeypatch, tmp_path):
+    monkeypatch.delenv("SUKOON_DEBUG_TURNS", raising=False)
+    monkeypatch.setattr(debug_sink, "_SINK", None)
+    sink = debug_sink.get_debug_sink()
+    assert not sink.enabled and sink.record({"route": "assist"}) is False and sink.recent() == []
+
+
+def test_ring_keeps_the_last_n_snapshots(tmp_path):
+    sink = DebugSink(capacity=3)
+    turn = {"route": "assist", "warnings": []}
+    for i in range(5):
+        turn["i"] = i
+        sink.record(turn)
+    turn["warnings"].append("mutated later")
+    assert [e["turn"]["i"] for e in sink.recent()] == [4, 3, 2]
+    assert sink.recent(1)[0]["turn"]["warnings"] == []              # a snapshot, not the live dict
+    assert DebugSink(capacity=3, sample=0.0).record(turn) is False
+
+
+def test_persistence_is_async_and_coalesced(tmp_path):
+    path = tmp_path / "icp" / "last_turn.json"
+    sink = DebugSink(capacity=10, persist=str(path))
+    for i in range(50):
+        sink.record({"route": "assist", "i": i})
+    sink.close()
+    assert json.loads(path.read_text(encoding="utf-8"))["i"] == 49
+    st = sink.stats()
+    assert st["captured"] == 50 and st["written"] + st["coalesced"] == 50 and st["written"] >= 1
+    assert list(path.parent.iterdir()) == [path]                       # no temp files left
+
+
+def test_web_turn_feeds_the_debug_endpoint(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)
+    server = importlib.import_module("app.api.server")
+
+    async def fake_turn(text, verdict=None, **kw):
+        return {"route": "assist", "abstain": False, "answer": "Take a slow breath.", "metrics": {}}
+
+    monkeypatch.setattr(server, "arun_turn", fake_turn)
+    monkeypatch.setattr(server, "GRAPH_ON", False)
+    monkeypatch.setattr(debug_sink, "_SINK", DebugSink(capacity=5))
+    client = TestClient(server.app)
+    assert client.post("/api/web/turn", json={"text": "hello there", "ui_lang": "en"}).status_code == 200
+    r = client.get("/api/debug/turns?n=1").json()
+    assert r["stats"]["captured"] == 1 and r["turns"][0]["turn"]["route"] == "assist"
+    assert not (tmp_path / "artifacts" / "ICP" / "last_turn.json").exists()
+    monkeypatch.setattr(debug_sink, "_SINK", DebugSink())
+    assert client.get("/api/debug/turns").status_code == 404
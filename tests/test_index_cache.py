@@ -0,0 +1,157 @@
+from app.retrieval import indexer
+from app.retrieval.schema import EvidenceRecord
+
+
+def _rec(i: int, text: str) -> EvidenceRecord:
+    return EvidenceRecord(
+        evidence_id=f"t:{i:03d}", doc_id="t", text=text, tokens_estimate=len(text) // 4,
+        topic="anxiety", ctype="psychoeducation", license="test", source_path="tests",
+        cited_as="Test", hash=f"h{i}",
+    )
+
+
+def test_index_loaded_once_and_reloaded_on_rebuild(tmp_path):
+    out = str(tmp_path / "idx")
+    indexer.build_index([_rec(1, "alpha"), _rec(2, "beta")], out_dir=out)
+
+    hits = indexer.search("alpha", k=2, index_dir=out)
+    assert hits[0]["evidence_id"] == "t:001" and hits[0]["similarity"] > 0.99
+    h1 = indexer.load_index(out)
+    indexer.search("beta", k=1, index_dir=out)
+    assert indexer.load_index(out) is h1
+
+    indexer.build_index([_rec(1, "alpha"), _rec(2, "beta"), _rec(3, "gamma")], out_dir=out)
+    h2 = indexer.load_index(out)
+    assert h2 is not h1 and len(h2.metas) == 3
+    assert indexer.search("gamma", k=1, index_dir=out)[0]["evidence_id"] == "t:003"
+
+
+def test_v2_store_is_memmapped_and_v1_pickles_still_load(tmp_path):
+    import json, pickle
+    import numpy as np
+
+    out = tmp_path / "v2"
+    indexer.build_index([_rec(1, "alpha"), _rec(2, "beta")], out_dir=str(out))
+    man = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    assert man["format_version"] == 2 and man["dtype"] == "float32"
+    h = indexer.load_index(str(out))
+    if h.faiss_idx is None:
+        X, = h.Xs
+        assert isinstance(X, np.memmap) and X.dtype == np.float32 and X.shape == (2, 384)
+    assert h.metas[1]["evidence_id"] == "t:002"
+
+    # Legacy (format 1): meta.pkl + vectors.pkl, manifest without format_version
+    old = tmp_path / "v1"
+    old.mkdir()
+    metas = [r.model_dump() for r in (_rec(1, "alpha"), _rec(2, "beta"))]
+    (old / "meta.pkl").write_bytes(pickle.dumps(metas))
+    (old / "vectors.pkl").write_bytes(pickle.dumps([indexer.embed("alpha"), indexer.embed("beta")]))
+    (old / "manifest.json").write_text(json.dumps({"backend": "python", "count": 2}), encoding="utf-8")
+    assert indexer.search("beta", k=1, index_dir=str(old))[0]["evidence_id"] == "t:002"
+
+
+def test_search_many_matches_single_query_search(tmp_path):
+    out = str(tmp_path / "idx")
+    indexer.build_index([_rec(i, t) for i, t in enumerate(["alpha beta", "beta gamma", "gamma delta", "delta"])], out_dir=out)
+    queries = ["beta", "delta", "alpha gamma"]
+    batched = indexer.search_many(queries, k=3, index_dir=out)
+    for q, hits in zip(queries, batched):
+        single = indexer.search(q, k=3, index_dir=out)
+        assert [h["evidence_id"] for h in hits] == [h["evidence_id"] for h in single]
+        assert all(abs(a["similarity"] - b["similarity"]) < 1e-5 for a, b in zip(hits, single))
+    assert indexer.search_many([], index_dir=out) == []
+
+
+def test_reingest_only_embeds_new_or_changed_chunks(tmp_path):
+    out = str(tmp_path / "idx")
+    recs = [_rec(1, "alpha"), _rec(2, "beta")]
+    first = indexer.build_index(recs, out_dir=out)
+    assert first["embedded"] == "2"
+    assert (tmp_path / "idx" / "embed_cache" / "hash-384.npz").exists()
+
+    changed = _rec(2, "beta v2").model_copy(update={"hash": "h2b"})
+    again = indexer.build_index([recs[0], changed, _rec(3, "gamma")], out_dir=out)
+    assert again["embedded"] == "2" and again["embed_cache_hits"] == "1"
+    hits = indexer.search("beta v2", k=1, index_dir=out)
+    assert hits[0]["evidence_id"] == "t:002" and hits[0]["similarity"] > 0.99
+
+
+def test_incremental_update_appends_tombstones_and_compacts(tmp_path):
+    out = str(tmp_path / "idx")
+    recs = [_rec(i, f"chunk {i}") for i in range(10)]
+    indexer.build_index(recs, out_dir=out)
+
+    assert indexer.update_index(recs, out_dir=out, scope_doc_ids=["t"])["added"] == "0"
+
+    changed = _rec(3, "chunk 3 revised").model_copy(update={"hash": "h3b"})
+    new = recs[:3] + [changed] + recs[4:9] + [_rec(10, "chunk 10")]  # t:009 removed
+    res = indexer.update_index(new, out_dir=out, scope_doc_ids=["t"])
+    assert (res["added"], res["removed"], res["embedded"], res["compacted"]) == ("2", "2", "2", "0")
+
+    h = indexer.load_index(out)
+    assert len(h.metas) == 12 and h.dead.tolist() == [3, 9]
+    ids = {x["evidence_id"] for x in indexer.search("chunk 3 revised", k=20, index_dir=out)}
+    assert ids == {f"t:{i:03d}" for i in range(11) if i != 9}
+    assert indexer.search("chunk 3 revised", k=1, index_dir=out)[0]["text"] == "chunk 3 revised"
+
+    # Dropping most rows crosses compact_ratio: rewritten from the embedding cache, no re-embed
+    res = indexer.update_index(new[:4], out_dir=out, scope_doc_ids=["t"])
+    assert res["compacted"] == "1" and res["embedded"] == "0"
+    h = indexer.load_index(out)
+    assert len(h.metas) == 4 and h.dead.size == 0
+    assert not list((tmp_path / "idx").glob("seg-*"))
+
+
+def test_rebuild_never_rewrites_files_a_loaded_handle_maps(tmp_path):
+    out = str(tmp_path / "idx")
+    indexer.build_index([_rec(i, f"chunk {i}") for i in range(200)], out_dir=out)
+    h = indexer.load_index(out)
+    before = {p.name: p.stat().st_ino for p in (tmp_path / "idx").iterdir() if p.is_file()}
+
+    indexer.build_index([], out_dir=out)
+    # The old handle still reads its own generation (no truncated mapping → no SIGBUS)
+    assert h.metas[199]["evidence_id"] == "t:199"
+    if h.Xs:
+        assert float(h.row(199) @ h.row(199)) > 0.99
+    after = {p.name: p.stat().st_ino for p in (tmp_path / "idx").iterdir() if p.is_file()}
+    assert not any(after.get(n) == ino for n, ino in before.items() if indexer._DATA_RE.match(n))
+    assert indexer.load_index(out).metas is not h.metas and len(indexer.load_index(out).metas) == 0
+
+
+def test_incremental_update_and_compaction_leave_loaded_handles_intact(tmp_path):
+    out = str(tmp_path / "idx")
+    recs = [_rec(i, f"chunk {i}") for i in range(20)]
+    indexer.build_index(recs, out_dir=out)
+    indexer.update_index(recs[:19] + [_rec(20, "chunk 20")], out_dir=out, scope_doc_ids=["t"])
+    h = indexer.load_index(out)
+    assert len(h.metas) == 21 and h.dead.tolist() == [19]
+
+    indexer.update_index(recs[:18] + [_rec(21, "chunk 21")], out_dir=out, scope_doc_ids=["t"])
+    assert h.metas[20]["evidence_id"] == "t:020" and h.dead.tolist() == [19]
+    indexer.update_index(recs[:2], out_dir=out, scope_doc_ids=["t"])   # compacts
+    assert h.metas[20]["evidence_id"] == "t:020"
+    if h.Xs:
+        assert float(h.row(20) @ h.row(20)) > 0.99
+    assert len(indexer.load_index(out).metas) == 2
+    assert not list((tmp_path / "idx").glob("seg-*")) and not list((tmp_path / "idx").glob("tombstones*"))
+
+
+def test_segments_stay_memmapped_and_merge_to_the_global_top_k(tmp_path):
+    import numpy as np
+
+    out = str(tmp_path / "idx")
+    recs = [_rec(i, f"chunk {i} topic {i % 7}") for i in range(60)]
+    indexer.build_index(recs, out_dir=out)
+    indexer.update_index(recs[:50] + [_rec(i, f"chunk {i} topic {i % 5}") for i in range(60, 80)],
+                         out_dir=out, scope_doc_ids=["t"])
+    h = indexer.load_index(out)
+    if h.faiss_idx is not None:
+        return
+    assert len(h.Xs) == 2 and all(isinstance(X, np.memmap) for X in h.Xs)
+
+    q = "chunk topic 3"
+    S = np.concatenate(h.Xs) @ np.asarray(h.embedder.embed_batch([q]), dtype="float32")[0]
+    S[h.dead] = -np.inf
+    want = [h.metas[int(i)]["evidence_id"] for i in np.argsort(-S, kind="stable")[:8]]
+    got = [x["evidence_id"] for x in indexer.search(q, k=8, index_dir=out)]
+    assert sorted(got) == sorted(want) and not {x for x in got if int(x[2:]) in range(50, 60)}
@@ -0,0 +1,35 @@
+import json, os
+from app.retrieval import mini
+
+
+def test_retrieve_scores_shared_tokens_and_hot_reloads(tmp_path, monkeypatch):
+    kb = tmp_path / "kb_ur.json"
+    kb.write_text(json.dumps([
+        {"id": "a", "title": "گہری سانس", "body": "سانس آہستہ لیں"},
+        {"id": "b", "title": "پانی پینا", "body": "ایک گلاس پانی"},
+    ], ensure_ascii=False), encoding="utf-8")
+    monkeypatch.setattr(mini, "KB_PATH", str(kb))
+    monkeypatch.setattr(mini, "_KB", None)
+
+    assert [r["id"] for r in mini.retrieve("سانس")] == ["a"]
+    assert mini.retrieve("diabetes") == []
+
+    kb.write_text(json.dumps([{"id": "c", "title": "نیند", "body": "سانس اور نیند"}], ensure_ascii=False), encoding="utf-8")
+    st = os.stat(kb)
+    os.utime(kb, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert [r["id"] for r in mini.retrieve("سانس")] == ["c"]
+
+
+def test_reload_of_a_half_written_kb_keeps_the_previous_one(tmp_path, monkeypatch):
+    kb = tmp_path / "kb_ur.json"
+    good = json.dumps([{"id": "a", "title": "گہری سانس", "body": "سانس آہستہ لیں"}], ensure_ascii=False)
+    kb.write_text(good, encoding="utf-8")
+    monkeypatch.setattr(mini, "KB_PATH", str(kb))
+    monkeypatch.setattr(mini, "_KB", None)
+    assert [r["id"] for r in mini.retrieve("سانس")] == ["a"]
+
+    kb.write_text(good[: len(good) // 2], encoding="utf-8")   # caught mid-save
+    st = os.stat(kb)
+    os.utime(kb, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert [r["id"] for r in mini.retrieve("سانس")] == ["a"]
+    assert kb.read_text(encoding="utf-8") == good[: len(good) // 2]   # not replaced by the seed
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.metrics import router
+from app.ops import metrics as ops_metrics
+from app.ops.cost_meter import CostMeter, close_cost_writers
+from app.ops.metrics import LogHistogram, Metrics, RollingHistogram
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    m = Metrics(window_s=300)
+    monkeypatch.setattr(ops_metrics, "_METRICS", m)
+    app = FastAPI()
+    app.include_router(router)
+    return m, TestClient(app)
+
+
+def test_quantiles_are_within_the_configured_precision():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1) for _ in range(20000)]
+    h = LogHistogram(precision=0.01)
+    for v in values:
+        h.add(v)
+    exact = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        want = exact[int(q * (len(exact) - 1))]
+        assert abs(h.quantile(q) - want) / want <= 0.011
+    assert len(h.buckets) < 1000 and h.count == 20000
+
+
+def test_rolling_window_forgets_old_slots_but_keeps_lifetime_counts():
+    h = RollingHistogram(window_s=60, slots=6)
+    h.add(1000, now=0)
+    h.add(10, now=100)
+    win = h.window(now=100)
+    assert win.count == 1 and win.max == 10
+    assert h.count == 2 and h.sum == 1010
+
+
+def test_turns_costs_and_caches_in_json(fresh, tmp_path):
+    m, client = fresh
+    for ms in (100, 200, 300):
+        m.record_turn({"route": "assist", "metrics": {"safety_ms": 1, "llm_ms": ms, "tts_ms": 0, "total_ms": ms + 5}})
+    m.record_turn({"route": "crisis", "metrics": {"safety_ms": 2, "tts_ms": 3, "total_ms": 5}})
+    m.observe("stt", 420.0)
+    meter = CostMeter(config_path="configs/costing.yaml", log_path=str(tmp_path / "c.csv"))
+    meter.log_event("llm:gpt_4o_mini", "input_token", 1000)
+    meter.log_event("web", "per_message")
+    close_cost_writers()
+
+    snap = client.get("/api/ops/metrics").json()
+    assist = snap["routes"]["assist"]
+    assert assist["turns"] == 3 and assist["stages"]["llm"]["count"] == 3
+    assert assist["stages"]["llm"]["p50"] == pytest.approx(200, rel=0.01)
+    assert snap["routes"]["all"]["turns"] == 4 and snap["routes"]["all"]["stages"]["safety"]["count"] == 4
+    assert snap["routes"]["all"]["stages"]["stt"]["p99"] == pytest.approx(420, rel=0.01)
+    plan = snap["cost"]["standard"]
+    assert plan["events"] == 2 and set(plan["by_component"]) == {"llm:gpt_4o_mini", "web"}
+    assert isinstance(snap["caches"], dict)
+
+
+def test_prometheus_text(fresh):
+    m, client = fresh
+    m.record_turn({"route": "abstain", "metrics": {"total_ms": 12}})
+    m.add_cost("pro", "web", 0.5)
+    r = client.get("/api/ops/metrics", headers={"Accept": "text/plain;version=0.0.4"})
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert '# TYPE sukoon_latency_ms summary' in body
+    assert 'sukoon_latency_ms{route="abstain",stage="total",quantile="0.99"} 12' in body
+    assert 'sukoon_latency_ms_count{route="abstain",stage="total"} 1' in body
+    assert 'sukoon_turns_total{route="abstain"} 1' in body
+    assert 'sukoon_cost_pkr_total{plan="pro",component="web"} 0.5' in body
+    assert client.get("/api/ops/metrics?format=prometheus").text == body
+
+
+def test_run_turn_feeds_the_aggregates(fresh, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import importlib
+    turn = importlib.import_module("app.pipeline.turn")
+    m, _ = fresh
+    resp = turn.run_turn("مجھے خود کو نقصان پہنچانے کے خیالات آ رہے ہیں", tts=False)
+    assert resp["route"] == "crisis"
+    assert m.snapshot()["routes"]["crisis"]["turns"] == 1
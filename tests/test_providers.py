@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+import wave
+
+import httpx
+import openai
+import pytest
+
+from app.audio.tts import tts_elevenlabs
+from app.runtime import providers
+from app.runtime.providers import CircuitBreaker, ProviderClient, ProviderUnavailable
+from app.utils.mock_provider import MockProvider
+
+
+@pytest.fixture
+def mock(tmp_path, monkeypatch):
+    srv = MockProvider(delay_ms=100).start()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(providers, "_PROVIDERS", {})
+    monkeypatch.setenv("SUKOON_ELEVENLABS_URL", srv.url)
+    monkeypatch.setenv("SUKOON_ELEVENLABS_BREAKER_FAILS", "2")
+    monkeypatch.setenv("SUKOON_ELEVENLABS_BREAKER_OPEN_S", "0.3")
+    monkeypatch.setenv("SUKOON_TTS_API_KEY", "k")
+    monkeypatch.setenv("SUKOON_TTS_UR_VOICEID", "v-ur")
+    monkeypatch.setenv("SUKOON_TTS_EN_VOICEID", "v-en")
+    yield srv
+    srv.stop()
+
+
+def test_identical_concurrent_texts_make_one_call_over_kept_alive_connections(mock):
+    async def go():
+        same = await asyncio.gather(*(tts_elevenlabs.render("سانس لیں", "ur") for _ in range(5)))
+        seq = [await tts_elevenlabs.render(f"line {i}", "en") for i in range(3)]
+        return same, seq
+
+    same, seq = asyncio.run(go())
+    assert len(set(same)) == 1 and same[0].endswith(".wav") and all(seq)
+    assert mock.counts["requests"] == 4 and mock.counts["connections"] == 1
+    st = providers.get_provider("elevenlabs").stats()
+    assert st["coalesced"] == 4 and st["calls"] == 4
+
+
+def test_breaker_opens_on_provider_failures_and_recovers(mock):
+    mock.status = 503
+
+    async def go():
+        outs = [await tts_elevenlabs.render(f"t{i}", "en") for i in range(4)]
+        t0 = time.perf_counter()
+        fast = await tts_elevenlabs.render("t5", "en")
+        return outs + [fast], time.perf_counter() - t0
+
+    outs, fast_s = asyncio.run(go())
+    assert outs == [None] * 5 and fast_s < 0.05
+    assert mock.counts["requests"] == 2                     # no /stream retry on 5xx, then short-circuited
+    assert providers.get_provider("elevenlabs").breaker.state == "open"
+
+    mock.status = 0
+    time.sleep(0.35)
+    assert asyncio.run(tts_elevenlabs.render("back", "en"))  # half-open probe succeeds
+    assert providers.get_provider("elevenlabs").breaker.state == "closed"
+
+
+def test_concurrency_is_bounded(mock):
+    client = ProviderClient("t", base_url=mock.url, max_conn=8, max_inflight=2)
+
+    async def go():
+        await asyncio.gather(*(client.request("POST", f"/v1/text-to-speech/v{i}", headers={"xi-api-key": "k"})
+                               for i in range(6)))
+        await client.aclose()
+
+    asyncio.run(go())
+    assert mock.counts["peak"] == 2 and mock.counts["requests"] == 6
+
+
+def test_llm_calls_fail_fast_while_openai_circuit_is_open(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(providers, "_PROVIDERS", {})
+    from app.llm.openai_client import LLMClient
+    llm = LLMClient()
+    calls = []
+
+    def down(**kw):
+        calls.append(kw)
+        raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+
+    monkeypatch.setattr(llm.client.chat.completions, "create", down)
+    for _ in range(3):
+        with pytest.raises(openai.APIConnectionError):
+            llm.chat("sys", "hi")
+    with pytest.raises(ProviderUnavailable):
+        llm.chat("sys", "hi")
+    assert len(calls) == 3
+
+
+def test_breaker_half_open_allows_a_single_probe():
+    br = CircuitBreaker("x", fails=1, open_s=0.0)
+    br.failure()
+    assert br.allow() and not br.allow()
+    br.failure()                                           # probe failed: open again
+    assert br.stats()["opened"] == 2
+
+
+def test_pcm_is_wrapped_in_memory_and_written_once(mock, tmp_path):
+    timings = {}
+    path = asyncio.run(tts_elevenlabs.render("hello", "en", timings))
+    assert path.endswith(".wav") and mock.counts["paths"] == {"/v1/text-to-speech/v-en": 1}
+    with wave.open(path, "rb") as w:
+        assert (w.getframerate(), w.getnchannels(), w.getnframes()) == (22050, 1, 22050 // 5)   # 200 ms
+    assert timings["tts_format"] == "pcm" and timings["tts_bytes_written"] == os.path.getsize(path)
+    assert timings["tts_transcode_ms"] >= 0
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]   # no MP3 / temp file left
+
+
+def test_mp3_answer_is_decoded_in_process(mock, monkeypatch):
+    from app.audio import transcode
+    mock.mp3 = b"ID3" + b"\x00" * 600
+    monkeypatch.setattr(transcode, "mp3_to_wav", lambda data, rate: (transcode.pcm_to_wav(b"\x00\x00" * 300, rate), "test"))
+    timings = {}
+    path = asyncio.run(tts_elevenlabs.render("hi", "ur", timings))
+    assert path.endswith(".wav") and timings["tts_format"] == "mp3:test"
+
+
+def test_cancelled_probe_neither_closes_nor_reopens_the_circuit():
+    br = CircuitBreaker("t", fails=1, open_s=0.05)
+    br.failure()
+    time.sleep(0.06)
+
+    class _Hang:
+        async def request(self, *a, **kw):
+            await asyncio.sleep(10)
+
+    async def go():
+        client = ProviderClient("t", breaker=br)
+        client.client()
+        probe = br.admit()
+        assert probe is True
+        task = asyncio.ensure_future(client._send(_Hang(), "GET", "/", probe))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(go())
+    st = br.stats()
+    assert st["state"] == "half_open" and st["consecutive_failures"] == 1
+    assert br.allow()                                        # the probe slot is free again
@@ -0,0 +1,36 @@
+import json
+from app.rag.retriever import BM25Index, load_corpus, retriever
+
+
+def _write(path, rows):
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows) + "\n", encoding="utf-8")
+
+
+def test_bm25_ranks_by_term_overlap_and_caps_sources(tmp_path):
+    _write(tmp_path / "curated.jsonl", [
+        {"evidence_id": "gad7:001", "doc_id": "gad7", "cited_as": "GAD-7", "text": "anxiety worry screening questionnaire"},
+        {"evidence_id": "phq9:001", "doc_id": "phq9", "cited_as": "PHQ-9", "text": "depression mood screening questionnaire"},
+    ])
+    _write(tmp_path / "open.jsonl", [
+        {"id": "who:1", "source_key": "who", "title": "Breathing", "text": "slow breathing helps anxiety and panic"},
+        {"id": "who:2", "source_key": "who", "title": "Breathing 2", "text": "box breathing for anxiety anxiety"},
+    ])
+    idx = BM25Index(load_corpus([str(tmp_path / "*.jsonl")]))
+    assert len(idx) == 4
+
+    hits = idx.search("anxiety breathing", top_k=3, per_source_cap=1)
+    assert [h["source"] for h in hits] == ["who", "gad7"]
+    assert set(hits[0]) == {"id", "source", "title", "score", "snippet"}
+    assert hits[0]["score"] >= hits[1]["score"] > 0
+
+    uncapped = idx.search("anxiety breathing", top_k=3)
+    assert [h["source"] for h in uncapped].count("who") == 2
+
+    assert idx.search("diabetes") == []
+    assert [h["id"] for h in idx.search("anxiety", top_k=10, min_chars=38)] == ["who:1"]
+
+
+def test_retriever_uses_cfg_globs(tmp_path):
+    _write(tmp_path / "c.jsonl", [{"evidence_id": "x:1", "doc_id": "x", "text": "گہری سانس لیں"}])
+    hits = retriever("سانس", {"corpus_globs": [str(tmp_path / "*.jsonl")], "min_chars": 0, "top_k": 3})
+    assert hits and hits[0]["id"] == "x:1"
@@ -0,0 +1,59 @@
+import json
+import re
+from app.policies.term_gates import _CRISIS, _FIN, detect_route
+from app.safety.matcher import AhoCorasick, MATCHER, SafetyMatcher, _tokenize, regex_anchors
+from app.safety.router import SafetyRouter
+
+
+def _term_hits(text_low, terms):
+    """The gates' original per-term scan: every word of the term occurs as a token, in order."""
+    toks, hits = _tokenize(text_low), []
+    for term in terms:
+        words, i = _tokenize(term), 0
+        for w in words:
+            if w not in toks[i:]:
+                break
+            i = toks.index(w, i) + 1
+        else:
+            if words:
+                hits.append(term)
+    return hits
+
+
+def test_aho_corasick_finds_overlapping_terms_in_one_pass():
+    ac = AhoCorasick(["he", "she", "his", "hers", "buy", "buy now"])
+    assert ac.findall("ushers buy now") == {"he", "she", "hers", "buy", "buy now"}
+    assert ac.findall("nothing here!") == {"he"}
+    assert ac.findall("") == set()
+
+
+def test_regex_anchors_respect_ignorecase_folding():
+    rx = re.compile(r"(suicide|kill\s*myself|خود\s*کو\s*تکلیف)", re.I)
+    assert regex_anchors(rx) == frozenset({"suicide", "myself", "تکلیف"})
+    assert regex_anchors(re.compile(r"\w+")) is None
+
+    m = SafetyMatcher()
+    m.add_regex("rx", rx)
+    for text in ("SUICIDE", "ſuicide", "kİll MYSELF", "خود کو تکلیف", "all good"):
+        got, want = m.scan(text).search("rx"), rx.search(text)
+        assert (got and got.span()) == (want and want.span())
+
+
+def test_shared_matcher_matches_the_original_checks():
+    lines = []
+    with open("app/eval/redteam/crisis_templates.jsonl", encoding="utf-8-sig") as f:
+        lines += [json.loads(l)["input"] for l in f if l.strip()]
+    lines += ["Which stock should I buy now?", "box breathing please", "what is sukoonai", "", "tips for sure shot coin"]
+    router = SafetyRouter()
+    for text in lines:
+        low = text.lower()
+        sc = MATCHER.scan(text)
+        assert sc.token_terms("gate.crisis_file") == _term_hits(low, _CRISIS)
+        assert sc.token_terms("gate.finance_file") == _term_hits(low, _FIN)
+        for cat, rx in router._compiled.items():
+            got, want = sc.search("router." + cat), rx.search(text)
+            assert (got and got.group(0)) == (want and want.group(0))
+
+    assert detect_route("I want to end my life")["route"] == "crisis"
+    assert detect_route("Which stock should I buy now?") == {"route": "abstain", "reason": "finance-tip", "matched_terms": ["buy"]}
+    assert detect_route("box breathing please")["reason"] == "wellness-allowlist"
@@ -0,0 +1,51 @@
+import json
+import unicodedata
+from pathlib import Path
+from app.api.server import _HINT_EN, _HINT_ROMAN, _HINT_UR, _TONE_EN, _TONE_UR
+from app.policies.term_gates import detect_route
+from app.safety.router import SafetyRouter
+from app.safety.verdict import ABSTAIN_RX, CRISIS_RX, FINANCE_PAT, assess
+
+_REDTEAM = Path("app/eval/redteam")
+
+
+def _redteam_texts():
+    out = []
+    for p in sorted(_REDTEAM.glob("*.jsonl")):
+        for line in p.read_text(encoding="utf-8-sig").splitlines():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # `//` headers, PowerShell wrappers
+            if isinstance(row, dict) and (row.get("input") or row.get("text")):
+                out.append(row.get("input") or row.get("text"))
+    return out
+
+
+def _legacy(text):
+    """What run_turn computed on its own input before the verdict existed."""
+    nfc = unicodedata.normalize("NFC", text)
+    crisis = bool(SafetyRouter().detect(nfc)["crisis"] or CRISIS_RX.search(nfc))
+    abstain = bool(ABSTAIN_RX.search(nfc) or FINANCE_PAT.search(nfc))
+    return crisis, abstain
+
+
+def test_verdict_on_user_text_matches_legacy_checks_on_hinted_prompt():
+    texts = _redteam_texts() + ["Which stock should I buy now?", "box breathing please", "khudkushi", ""]
+    assert len(texts) > 10
+    for body in texts:
+        v = assess(body)
+        assert v.gate == detect_route(body)
+        assert (v.turn_crisis, v.turn_abstain) == _legacy(body)
+        # web_turn hands run_turn the hinted prompt; the hints must not change the result
+        for hinted in (body + _HINT_EN + _TONE_EN, _HINT_ROMAN + body + _HINT_UR + _TONE_UR):
+            assert (v.turn_crisis, v.turn_abstain) == _legacy(hinted)
+
+
+def test_verdict_fields_and_language():
+    v = assess("I want to kill myself")
+    assert v.route == "crisis" and v.turn_crisis and not v.turn_abstain
+    assert v.language == "en" and v.as_dict()["route"] == "crisis"
+    v = assess("بٹ کوائن کب خریدوں؟")
+    assert v.language == "ur" and v.turn_abstain
+    assert assess("hello", language="ur").language == "ur"
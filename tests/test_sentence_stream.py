@@ -0,0 +1,130 @@
+import asyncio
+import importlib
+import random
+import time
+
+from app.voice.tts.tts_stream import SentenceSegmenter, split_sentences
+
+TEXTS = [
+    'Hello. How are you?  "Fine!" 1. Breathe. 2. Relax.\nNext line',
+    "میں ٹھیک ہوں۔ آپ کیسے ہیں؟ اچھا",
+    "Wait... really?! Yes (really). ok",
+    "",
+]
+
+
+def test_split_sentences_urdu_and_latin():
+    assert split_sentences(TEXTS[0]) == ["Hello.", "How are you?", '"Fine!"', "1. Breathe.", "2. Relax.", "Next line"]
+    assert split_sentences(TEXTS[1]) == ["میں ٹھیک ہوں۔", "آپ کیسے ہیں؟", "اچھا"]
+    assert split_sentences(TEXTS[2]) == ["Wait...", "really?!", "Yes (really).", "ok"]
+
+
+def test_segmenter_matches_split_for_any_chunking():
+    rng = random.Random(7)
+    for text in TEXTS:
+        for _ in range(30):
+            seg, out, i = SentenceSegmenter(), [], 0
+            while i < len(text):
+                n = rng.randint(1, 5)
+                out += seg.push(text[i:i + n])
+                i += n
+            assert out + seg.flush() == split_sentences(text)
+
+
+class _StreamLLM:
+    def __init__(self, tokens, delay=0.05):
+        self.tokens, self.delay = tokens, delay
+        self.sent_at = []
+
+    async def astream(self, usage=None, **kw):
+        for tok in self.tokens:
+            await asyncio.sleep(self.delay)
+            self.sent_at.append(time.perf_counter())
+            yield tok
+        usage.update({"prompt_tokens": 10, "completion_tokens": len(self.tokens), "total_tokens": 10 + len(self.tokens)})
+
+    def stream(self, usage=None, **kw):
+        yield from self.tokens
+        usage.update({"prompt_tokens": 10, "completion_tokens": len(self.tokens)})
+
+
+def _turn_module(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return importlib.import_module("app.pipeline.turn")
+
+
+def test_first_sentence_is_handed_over_while_tokens_still_generate(monkeypatch):
+    turn = _turn_module(monkeypatch)
+    tokens = ["آہستہ", " سانس لیں۔", " چار تک", " گنیں۔", " پھر", " چھوڑیں۔"]
+    fake = _StreamLLM(tokens)
+    monkeypatch.setattr(turn, "llm", fake)
+    got = []
+
+    async def on_sentence(s):
+        got.append((s, time.perf_counter()))
+
+    out = asyncio.run(turn.arun_turn("mujhe neend nahi aati", on_sentence=on_sentence))
+    assert [s for s, _ in got] == ["آہستہ سانس لیں۔", "چار تک گنیں۔", "پھر چھوڑیں۔"]
+    assert got[0][1] < fake.sent_at[3]                # confirmed by token 3, handed over before token 4
+    assert out["answer"] == "".join(tokens) and out["tts_path"] is None
+    m = out["metrics"]
+    assert 0 <= m["first_token_ms"] <= m["first_sentence_ms"] <= m["llm_ms"]
+    assert out["usage"]["completion_tokens"] == len(tokens)
+
+
+def test_model_abstain_is_never_spoken(monkeypatch):
+    turn = _turn_module(monkeypatch)
+    monkeypatch.setattr(turn, "llm", _StreamLLM(["ABS", "TAIN."], delay=0))
+    got = []
+    out = turn.run_turn("mujhe neend nahi aati", on_sentence=got.append)
+    assert out["route"] == "abstain"
+    assert got == split_sentences(out["answer"])      # the safe message, not "ABSTAIN."
+
+
+def test_fixed_replies_stream_too(monkeypatch):
+    turn = _turn_module(monkeypatch)
+    got = []
+    out = turn.run_turn("I want to kill myself", on_sentence=got.append)
+    assert out["route"] == "crisis" and got == split_sentences(turn.CRISIS_REPLY_URDU)
+    assert "first_token_ms" not in out["metrics"]
+
+
+def test_llm_client_stream_yields_deltas_and_usage(monkeypatch):
+    from types import SimpleNamespace as NS
+    from app.llm.openai_client import LLMClient
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    chunks = [NS(choices=[NS(delta=NS(content=t))], usage=None) for t in ("Hi", None, " there.")]
+    chunks.append(NS(choices=[], usage=NS(prompt_tokens=3, completion_tokens=2, total_tokens=5)))
+    seen = {}
+
+    def create(**req):
+        seen.update(req)
+        return iter(chunks)
+
+    client = LLMClient()
+    monkeypatch.setattr(client, "client", NS(chat=NS(completions=NS(create=create))))
+    usage = {}
+    assert list(client.stream("sys", "hello", usage=usage)) == ["Hi", " there."]
+    assert usage == {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+    assert seen["stream"] is True and seen["stream_options"] == {"include_usage": True}
+
+
+def test_on_sentence_errors_propagate_and_are_not_llm_failures(monkeypatch):
+    import pytest
+    turn = _turn_module(monkeypatch)
+    monkeypatch.setattr(turn, "llm", _StreamLLM(["سانس لیں۔", " پھر گنیں۔"], delay=0))
+    rows = []
+    monkeypatch.setattr(turn.meter, "log_event", lambda **kw: rows.append(kw))
+
+    def broken(sentence):
+        raise BrokenPipeError("client went away")
+
+    async def abroken(sentence):
+        raise BrokenPipeError("client went away")
+
+    with pytest.raises(BrokenPipeError):
+        turn.run_turn("mujhe neend nahi aati", on_sentence=broken)
+    with pytest.raises(BrokenPipeError):
+        asyncio.run(turn.arun_turn("mujhe neend nahi aati", on_sentence=abroken))
+    assert not [r for r in rows if r.get("unit") == "per_error"]
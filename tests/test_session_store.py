@@ -0,0 +1,165 @@
+import importlib
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.channels.whatsapp_guard import SessionStateStore, WhatsAppGuard
+from app.runtime import session_store
+from app.runtime.session_store import MemoryStore, SQLiteStore, make_store
+
+
+class Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    clock = Clock()
+    s = MemoryStore(clock=clock) if request.param == "memory" else SQLiteStore(str(tmp_path / "s.db"), clock=clock)
+    yield s, clock
+    s.close()
+
+
+def test_ttl_expiry_and_incr_with_limit(store):
+    s, clock = store
+    s.set("consent", "a", {"agree": True}, ttl_s=10)
+    s.set("consent", "b", {"agree": False})
+    assert s.get("consent", "a") == {"agree": True}
+    assert s.incr("plan_usage", "u:1", 2, ttl_s=10, limit=3) == 2
+    assert s.incr("plan_usage", "u:1", 2, ttl_s=10, limit=3) is None      # over the cap: not charged
+    assert s.incr("plan_usage", "u:1", 1, limit=3) == 3
+    clock.t += 10
+    assert s.get("consent", "a") is None and s.get("plan_usage", "u:1", 0) == 0
+    assert s.get("consent", "b") == {"agree": False}                        # no TTL
+    s.purge()
+    assert s.stats()["entries"] == 1
+
+
+def test_memory_expiry_touches_only_due_entries():
+    clock = Clock()
+    s = MemoryStore(clock=clock)
+    for i in range(1000):
+        s.set("c", str(i), i, ttl_s=100 + i)
+    s.set("c", "0", "renewed", ttl_s=5000)                                  # old deadline becomes stale
+    clock.t += 150
+    assert s.purge() == 50 and s.get("c", "0") == "renewed"
+    assert s.stats()["expired"] == 50
+
+
+def test_memory_store_is_bounded():
+    s = MemoryStore(max_entries=10, clock=Clock())
+    for i in range(25):
+        s.set("c", str(i), i, ttl_s=100 + i)
+    assert s.stats()["entries"] == 10 and s.get("c", "24") == 24 and s.get("c", "0") is None
+
+    s = MemoryStore(max_entries=10, clock=Clock())
+    s.set("c", "ttl", 1, ttl_s=100)
+    for i in range(25):
+        s.set("c", str(i), i)                                                   # no TTL: still bounded
+    assert s.stats()["entries"] == 10 and s.get("c", "ttl") is None
+    assert s.get("c", "24") == 24 and s.get("c", "14") is None
+
+
+def _charge(path, n):
+    s = SQLiteStore(path)
+    for _ in range(n):
+        s.incr("plan_usage", "u:day", 1, ttl_s=60, limit=150)
+
+
+def test_sqlite_is_shared_by_worker_processes(tmp_path):
+    path = str(tmp_path / "s.db")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_charge, args=(path, 60)) for _ in range(3)]
+    [p.start() for p in procs]
+    [p.join(60) for p in procs]
+    assert SQLiteStore(path).get("plan_usage", "u:day") == 150                 # 180 tries, capped exactly
+
+
+def test_whatsapp_window_survives_across_guard_instances(tmp_path):
+    path = str(tmp_path / "s.db")
+    t0 = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    a = WhatsAppGuard(store=SessionStateStore(SQLiteStore(path)))
+    a.record_incoming("u1", t0)
+    a.set_opt_in("u1", True)
+    b = WhatsAppGuard(store=SessionStateStore(SQLiteStore(path)))
+    assert b.can_send_freeform("u1", now=t0 + timedelta(hours=23)) is True
+    assert b.decision("u1", is_template=True, now=t0 + timedelta(hours=30))["reason"] == "template_requires_opt_in"
+
+
+def test_make_store_and_server_plan_caps(monkeypatch, tmp_path):
+    assert isinstance(make_store("memory"), MemoryStore)
+    with pytest.raises(ValueError):
+        make_store("redis://x")
+    monkeypatch.setattr(session_store, "_STORE", make_store(f"sqlite:{tmp_path / 's.db'}"))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    server = importlib.import_module("app.api.server")
+    cap = server._cap("Free")
+    assert all(server._plan_consume("u9", "Free") is None for _ in range(cap))
+    over = server._plan_consume("u9", "Free")
+    assert over["abstain"] and over["overage"]["used"] == cap
+    assert session_store.get_session_store().get("plan_usage", over["overage"]["user"] + ":" + over["overage"]["day"]) == cap
+
+
+def test_whatsapp_fields_are_independent_keys(tmp_path):
+    import threading
+    path = str(tmp_path / "s.db")
+    t0 = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    guards = [WhatsAppGuard(store=SessionStateStore(SQLiteStore(path))) for _ in range(2)]
+
+    def incoming(i):
+        for k in range(50):
+            guards[0].record_incoming(f"u{k}", t0 + timedelta(minutes=i))
+
+    def opt_in():
+        for k in range(50):
+            guards[1].set_opt_in(f"u{k}", True)
+
+    ts = [threading.Thread(target=incoming, args=(1,)), threading.Thread(target=opt_in)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    for k in range(50):                                  # neither update was lost to the other
+        st = guards[0].store.get(f"u{k}")
+        assert st.has_opt_in and st.last_incoming_utc == t0 + timedelta(minutes=1)
+
+
+def test_plan_gate_counts_in_its_own_namespace(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace as NS
+    monkeypatch.setattr(session_store, "_STORE", MemoryStore())
+    plan_gate = importlib.import_module("app.ops.plan_gate")
+    req = NS(headers={"X-User-Id": "g1", "X-Plan": "Free"})
+
+    async def call_next(_):
+        return "ok"
+
+    assert asyncio.run(plan_gate.gate(req, call_next)) == "ok"
+    day = __import__("time").strftime("%Y%m%d")
+    s = session_store.get_session_store()
+    assert s.get("plan_gate", f"g1:{day}") == 1 and s.get("plan_usage", f"g1:{day}") is None
+
+
+def test_plan_gate_never_overshoots_the_cap_under_concurrency(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace as NS
+    monkeypatch.setattr(session_store, "_STORE", MemoryStore())
+    plan_gate = importlib.import_module("app.ops.plan_gate")
+    cap = plan_gate._cap("Free")
+    req = NS(headers={"X-User-Id": "g2", "X-Plan": "Free"})
+
+    async def call_next(_):
+        await asyncio.sleep(0.01)                        # requests overlap while in flight
+        return "ok"
+
+    async def go():
+        return await asyncio.gather(*(plan_gate.gate(req, call_next) for _ in range(cap + 10)))
+
+    outs = asyncio.run(go())
+    assert outs.count("ok") == cap
+    assert session_store.get_session_store().get("plan_gate", f"g2:{__import__('time').strftime('%Y%m%d')}") == cap
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from app.audio.stt_service import STTBusy, STTService
+
+
+class _Engine:
+    loads = 0
+
+    def __init__(self, gate):
+        _Engine.loads += 1
+        self.gate = gate
+
+    def transcribe_file(self, path, language=None):
+        self.gate.wait(5)
+        return {"text": f"heard {path}", "language": language, "duration_sec": 1.0}
+
+
+def test_replicas_load_once_and_queue_applies_backpressure():
+    gate = threading.Event()
+    _Engine.loads = 0
+    svc = STTService(replicas=2, max_queue=2, engine_factory=lambda i: _Engine(gate))
+    try:
+        futs = [svc.submit(f"a{i}.wav", "ur") for i in range(2)]
+        deadline = time.time() + 5
+        while svc.stats()["busy"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        futs += [svc.submit(f"b{i}.wav") for i in range(2)]  # both replicas busy: these wait
+        assert svc.stats()["queue_depth"] == 2
+        with pytest.raises(STTBusy):
+            svc.submit("c.wav")
+
+        gate.set()
+        outs = [f.result(5) for f in futs]
+        assert outs[0]["text"] == "heard a0.wav" and outs[0]["language"] == "ur"
+        assert all("queue_ms" in o and "transcribe_ms" in o for o in outs)
+        assert asyncio.run(svc.atranscribe("d.wav"))["text"] == "heard d.wav"
+
+        st = svc.stats()
+        assert _Engine.loads == 2 and st["loaded"] == 2 and all(ms is not None for ms in st["load_ms"])
+        assert (st["completed"], st["rejected"], st["queue_depth"]) == (5, 1, 0)
+    finally:
+        gate.set()
+        svc.close()
+
+
+def test_load_failure_fails_jobs_instead_of_hanging():
+    def broken(i):
+        raise RuntimeError("no model")
+
+    svc = STTService(replicas=1, engine_factory=broken)
+    try:
+        with pytest.raises(RuntimeError, match="STT model unavailable"):
+            svc.transcribe("x.wav", timeout=5)
+        assert "no model" in svc.stats()["load_error"]
+    finally:
+        svc.close()
@@ -0,0 +1,29 @@
+import io
+import wave
+
+from app.audio.transcode import pcm_to_wav, sniff, to_wav
+
+
+def _wave_module(pcm, rate):
+    bio = io.BytesIO()
+    with wave.open(bio, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return bio.getvalue()
+
+
+def test_in_memory_header_matches_wave_module():
+    pcm = bytes(range(256)) * 8
+    assert pcm_to_wav(pcm, 22050) == _wave_module(pcm, 22050)
+    assert pcm_to_wav(pcm + b"\x01", 16000) == _wave_module(pcm, 16000)   # odd trailing byte dropped
+
+
+def test_format_detection_prefers_content_type():
+    wav = _wave_module(b"\x00\x00" * 10, 16000)
+    assert sniff(wav) == "wav" and sniff(b"ID3...") == "mp3" and sniff(b"\x01\x02") == "pcm"
+    assert to_wav(wav, 16000) == (wav, "wav")
+    pcm_like_mp3 = b"\xff\xff" * 200                                     # -1 samples look like MP3 sync
+    out, fmt = to_wav(pcm_like_mp3, 16000, "audio/pcm")
+    assert fmt == "pcm" and out[:4] == b"RIFF"
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from app.audio.tts.tts_cache import TTSCache, cache_key
+
+
+def _engine(tmp_path, calls):
+    def render(text, size=1000):
+        calls.append(text)
+        p = tmp_path / f"out_{len(calls)}.wav"
+        p.write_bytes(b"R" * size)
+        return str(p)
+    return render
+
+
+def test_key_normalizes_text_and_separates_voices():
+    assert cache_key("  سانس  لیں۔\n", "sapi", lang="ur") == cache_key("سانس لیں۔", "sapi", lang="ur")
+    assert cache_key("hi", "sapi", voice="a") != cache_key("hi", "sapi", voice="b")
+    assert cache_key("hi", "sapi", lang="en") != cache_key("hi", "elevenlabs", lang="en")
+
+
+def test_miss_stores_once_then_hits_without_synthesis(tmp_path):
+    cache, calls = TTSCache(root=str(tmp_path / "c")), []
+    render = _engine(tmp_path, calls)
+    p1, hit1 = cache.synth_cached(lambda: render("a"), "a", engine="sapi", lang="ur")
+    p2, hit2 = cache.synth_cached(lambda: render("a"), " a ", engine="sapi", lang="ur")
+    assert (hit1, hit2) == (False, True) and p1 == p2 and calls == ["a"]
+    assert not (tmp_path / "out_1.wav").exists()             # moved into the cache, not copied
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_bytes_and_index_persist_across_instances(tmp_path):
+    root = str(tmp_path / "c")
+    first = TTSCache(root=root)
+    p, _ = first.synth_cached(lambda: b"RIFFdata", "x", engine="piper")
+    first.flush()                                            # normally done by the background writer
+    again = TTSCache(root=root)
+    assert again.lookup("x", engine="piper") == p
+    index = json.loads((tmp_path / "c" / "index.json").read_text(encoding="utf-8"))
+    assert index[cache_key("x", "piper")]["bytes"] == 8
+
+
+def test_lru_eviction_by_size_keeps_pinned(tmp_path):
+    cache, calls = TTSCache(root=str(tmp_path / "c"), max_bytes=3000), []
+    render = _engine(tmp_path, calls)
+    cache.synth_cached(lambda: render("crisis"), "crisis", engine="e", pinned=True)
+    cache.synth_cached(lambda: render("old"), "old", engine="e")
+    time.sleep(0.01)
+    cache.synth_cached(lambda: render("new"), "new", engine="e")   # 3000 bytes: at the limit
+    cache.synth_cached(lambda: render("newest"), "newest", engine="e")
+    assert cache.lookup("crisis", engine="e") and cache.lookup("newest", engine="e")
+    assert cache.lookup("old", engine="e") is None
+    s = cache.stats()
+    assert s["bytes"] <= 3000 and s["evictions"] == 1
+
+
+def test_nowait_miss_returns_immediately_and_fills_in_background(tmp_path):
+    cache, calls = TTSCache(root=str(tmp_path / "c")), []
+    render = _engine(tmp_path, calls)
+    gate = threading.Event()
+
+    def slow():
+        gate.wait(5)
+        return render("crisis")
+
+    t0 = time.perf_counter()
+    path, hit = cache.synth_cached(slow, "crisis", engine="e", nowait=True, pinned=True)
+    assert path is None and not hit and time.perf_counter() - t0 < 0.5
+    assert cache.synth_cached(slow, "crisis", engine="e", nowait=True) == (None, False)   # no second render
+    gate.set()
+    for _ in range(100):
+        if cache.lookup("crisis", engine="e"):
+            break
+        time.sleep(0.02)
+    assert calls == ["crisis"] and cache.meta(cache_key("crisis", "e"))["pinned"]
+
+
+def test_async_engines_share_the_cache(tmp_path):
+    cache, calls = TTSCache(root=str(tmp_path / "c")), []
+    render = _engine(tmp_path, calls)
+
+    async def el():
+        await asyncio.sleep(0)
+        return render("x")
+
+    async def run():
+        a = await cache.asynth_cached(el, "x", engine="elevenlabs", voice="v", lang="en")
+        b = await cache.asynth_cached(el, "x", engine="elevenlabs", voice="v", lang="en")
+        return a, b
+
+    (p1, h1), (p2, h2) = asyncio.run(run())
+    assert (h1, h2) == (False, True) and p1 == p2 and calls == ["x"]
+
+
+def test_turn_crisis_never_waits_on_synthesis(monkeypatch):
+    import importlib
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    turn = importlib.import_module("app.pipeline.turn")
+    seen = {}
+
+    def fake_synth(text, lang_hint="ur", **kw):
+        seen.update(kw)
+        return {"tts_path": None, "duration_sec": None}
+
+    monkeypatch.setattr(turn, "tts_synth", fake_synth)
+    out = asyncio.run(turn.arun_turn("I want to kill myself"))
+    assert out["route"] == "crisis" and seen == {"nowait": True, "pinned": True}
+
+
+def test_expire_drops_entries_unused_for_the_retention_window(tmp_path):
+    cache = TTSCache(root=str(tmp_path / "c"))
+    old, _ = cache.synth_cached(lambda: b"old", "old", engine="sapi")
+    safe, _ = cache.synth_cached(lambda: b"safe", "safe", engine="sapi", pinned=True)
+    new, _ = cache.synth_cached(lambda: b"new", "new", engine="sapi")
+    for key in (cache_key("old", "sapi"), cache_key("safe", "sapi")):
+        cache._index[key]["last_used"] = time.time() - 3 * 86400
+    assert cache.expire(2 * 86400) == 1
+    assert cache.lookup("old", "sapi") is None and cache.lookup("safe", "sapi") == safe
+    assert cache.lookup("new", "sapi") == new and cache.etag(cache_key("new", "sapi"))
+
+
+def test_index_is_written_off_the_lock_and_lookups_do_not_wait_for_it(tmp_path, monkeypatch):
+    from app.audio.tts import tts_cache
+    cache = TTSCache(root=str(tmp_path / "c"))
+    p, _ = cache.synth_cached(lambda: b"crisis", "crisis", engine="sapi", pinned=True)
+    cache.flush()
+    writing, release = threading.Event(), threading.Event()
+    real_dumps = tts_cache.json.dumps
+
+    def slow_dumps(*a, **kw):
+        writing.set()
+        release.wait(5)
+        return real_dumps(*a, **kw)
+
+    monkeypatch.setattr(tts_cache.json, "dumps", slow_dumps)
+    cache.synth_cached(lambda: b"other", "other", engine="sapi")
+    t = threading.Thread(target=cache.flush)
+    t.start()
+    assert writing.wait(5)
+    t0 = time.perf_counter()
+    assert cache.lookup("crisis", "sapi") == p                # not blocked by the index write
+    assert time.perf_counter() - t0 < 0.5
+    release.set()
+    t.join(5)
+    monkeypatch.setattr(tts_cache.json, "dumps", real_dumps)
+    assert cache_key("other", "sapi") in json.loads((tmp_path / "c" / "index.json").read_text(encoding="utf-8"))
+
+
+def test_eviction_follows_recency_of_use(tmp_path):
+    cache = TTSCache(root=str(tmp_path / "c"), max_entries=2)
+    cache.synth_cached(lambda: b"a", "a", engine="e")
+    cache.synth_cached(lambda: b"b", "b", engine="e")
+    assert cache.lookup("a", engine="e")                      # a is now the most recently used
+    cache.synth_cached(lambda: b"c", "c", engine="e")
+    assert cache.lookup("b", engine="e") is None
+    assert cache.lookup("a", engine="e") and cache.lookup("c", engine="e")
+
+
+def test_workers_sharing_a_directory_see_and_keep_each_others_entries(tmp_path):
+    root = str(tmp_path / "c")
+    a, b = TTSCache(root=root), TTSCache(root=root)
+    pa, _ = a.synth_cached(lambda: b"A" * 100, "from a", engine="sapi")
+    pb, _ = b.synth_cached(lambda: b"B" * 100, "from b", engine="sapi")
+    calls = []
+    assert b.synth_cached(lambda: calls.append(1), "from a", engine="sapi") == (pa, True) and not calls
+    a.flush()
+    b.flush()                                                # last writer keeps the other's entries
+    index = json.loads((tmp_path / "c" / "index.json").read_text(encoding="utf-8"))
+    assert {cache_key("from a", "sapi"), cache_key("from b", "sapi")} <= set(index)
+
+
+def test_size_bound_covers_the_shared_directory(tmp_path):
+    root = str(tmp_path / "c")
+    a, b = TTSCache(root=root, max_bytes=250), TTSCache(root=root, max_bytes=250)
+    old, _ = a.synth_cached(lambda: b"A" * 100, "old", engine="sapi")
+    a.synth_cached(lambda: b"A" * 100, "pinned", engine="sapi", pinned=True)
+    a.flush()
+    b.synth_cached(lambda: b"B" * 100, "new", engine="sapi")
+    b.flush()                                                # 300 bytes across both workers
+    assert not os.path.exists(old)                           # the least recently used entry, a's
+    assert b.stats()["bytes"] <= 250 and b.stats()["pinned"] == 1
+
+
+def test_async_hit_pins_the_entry(tmp_path):
+    cache = TTSCache(root=str(tmp_path / "c"), max_bytes=150)
+
+    async def render():
+        return b"S" * 100
+
+    async def run():
+        await cache.asynth_cached(render, "safety line", engine="elevenlabs")
+        return await cache.asynth_cached(render, "safety line", engine="elevenlabs", pinned=True)
+
+    path, hit = asyncio.run(run())
+    assert hit and cache.meta(cache_key("safety line", "elevenlabs"))["pinned"]
+    cache.synth_cached(lambda: b"X" * 100, "other", engine="sapi")   # over the bound: other goes, not the pinned line
+    assert cache.get(cache_key("safety line", "elevenlabs")) == path
@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+import threading
+
+from app.audio.tts import prerender as pr
+from app.audio.tts import tts_cache, tts_engine_sapi
+from app.audio.tts.tts_cache import TTSCache
+
+
+def test_bank_covers_config_refusals_and_fixed_replies():
+    lines = pr.static_lines()
+    keys = {ln.key for ln in lines}
+    assert {"bank.box_breathing_en", "bank.54321_ur", "refusal.crisis.flow"} <= keys
+    from app.pipeline.replies import CRISIS_REPLY_URDU
+    assert any(ln.text == CRISIS_REPLY_URDU for ln in lines)
+    seen = [(ln.lang, tts_cache.normalize_text(ln.text)) for ln in lines]
+    assert len(seen) == len(set(seen))
+
+
+def test_prerender_runs_renderers_in_parallel_and_counts():
+    lines = [pr.StaticLine(f"k{i}", "en", f"line {i}") for i in range(6)]
+    active, peak, lock = [0], [0], threading.Lock()
+
+    async def render(text, lang):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return text != "line 5"
+
+    async def broken(text, lang):
+        raise RuntimeError("no voice")
+
+    res = asyncio.run(pr.prerender(lines, {"a": render, "b": broken}, workers=3))
+    assert res["lines"] == 6
+    assert res["engines"]["a"] == {"cached": 5, "unavailable": 1, "errors": 0}
+    assert res["engines"]["b"]["errors"] == 6
+    assert 1 < peak[0] <= 3
+
+
+def test_prerendered_crisis_reply_needs_no_synthesis(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("VOICE_BACKEND_TTS", "mock")
+    turn = importlib.import_module("app.pipeline.turn")
+    calls = []
+
+    def fake_engine(text, **kw):
+        calls.append(text)
+        p = tmp_path / f"r{len(calls)}.wav"
+        p.write_bytes(b"RIFF")
+        return str(p)
+
+    monkeypatch.setattr(tts_cache, "_CACHE", TTSCache(root=str(tmp_path / "c")))
+    monkeypatch.setattr(tts_engine_sapi, "_PYTTSX3_OK", True)
+    monkeypatch.setattr(tts_engine_sapi, "sapi_synth", fake_engine)
+
+    res = asyncio.run(pr.prerender_static())
+    assert res["engines"]["turn"]["cached"] == res["lines"] == len(calls)
+    n = len(calls)
+
+    out = turn.run_turn("I want to kill myself", lang_hint="en")
+    assert out["route"] == "crisis" and out["tts_path"]
+    assert len(calls) == n                                   # served from the cache
+    assert tts_cache.get_cache().stats()["pinned"] == n
+
+
+def test_prerender_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("SUKOON_TTS_PRERENDER", "0")
+    assert asyncio.run(pr.prerender_static()) == {"skipped": True}
+
+
+def test_cache_eval_measures_the_engine_cache(tmp_path, monkeypatch, capsys):
+    from app.eval import tts_cache_eval
+    monkeypatch.setenv("VOICE_BACKEND_TTS", "mock")
+    monkeypatch.delenv("SUKOON_TTS_VOICE", raising=False)
+    monkeypatch.setattr(tts_cache, "_CACHE", TTSCache(root=str(tmp_path / "c")))
+    assert tts_cache_eval.main([]) == 1                      # nothing rendered: no hits
+    assert "hits=0" in capsys.readouterr().out
+
+    def fake_engine(text, **kw):
+        p = tmp_path / f"r{abs(hash(text))}.wav"
+        p.write_bytes(b"RIFF")
+        return str(p)
+
+    monkeypatch.setattr(tts_engine_sapi, "_PYTTSX3_OK", True)
+    monkeypatch.setattr(tts_engine_sapi, "sapi_synth", fake_engine)
+    assert tts_cache_eval.main(["--prerender"]) == 0       # rendered by the SAPI path itself
+    monkeypatch.setenv("SUKOON_TTS_VOICE", "other-voice")    # a different voice is a different entry
+    assert tts_cache_eval.main([]) == 1
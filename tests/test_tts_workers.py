@@ -0,0 +1,67 @@
+import time
+import wave
+
+import pytest
+
+from app.audio.tts import tts_engine_sapi, tts_workers
+from app.audio.tts.tts_workers import TTSBusy, TTSWorkerPool
+
+
+def _frames(path):
+    with wave.open(path, "rb") as w:
+        return w.getnframes()
+
+
+def test_resident_worker_pays_load_once(tmp_path):
+    pool = TTSWorkerPool("stub", workers=1, env={"SUKOON_TTS_STUB_LOAD_MS": "400"}).start()
+    try:
+        paths, ms = [], []
+        for i in range(3):
+            t0 = time.perf_counter()
+            paths.append(pool.synth(f"one two {i}", str(tmp_path / f"{i}.wav")))
+            ms.append((time.perf_counter() - t0) * 1000)
+        assert [_frames(p) for p in paths] == [2400, 2400, 2400]
+        assert ms[0] >= 400 and max(ms[1:]) < 400        # only the first job waits for the engine
+        s = pool.stats()
+        assert s["starts"] == 1 and s["completed"] == 3 and s["alive"] == 1
+    finally:
+        pool.close()
+
+
+def test_hung_job_times_out_and_worker_restarts(tmp_path):
+    pool = TTSWorkerPool("stub", workers=1, timeout=1, env={"SUKOON_TTS_STUB_MS": "3000"})
+    try:
+        with pytest.raises(TimeoutError):
+            pool.synth("slow", str(tmp_path / "a.wav"))
+        s = pool.stats()
+        assert s["timeouts"] == 1 and s["alive"] == 0
+    finally:
+        pool.close()
+
+
+def test_full_queue_is_rejected(tmp_path):
+    pool = TTSWorkerPool("stub", workers=1, max_queue=1, env={"SUKOON_TTS_STUB_MS": "500"})
+    try:
+        futs = []
+        with pytest.raises(TTSBusy):
+            for i in range(4):
+                futs.append(pool.submit("x", str(tmp_path / f"{i}.wav")))
+        assert pool.stats()["rejected"] == 1
+        for f in futs:
+            f.result(timeout=10)
+    finally:
+        pool.close()
+
+
+def test_sapi_engine_renders_on_the_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUKOON_TTS_WORKER_ENGINE", "stub")
+    monkeypatch.setattr(tts_workers, "_POOLS", {})
+    monkeypatch.chdir(tmp_path)
+    try:
+        a = tts_engine_sapi.sapi_synth("hello there")
+        b = tts_engine_sapi.sapi_synth("hello again")
+        assert a and b and _frames(a) == 1600
+        s = tts_workers.tts_workers_stats()["stub"]
+        assert s["completed"] == 2 and s["starts"] <= s["workers"]      # no engine start per call
+    finally:
+        tts_workers.close_tts_workers()
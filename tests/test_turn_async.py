@@ -0,0 +1,48 @@
+import asyncio
+import importlib
+import time
+
+
+class _FakeLLM:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay, self.fail = delay, fail
+
+    def chat(self, **kw):
+        if self.fail:
+            raise RuntimeError("provider down")
+        return "Try a slow 4-6 breath.", {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+    async def achat(self, **kw):
+        await asyncio.sleep(self.delay)
+        return self.chat(**kw)
+
+
+def _turn_module(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return importlib.import_module("app.pipeline.turn")
+
+
+def _strip(d):
+    return {k: v for k, v in d.items() if k not in ("metrics", "latency_ms", "timings")}
+
+
+def test_arun_turn_matches_run_turn(monkeypatch):
+    turn = _turn_module(monkeypatch)
+    for llm in (_FakeLLM(), _FakeLLM(fail=True)):
+        monkeypatch.setattr(turn, "llm", llm)
+        for text in ("I want to kill myself", "bitcoin signal please", "neend nahi aati, saans"):
+            assert _strip(asyncio.run(turn.arun_turn(text))) == _strip(turn.run_turn(text))
+
+
+def test_concurrent_turns_overlap_on_the_event_loop(monkeypatch):
+    turn = _turn_module(monkeypatch)
+    monkeypatch.setattr(turn, "llm", _FakeLLM(delay=0.2))
+
+    async def many(n):
+        t0 = time.perf_counter()
+        outs = await asyncio.gather(*(turn.arun_turn("mujhe neend nahi aati") for _ in range(n)))
+        return outs, time.perf_counter() - t0
+
+    outs, wall = asyncio.run(many(8))
+    assert all(o["route"] == "assist" and o["answer"] for o in outs)
+    assert wall < 0.8  # 8 x 200 ms provider calls overlap instead of queueing
@@ -0,0 +1,156 @@
+import asyncio
+import importlib
+import json
+
+from fastapi.testclient import TestClient
+
+
+class _FakeLLM:
+    async def astream(self, usage=None, **kw):
+        for tok in ("Try a slow", " 4-6 breath.", " Then relax", " your shoulders!"):
+            await asyncio.sleep(0)
+            yield tok
+        usage.update({"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15})
+
+
+class _FakeTranscriber:
+    """Each binary frame is UTF-8 text; every frame yields a partial of the text so far."""
+
+    def __init__(self, language=None, **kw):
+        self.words = []
+
+    async def apush(self, frame):
+        self.words.append(frame.decode("utf-8"))
+        return [{"text": " ".join(self.words), "stable": "", "final": False, "segment": 0, "audio_ms": 0}]
+
+    async def aflush(self):
+        return [{"text": " ".join(self.words), "stable": " ".join(self.words), "final": True, "segment": 0, "audio_ms": 0}]
+
+
+def _client(monkeypatch, backend="faster-whisper"):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("VOICE_BACKEND_ASR", backend)
+    turn = importlib.import_module("app.pipeline.turn")
+    server = importlib.import_module("app.api.server")
+    monkeypatch.setattr(turn, "llm", _FakeLLM())
+    monkeypatch.setattr(server, "arun_turn", turn.arun_turn)
+    monkeypatch.setattr(server, "StreamingTranscriber", _FakeTranscriber)
+    monkeypatch.setattr(server.tts_stream, "synthesize", lambda text, lang="en", **kw: b"RIFF" + text.encode("utf-8"))
+    return TestClient(server.app)
+
+
+def _until_done(ws):
+    msgs = []
+    while True:
+        m = ws.receive()
+        msgs.append(m.get("bytes") if m.get("bytes") is not None else json.loads(m["text"]))
+        if isinstance(msgs[-1], dict) and msgs[-1].get("type") == "done":
+            return msgs
+
+
+def test_typed_turn_streams_one_audio_message_per_sentence(monkeypatch):
+    with _client(monkeypatch).websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-1"}) as ws:
+        ws.send_json({"type": "text", "text": "I can't sleep at night"})
+        msgs = _until_done(ws)
+    assert msgs[-2]["type"] == "answer" and msgs[-2]["route"] == "assist"
+    audio = [m for m in msgs if isinstance(m, dict) and m["type"] == "audio"]
+    assert [a["text"] for a in audio] == ["Try a slow 4-6 breath.", "Then relax your shoulders!"]
+    wavs = [m for m in msgs if isinstance(m, bytes)]
+    assert wavs == [b"RIFF" + a["text"].encode("utf-8") for a in audio]
+    assert msgs[-1]["metrics"]["first_audio_ms"] is not None
+    assert msgs[-1]["metrics"]["first_token_ms"] is not None
+
+
+def test_spoken_turn_answers_after_end(monkeypatch):
+    with _client(monkeypatch).websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-2"}) as ws:
+        ws.send_json({"type": "start"})
+        for w in ("I", "feel", "anxious"):
+            ws.send_bytes(w.encode("utf-8"))
+            assert ws.receive_json()["type"] == "partial"
+        ws.send_json({"type": "end"})
+        final = ws.receive_json()
+        assert final == {"type": "final", "text": "I feel anxious", "stable": "I feel anxious", "audio_ms": 0}
+        msgs = _until_done(ws)
+    assert msgs[-1]["route"] == "assist"
+    assert msgs[-1]["metrics"]["stt_final_ms"] >= 0
+
+
+def test_crisis_on_partial_is_answered_before_end(monkeypatch):
+    with _client(monkeypatch).websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-3"}) as ws:
+        for w in ("I", "want", "to", "kill", "myself"):
+            ws.send_bytes(w.encode("utf-8"))
+            if w != "myself":
+                assert ws.receive_json()["type"] == "partial"
+        assert ws.receive_json()["text"] == "I want to kill myself"
+        msgs = _until_done(ws)
+        assert msgs[-1]["route"] == "crisis"
+        ws.send_bytes(b"more")          # rest of the utterance is dropped
+        ws.send_json({"type": "end"})
+        ws.send_json({"type": "text", "text": "thanks"})
+        assert ws.receive_json()["type"] == "audio"
+
+
+def test_mock_asr_backend_needs_no_stt_model(monkeypatch):
+    client = _client(monkeypatch, backend="mock")
+    server = importlib.import_module("app.api.server")
+    monkeypatch.setattr(server, "StreamingTranscriber", None)   # never constructed for mock
+    with client.websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-4"}) as ws:
+        ws.send_json({"type": "start"})
+        ws.send_bytes("I feel".encode("utf-8"))
+        assert ws.receive_json() == {"type": "partial", "text": "I feel", "stable": "", "audio_ms": 0}
+        ws.send_bytes(b"anxious")
+        ws.receive_json()
+        ws.send_json({"type": "end"})
+        assert ws.receive_json()["text"] == "I feel anxious"
+        assert _until_done(ws)[-1]["route"] == "assist"
+
+
+def test_failed_utterance_reports_an_error_and_keeps_the_socket(monkeypatch):
+    client = _client(monkeypatch)
+    server = importlib.import_module("app.api.server")
+
+    class _NoModel(_FakeTranscriber):
+        async def apush(self, frame):
+            raise RuntimeError("STT model unavailable: no faster-whisper")
+
+    monkeypatch.setattr(server, "StreamingTranscriber", _NoModel)
+    with client.websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-5"}) as ws:
+        ws.send_bytes(b"hello")
+        assert ws.receive_json() == {"type": "error", "detail": "utterance failed: RuntimeError"}
+        ws.send_bytes(b"more")           # rest of the failed utterance is dropped
+        ws.send_json({"type": "end"})
+        ws.send_json({"type": "text", "text": "I can't sleep"})
+        assert _until_done(ws)[-1]["route"] == "assist"
+
+
+def test_crisis_text_is_sent_first_and_survives_a_tts_failure(monkeypatch):
+    client = _client(monkeypatch)
+    server = importlib.import_module("app.api.server")
+    calls = []
+
+    def broken(text, lang="en", **kw):
+        calls.append(kw)
+        raise RuntimeError("engine down")
+
+    monkeypatch.setattr(server.tts_stream, "synthesize", broken)
+    with client.websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-6"}) as ws:
+        ws.send_json({"type": "text", "text": "I want to kill myself"})
+        msgs = _until_done(ws)
+    assert msgs[0] == {"type": "answer", "route": "crisis", "text": server.CRISIS_REPLY_URDU}
+    assert [m["type"] for m in msgs] == ["answer", "done"]
+    assert calls and all(kw == {"nowait": True, "pinned": True} for kw in calls)
+
+
+def test_crisis_is_answered_past_the_plan_cap_and_not_charged(monkeypatch):
+    client = _client(monkeypatch)
+    server = importlib.import_module("app.api.server")
+    cap = server._cap("Free")
+    with client.websocket_connect("/api/voice/ws?ui_lang=en", headers={"X-User-Id": "ws-7"}) as ws:
+        for _ in range(cap):
+            ws.send_json({"type": "text", "text": "I can't sleep"})
+            assert _until_done(ws)[-1]["route"] == "assist"
+        ws.send_json({"type": "text", "text": "I can't sleep"})
+        assert _until_done(ws)[-1]["route"] == "abstain"
+        ws.send_json({"type": "text", "text": "I want to kill myself"})
+        msgs = _until_done(ws)
+    assert msgs[0]["route"] == "crisis" and msgs[0]["text"] == server.CRISIS_REPLY_URDU
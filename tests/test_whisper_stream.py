@@ -0,0 +1,52 @@
+import numpy as np
+from app.voice.asr.whisper_stream import StreamingTranscriber, gated_stream, transcribe_stream
+
+RATE, FRAME = 16000, 320  # 20 ms
+
+
+def _frames(ms, amp):
+    rng = np.random.default_rng(0)
+    for _ in range(ms // 20):
+        yield (rng.standard_normal(FRAME) * amp * 32767).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+def _script(words):
+    """Fake decoder: one more word per 500 ms of audio it is given."""
+    calls = []
+
+    def transcribe(audio, language):
+        calls.append(audio.size)
+        n = max(1, audio.size // (RATE // 2))
+        return " ".join(words[:n])
+    return transcribe, calls
+
+
+def test_partials_then_final_on_endpoint():
+    tr, calls = _script(["I", "feel", "very", "anxious", "today"])
+    st = StreamingTranscriber(language="en", transcribe=tr, partial_every_ms=500, endpoint_silence_ms=600)
+    hyps = []
+    for f in list(_frames(200, 0.0)) + list(_frames(1600, 0.2)) + list(_frames(700, 0.0)):
+        hyps += st.push(f)
+    hyps += st.flush()
+
+    partials = [h for h in hyps if not h["final"]]
+    finals = [h for h in hyps if h["final"]]
+    assert [h["text"] for h in partials] == ["I", "I feel", "I feel very", "I feel very anxious"]
+    assert partials[2]["stable"] == "I feel"
+    assert len(finals) == 1 and finals[0]["text"] == "I feel very anxious" and finals[0]["segment"] == 0
+    assert calls[0] == RATE // 2  # leading silence is not decoded
+    assert st.flush() == []
+
+
+def test_gate_fires_on_partial_before_speech_ends(monkeypatch):
+    monkeypatch.setenv("VOICE_BACKEND_ASR", "faster-whisper")
+    tr, calls = _script(["I", "want", "to", "kill", "myself", "tonight", "please", "help"])
+    out = list(gated_stream(_frames(6000, 0.2), language="en", transcribe=tr, partial_every_ms=500))
+    assert out[-1]["crisis"] is True and not out[-1]["final"]
+    assert out[-1]["safety"]["route"] == "crisis"
+    assert out[-1]["audio_ms"] <= 3000 and len(calls) == len(out)  # stopped early, rest never decoded
+
+
+def test_mock_backend_passthrough(monkeypatch):
+    monkeypatch.setenv("VOICE_BACKEND_ASR", "mock")
+    assert list(transcribe_stream(["a", "b"])) == [{"text": "a", "final": True}, {"text": "b", "final": True}]
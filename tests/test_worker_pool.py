@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from app.runtime.worker_pool import BoundedWorkerPool
+
+
+class Busy(RuntimeError):
+    pass
+
+
+class _Echo(BoundedWorkerPool):
+    busy_error = Busy
+
+    def __init__(self, gate, **kw):
+        super().__init__("echo", **kw)
+        self.gate, self.loads = gate, 0
+
+    def _load(self, i):
+        self.loads += 1
+        return f"w{i}"
+
+    def _run(self, i, payload, t_enq, t_start):
+        state = self._state[i]
+        self.gate.wait(5)
+        if payload == "boom":
+            raise ValueError(payload)
+        return (state, payload)
+
+
+def test_bounded_queue_rejects_and_close_fails_waiting_jobs():
+    gate = threading.Event()
+    pool = _Echo(gate, workers=1, max_queue=1)
+    first = pool.submit("a")
+    while pool.stats()["busy"] < 1:
+        pass
+    waiting = pool.submit("b")
+    with pytest.raises(Busy):
+        pool.submit("c")
+    gate.set()
+    assert first.result(5) == ("w0", "a") and waiting.result(5) == ("w0", "b")
+    with pytest.raises(ValueError):
+        pool.submit("boom").result(5)
+    st = pool.stats()
+    assert (st["completed"], st["failed"], st["rejected"], pool.loads) == (2, 1, 1, 1)
+
+    gate.clear()
+    running = pool.submit("x")
+    while pool.stats()["busy"] < 1:
+        pass
+    queued = pool.submit("y")
+    pool.close(timeout=0.1)                                  # worker still stuck on "x"
+    gate.set()
+    assert running.result(5) == ("w0", "x")
+    with pytest.raises(RuntimeError, match="pool closed"):
+        queued.result(5)